@@ -0,0 +1,458 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from fractions import Fraction
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+import script
+
+
+# Noms de catégories des fichiers produits, complétés par des noms numérotés au-delà
+CATEGORY_NAMES = ["Electronics", "Painting Supplies", "Power Tools", "Garden", "Plumbing"]
+COLOR_NAMES = ["Red", "Green", "Blue", "White", "Black"]
+
+# Baseline de la suite de benchmarks et écart toléré avant de signaler une régression
+BASELINE_FILE = Path(__file__).with_name("benchmark_baseline.json")
+TOLERANCE = 0.25
+# En dessous de ces écarts absolus, une différence est attribuée au bruit de mesure
+MIN_SECONDS_DELTA = 0.02
+MIN_MEMORY_DELTA_MB = 1.0
+
+
+def generate_inventory(rows: int, categories: int = 5, skus: int = 1000, null_rate: float = 0.3,
+                       seed: int = 0) -> pd.DataFrame:
+    """
+    Génère un inventaire réaliste au format des fichiers de Script/fichiers_produits.
+
+    Chaque produit (SKU) appartient à une seule catégorie et a un prix de référence ;
+    les lignes varient autour de ce prix. Les quantités suivent une loi de Poisson.
+
+    PRE: rows est un entier >= 0, categories et skus sont des entiers > 0,
+         null_rate est la proportion de couleurs manquantes (entre 0 et 1).
+    POST: Retourne un DataFrame de rows lignes avec les colonnes Product, Category,
+          Quantity, UnitPrice et Color. Le résultat ne dépend que des paramètres.
+    """
+    rng = np.random.default_rng(seed)
+    names = CATEGORY_NAMES[:categories] + [f"Category {number}" for number in range(len(CATEGORY_NAMES), categories)]
+    sku = rng.integers(0, skus, rows)
+    sku_category = rng.integers(0, categories, skus)
+    sku_price = np.round(rng.lognormal(3, 1, skus), 2)
+    color = np.array(COLOR_NAMES, dtype=object)[rng.integers(0, len(COLOR_NAMES), rows)]
+    color[rng.random(rows) < null_rate] = None
+    return pd.DataFrame({
+        "Product": np.char.add("SKU-", sku.astype(str)),
+        "Category": np.array(names)[sku_category[sku]],
+        "Quantity": rng.poisson(50, rows),
+        "UnitPrice": np.maximum(np.round(sku_price[sku] * rng.uniform(0.9, 1.1, rows), 2), 0.01),
+        "Color": color,
+    })
+
+
+def write_inventory_files(frame: pd.DataFrame, directory: str) -> list[Path]:
+    """
+    Écrit un inventaire en un fichier CSV par catégorie, comme les fichiers produits.
+
+    PRE: frame vient de generate_inventory, directory est un répertoire existant.
+    POST: Retourne les chemins des fichiers écrits ; les couleurs manquantes sont écrites "None".
+    """
+    paths = []
+    for category, rows in frame.groupby("Category", sort=True):
+        path = Path(directory) / f"{category.replace(' ', '')}.csv"
+        rows.to_csv(path, index=False, na_rep="None")
+        paths.append(path)
+    return paths
+
+
+def synthetic_inventory(rows: int, seed: int = 0, skus: int = 1000) -> pd.DataFrame:
+    """
+    Génère une base d'inventaire synthétique pour les benchmarks de stockage et du rapport.
+
+    PRE: rows est un entier >= 0, skus est le nombre de produits distincts (> 0).
+    POST: Retourne generate_inventory(rows, skus=skus, seed=seed).
+    """
+    return generate_inventory(rows, skus=skus, seed=seed)
+
+
+def _timed(function, *args, **kwargs) -> float:
+    """
+    Exécute une fonction en masquant ses affichages et mesure sa durée.
+
+    PRE: function est appelable avec args et kwargs.
+    POST: Retourne la durée d'exécution en secondes.
+    """
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def benchmark_storage(rows: int) -> list[dict]:
+    """
+    Compare les formats de stockage de la base consolidée.
+
+    Pour chaque format : durée de sauvegarde, de chargement complet, de chargement des
+    seules colonnes du rapport, et taille du fichier.
+
+    PRE: rows est un entier > 0.
+    POST: Retourne une ligne de résultats par format. Les fichiers sont écrits dans un
+          répertoire temporaire supprimé à la fin.
+    """
+    data = synthetic_inventory(rows)
+    results = []
+    previous_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            for name in script.STORAGE_FORMATS:
+                script.set_storage_format(name)
+                script.default_database.database = data
+                save = _timed(script.save_database)
+                load = _timed(script.load_database)
+                load_report = _timed(script.load_database, columns=script.REPORT_COLUMNS)
+                results.append({
+                    "format": name,
+                    "save_s": round(save, 4),
+                    "load_s": round(load, 4),
+                    "load_report_columns_s": round(load_report, 4),
+                    "size_mb": round(script.default_database._base_path(name).stat().st_size / 1_000_000, 2),
+                })
+        finally:
+            script.set_storage_format("csv")
+            script.default_database.database = pd.DataFrame()
+            os.chdir(previous_directory)
+    return results
+
+
+def benchmark_schema(rows: int) -> list[dict]:
+    """
+    Compare la mémoire et le temps de chargement avec et sans le schéma compact.
+
+    PRE: rows est un entier > 0.
+    POST: Retourne une ligne de résultats par mode de lecture (types par défaut, schéma).
+    """
+    data = synthetic_inventory(rows)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "inventory.csv")
+        data.to_csv(path, index=False)
+        for mode, read in (("défaut", lambda: pd.read_csv(path)),
+                           ("schéma", lambda: script.apply_schema(pd.read_csv(path, **script.csv_options())))):
+            start = time.perf_counter()
+            frame = read()
+            results.append({
+                "mode": mode,
+                "load_s": round(time.perf_counter() - start, 4),
+                "memory_mb": round(frame.memory_usage(deep=True).sum() / 1_000_000, 2),
+                "dtypes": ", ".join(str(dtype) for dtype in frame.dtypes),
+            })
+    return results
+
+
+def benchmark_startup(row_counts: list[int]) -> list[dict]:
+    """
+    Compare la latence de démarrage du chargement CSV et du chargement projeté en mémoire.
+
+    Pour chaque taille : durée de load_database puis de la première recherche (qui construit
+    les index), avec une base CSV relue par pd.read_csv et avec une base "arrow".
+
+    PRE: row_counts est une liste d'entiers > 0.
+    POST: Retourne une ligne de résultats par taille et par format. Les fichiers sont écrits
+          dans un répertoire temporaire supprimé à la fin.
+    """
+    results = []
+    previous_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            for rows in row_counts:
+                data = script.apply_schema(synthetic_inventory(rows))
+                for name in ("csv", "arrow"):
+                    script.set_storage_format(name)
+                    script.default_database.database = data
+                    _timed(script.save_database)
+                    script.default_database.database = pd.DataFrame()
+                    load = _timed(script.load_database)
+                    lookup = _timed(script.search_inventory, "Product", "SKU-1")
+                    results.append({
+                        "rows": rows,
+                        "format": name,
+                        "load_s": round(load, 4),
+                        "first_lookup_s": round(lookup, 4),
+                        "size_mb": round(script.default_database._base_path(name).stat().st_size / 1_000_000, 2),
+                    })
+                    script.default_database._base_path(name).unlink()
+                del data
+        finally:
+            script.set_storage_format("csv")
+            script.default_database.database = pd.DataFrame()
+            os.chdir(previous_directory)
+    return results
+
+
+def _legacy_report(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ancienne implémentation de generate_report, avec une lambda Python par groupe.
+
+    PRE: frame contient les colonnes du rapport.
+    POST: Retourne TotalQuantity et TotalValue par (Category, Product).
+    """
+    return frame.groupby(['Category', 'Product']).agg(
+        TotalQuantity=('Quantity', 'sum'),
+        TotalValue=('UnitPrice', lambda x: (x * frame.loc[x.index, 'Quantity']).sum())
+    ).reset_index()
+
+
+def benchmark_report(rows: int, sku_counts: list[int]) -> list[dict]:
+    """
+    Compare le rapport vectorisé à l'ancienne lambda selon le nombre de groupes.
+
+    PRE: rows est un entier > 0, sku_counts est une liste d'entiers > 0.
+    POST: Retourne une ligne de résultats par nombre de produits distincts.
+    """
+    results = []
+    for skus in sku_counts:
+        data = synthetic_inventory(rows, skus=skus)
+        start = time.perf_counter()
+        legacy = _legacy_report(data)
+        legacy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        summary = script.compute_report(data)
+        vectorized_time = time.perf_counter() - start
+        results.append({
+            "groups": len(summary),
+            "legacy_s": round(legacy_time, 4),
+            "vectorized_s": round(vectorized_time, 4),
+            "speedup": round(legacy_time / vectorized_time, 1),
+            "same_totals": bool(np.allclose(legacy["TotalValue"], summary["TotalValue"])),
+        })
+    return results
+
+
+def benchmark_exact_report(rows: int, sku_counts: list[int]) -> list[dict]:
+    """
+    Compare le rapport exact en fractions entières au rapport en flottants.
+
+    PRE: rows est un entier > 0, sku_counts est une liste d'entiers > 0.
+    POST: Retourne une ligne de résultats par nombre de produits distincts, avec l'écart
+          maximal entre les totaux flottants et les totaux exacts.
+    """
+    results = []
+    for skus in sku_counts:
+        data = synthetic_inventory(rows, skus=skus)
+        start = time.perf_counter()
+        summary = script.compute_report(data)
+        float_time = time.perf_counter() - start
+        start = time.perf_counter()
+        exact = script.compute_exact_report(data)
+        exact_time = time.perf_counter() - start
+        drift = max(abs(Fraction(total) - exact_total)
+                    for total, exact_total in zip(summary["TotalValue"], exact["TotalValue"]))
+        results.append({
+            "groups": len(summary),
+            "float_s": round(float_time, 4),
+            "exact_s": round(exact_time, 4),
+            "slowdown": round(exact_time / float_time, 1),
+            "max_drift": float(drift),
+        })
+    return results
+
+
+def _measure(operation: str, trace_memory: bool, function, *args, **kwargs) -> dict:
+    """
+    Exécute une opération en masquant ses affichages et mesure sa durée ou son pic mémoire.
+
+    tracemalloc ralentit fortement les allocations : la durée et la mémoire sont mesurées
+    lors de deux exécutions distinctes.
+
+    PRE: function est appelable avec args et kwargs.
+    POST: Retourne {operation, seconds, rows}, ou {operation, peak_mb, rows} si trace_memory ;
+          rows est la taille du résultat s'il s'agit d'un DataFrame, sinon celle de la base.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    measure = {"operation": operation}
+    if trace_memory:
+        measure["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1_000_000, 2)
+        tracemalloc.stop()
+    else:
+        measure["seconds"] = round(seconds, 4)
+    measure["rows"] = len(result) if isinstance(result, pd.DataFrame) else len(script.default_database.database)
+    return measure
+
+
+def _search_many(products: list[str]) -> pd.DataFrame:
+    """
+    Enchaîne des recherches par produit, comme un analyste qui consulte plusieurs fiches.
+
+    PRE: La base est chargée, products est une liste de noms de produits.
+    POST: Retourne la concaténation des résultats.
+    """
+    return pd.concat([script.search_inventory("Product", product) for product in products])
+
+
+def run_suite(rows: int, categories: int = 5, skus: int = 1000, null_rate: float = 0.3,
+              searches: int = 100) -> list[dict]:
+    """
+    Mesure les opérations principales de script.py sur un inventaire généré.
+
+    Les fichiers générés sont consolidés dans un store vide, puis la base est rechargée,
+    interrogée et résumée. Le cache des requêtes est désactivé pour mesurer les calculs.
+    La séquence est exécutée deux fois : une fois pour les durées, une fois sous tracemalloc.
+
+    PRE: rows est un entier > 0, les autres paramètres comme pour generate_inventory,
+         searches est le nombre de recherches par produit.
+    POST: Retourne une ligne {operation, seconds, peak_mb, rows} par opération. Les fichiers
+          sont écrits dans un répertoire temporaire supprimé à la fin.
+    """
+    data = generate_inventory(rows, categories, skus, null_rate)
+    products = list(pd.unique(data["Product"])[:searches])
+    category = data["Category"].iloc[0]
+    cache_size = script.default_database.query_cache.maxsize
+    previous_directory = os.getcwd()
+    runs = []
+    for trace_memory in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                script.default_database.query_cache.maxsize = 0
+                script.default_database.database = pd.DataFrame()
+                paths = write_inventory_files(data, directory)
+                run = [_measure("consolidate_files", trace_memory, script.consolidate_files, paths)]
+                script.wait_for_compaction()
+                run.append(_measure("load_database", trace_memory, script.load_database))
+                run.append(_measure("search_inventory", trace_memory, _search_many, products))
+                run.append(_measure("run_query", trace_memory, script.run_query,
+                                    f"Quantity<40 AND Category={category}"))
+                run.append(_measure("generate_report", trace_memory, script.generate_report, display=False))
+                runs.append(run)
+            finally:
+                script.default_database.query_cache.maxsize = cache_size
+                script.default_database.database = pd.DataFrame()
+                os.chdir(previous_directory)
+    return [{**timed, **traced} for timed, traced in zip(*runs)]
+
+
+def compare_to_baseline(results: list[dict], baseline: list[dict], tolerance: float = TOLERANCE) -> list[str]:
+    """
+    Compare les résultats de run_suite à une baseline enregistrée.
+
+    PRE: results et baseline viennent de run_suite avec les mêmes paramètres,
+         tolerance est l'écart relatif toléré (0.25 pour 25 %).
+    POST: Retourne la liste des régressions : opération absente, nombre de lignes différent,
+          durée ou pic mémoire au-delà de la tolérance (hors bruit de mesure).
+    """
+    current = {result["operation"]: result for result in results}
+    regressions = []
+    for reference in baseline:
+        operation = reference["operation"]
+        result = current.get(operation)
+        if result is None:
+            regressions.append(f"{operation} : opération absente des résultats")
+            continue
+        if result["rows"] != reference["rows"]:
+            regressions.append(f"{operation} : {result['rows']} lignes au lieu de {reference['rows']}")
+        if (result["seconds"] > reference["seconds"] * (1 + tolerance)
+                and result["seconds"] - reference["seconds"] > MIN_SECONDS_DELTA):
+            regressions.append(f"{operation} : {result['seconds']} s au lieu de {reference['seconds']} s")
+        if (result["peak_mb"] > reference["peak_mb"] * (1 + tolerance)
+                and result["peak_mb"] - reference["peak_mb"] > MIN_MEMORY_DELTA_MB):
+            regressions.append(f"{operation} : {result['peak_mb']} Mo au lieu de {reference['peak_mb']} Mo")
+    return regressions
+
+
+def run_regression_check(parameters: dict, baseline_path: Path, save: bool, tolerance: float) -> int:
+    """
+    Lance la suite, puis enregistre la baseline ou compare les résultats à celle-ci.
+
+    PRE: parameters contient rows, categories, skus, null_rate et searches.
+    POST: Affiche les résultats et retourne 0, ou 1 si une régression est détectée
+          ou si la baseline manque ou a été mesurée avec d'autres paramètres.
+    """
+    results = run_suite(**parameters)
+    print(f"\n=== Suite ({parameters}) ===")
+    print(tabulate(results, headers='keys', tablefmt='grid'))
+    if save:
+        with open(baseline_path, "w", encoding="utf-8") as baseline_file:
+            json.dump({"parameters": parameters, "results": results}, baseline_file, indent=2)
+        print(f"Baseline enregistrée : {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"Baseline introuvable : {baseline_path} (utilisez --save-baseline).", file=sys.stderr)
+        return 1
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline["parameters"] != parameters:
+        print(f"La baseline a été mesurée avec d'autres paramètres : {baseline['parameters']}", file=sys.stderr)
+        return 1
+    regressions = compare_to_baseline(results, baseline["results"], tolerance)
+    for regression in regressions:
+        print(f"Régression : {regression}", file=sys.stderr)
+    if not regressions:
+        print("Aucune régression par rapport à la baseline.")
+    return 1 if regressions else 0
+
+
+def main():
+    """
+    Point d'entrée des benchmarks.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks de la gestion d'inventaire.")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Nombre de lignes de la base synthétique.")
+    parser.add_argument('--skus', type=int, nargs='+', default=[10, 1_000, 100_000],
+                        help="Nombres de produits distincts testés par le benchmark du rapport.")
+    parser.add_argument('--startup-rows', type=int, nargs='+', default=[1_000_000, 10_000_000],
+                        help="Tailles de base testées par le benchmark de démarrage (jusqu'à 50 000 000).")
+    parser.add_argument('--suite', action='store_true',
+                        help="Lancer la suite de consolidate/search/report et la comparer à la baseline.")
+    parser.add_argument('--suite-rows', type=int, default=200_000, help="Nombre de lignes générées pour la suite.")
+    parser.add_argument('--categories', type=int, default=20, help="Nombre de catégories générées.")
+    parser.add_argument('--suite-skus', type=int, default=50_000, help="Nombre de produits distincts générés.")
+    parser.add_argument('--null-rate', type=float, default=0.3, help="Proportion de couleurs manquantes.")
+    parser.add_argument('--searches', type=int, default=100, help="Nombre de recherches par produit.")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE, help="Fichier JSON de la baseline.")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Enregistrer les résultats de la suite comme nouvelle baseline.")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="Écart relatif toléré avant de signaler une régression (0.25 pour 25 %%).")
+    parser.add_argument('--generate', metavar="DIR",
+                        help="Écrire un inventaire généré dans DIR (un fichier CSV par catégorie) et quitter.")
+    args = parser.parse_args()
+
+    parameters = {"rows": args.suite_rows, "categories": args.categories, "skus": args.suite_skus,
+                  "null_rate": args.null_rate}
+    if args.generate:
+        os.makedirs(args.generate, exist_ok=True)
+        for path in write_inventory_files(generate_inventory(**parameters), args.generate):
+            print(path)
+        return
+    if args.suite:
+        sys.exit(run_regression_check({**parameters, "searches": args.searches},
+                                      args.baseline, args.save_baseline, args.tolerance))
+
+    print(f"\n=== Stockage ({args.rows} lignes) ===")
+    print(tabulate(benchmark_storage(args.rows), headers='keys', tablefmt='grid'))
+    print(f"\n=== Schéma ({args.rows} lignes) ===")
+    print(tabulate(benchmark_schema(args.rows), headers='keys', tablefmt='grid'))
+    print("\n=== Démarrage : CSV contre base projetée en mémoire ===")
+    print(tabulate(benchmark_startup(args.startup_rows), headers='keys', tablefmt='grid'))
+    print(f"\n=== Rapport ({args.rows} lignes) ===")
+    print(tabulate(benchmark_report(args.rows, args.skus), headers='keys', tablefmt='grid'))
+    print(f"\n=== Rapport exact contre flottants ({args.rows} lignes) ===")
+    print(tabulate(benchmark_exact_report(args.rows, args.skus), headers='keys', tablefmt='grid'))
+
+
+if __name__ == "__main__":
+    main()
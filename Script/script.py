@@ -1,11 +1,394 @@
 import argparse
+import contextlib
+import cProfile
+import functools
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from tabulate import tabulate
 
-# Module de gestion de la base consolidée
-database = pd.DataFrame()
+try:
+    import resource
+except ImportError:  # Windows : pas de pic mémoire du processus
+    resource = None
 
+class _StdoutHandler(logging.Handler):
+    """
+    Écrit les messages sur la sortie standard courante, résolue à chaque message
+    (compatible avec contextlib.redirect_stdout).
+    """
+
+    def emit(self, record: logging.LogRecord):
+        """
+        PRE: record est un message dont le niveau est activé.
+        POST: Le message formaté est écrit sur sys.stdout.
+        """
+        sys.stdout.write(self.format(record) + "\n")
+
+# Journal du module : les messages ne sont formatés que si leur niveau est activé
+logger = logging.getLogger("inventory")
+logger.addHandler(_StdoutHandler())
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+# Mesures par opération (durée cumulée, lignes, octets lus et écrits, pic mémoire du processus).
+# Les opérations imbriquées sont comptées dans celle qui les appelle (durées inclusives).
+metrics = {}
+_metrics_lock = threading.Lock()
+
+# Nombre de lignes par page de show_data
+PAGE_SIZE = 20
+
+DATABASE_FILE = "consolidated_database.csv"
+
+# Store segmenté : les ajouts sont écrits dans des segments référencés par un manifeste
+SEGMENTS_DIR = "consolidated_database.segments"
+MANIFEST_FILE = "manifest.json"
+# Journal des ajouts en cours (une entrée JSON par ligne), rejoué par load_database après un arrêt brutal
+JOURNAL_FILE = "journal.jsonl"
+COMPACTION_MIN_ROWS = 10_000
+COMPACTION_TRIGGER = 8
+
+# Formats de stockage disponibles (extension des fichiers) et format utilisé pour les écritures.
+# "arrow" est un fichier Arrow IPC non compressé, projeté en mémoire (mmap) au chargement.
+STORAGE_FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather", "arrow": ".arrow"}
+
+# Colonnes nécessaires à generate_report, pour un chargement partiel de la base
+REPORT_COLUMNS = ["Category", "Product", "Quantity", "UnitPrice"]
+
+# Rapport exact : prix en fractions entières (UnitPriceNum / UnitPriceDen) ou, à défaut,
+# UnitPrice arrondi au centime (PRICE_SCALE). Au-delà de INT64_MAX, calculs en entiers Python.
+EXACT_PRICE_COLUMNS = ["UnitPriceNum", "UnitPriceDen"]
+PRICE_SCALE = 100
+INT64_MAX = 2 ** 63 - 1
+
+# Récapitulatif matérialisé par (Category, Product), mis à jour par deltas à chaque consolidation
+REPORT_SUMMARY_FILE = "consolidated_database.summary.csv"
+
+# Colonnes obligatoires dans chaque fichier d'inventaire et colonnes numériques
+REQUIRED_COLUMNS = ["Product", "Category", "Quantity", "UnitPrice"]
+NUMERIC_COLUMNS = ["Quantity", "UnitPrice"]
+
+# Schéma déclaré des fichiers d'inventaire, appliqué au chargement :
+# - "category" pour le texte à faible cardinalité (codes entiers + dictionnaire de valeurs),
+# - "integer" pour le plus petit type entier qui contient les valeurs (nullable si valeurs manquantes),
+# - "float64" pour les prix, gardés en double précision pour ne pas fausser les montants.
+INVENTORY_SCHEMA = {
+    "Product": "category",
+    "Category": "category",
+    "Color": "category",
+    "Quantity": "integer",
+    "UnitPrice": "float64",
+}
+# Valeurs lues comme manquantes, dont le littéral "None" des fichiers produits
+NULL_VALUES = ["", "None", "none", "NULL", "null", "NA", "N/A", "NaN", "nan"]
+
+# Index secondaires de search_inventory : table de hachage pour l'égalité sur les colonnes
+# textuelles, valeurs triées pour les colonnes numériques
+HASH_INDEX_COLUMNS = ["Product", "Category", "Color"]
+SORTED_INDEX_COLUMNS = ["Quantity", "UnitPrice"]
+
+# Cache LRU des résultats de recherche et du rapport, vidé à chaque changement de la base
+QUERY_CACHE_SIZE = 128
+
+# Clé d'une ligne : une nouvelle ligne avec la même clé remplace l'ancienne (upsert)
+ROW_KEY_COLUMNS = ["Product", "Category", "Color"]
+
+# Partitionnement optionnel de la base par une colonne de la clé (par exemple Category) :
+# chaque partition est un fichier du store, référencé avec son récapitulatif par un catalogue.
+# Les partitions sont chargées à la demande, seulement quand une requête les touche.
+SHARDS_DIR = "consolidated_database.shards"
+CATALOG_FILE = "catalog.json"
+NULL_SHARD = "__null__"
+
+# Syntaxe des requêtes : prédicats "Colonne<op>valeur" combinés par AND (prioritaire) et OR
+QUERY_OPERATORS = ["<=", ">=", "!=", "^=", "~=", "=", "<", ">"]
+_PREDICATE_PATTERN = re.compile(
+    r"^\s*(\w+)\s*(" + "|".join(re.escape(operator) for operator in QUERY_OPERATORS) + r")\s*(.*?)\s*$"
+)
+# Une chaîne entre guillemets, ou un mot-clé AND/OR suivi du début d'un prédicat (colonne et
+# opérateur) : les guillemets sont consommés en bloc, un mot-clé qu'ils contiennent ne coupe rien.
+_QUERY_TOKEN_PATTERN = re.compile(
+    r"""("[^"]*"|'[^']*')|\s+(AND|OR)\s+(?=\w+\s*(?:"""
+    + "|".join(re.escape(operator) for operator in QUERY_OPERATORS) + r"))",
+    re.IGNORECASE
+)
+
+def _peak_memory_mb() -> float:
+    """
+    Retourne le pic de mémoire résidente du processus depuis son démarrage.
+
+    PRE: /
+    POST: Retourne le pic en Mo, ou 0.0 si le module resource n'est pas disponible.
+    """
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1_000_000 if sys.platform == "darwin" else peak / 1_000
+
+@contextlib.contextmanager
+def track(operation: str):
+    """
+    Mesure une opération et ajoute le résultat à metrics.
+
+    Exemple : with track("read_csv") as counters: ... counters["rows"] = len(data)
+
+    PRE: operation est le nom de l'opération.
+    POST: Donne un dictionnaire où l'appelant peut renseigner rows, bytes_read et bytes_written.
+          À la sortie, la durée, les compteurs et le pic mémoire sont cumulés dans metrics[operation],
+          même si l'opération lève une exception.
+    """
+    counters = {}
+    start = time.perf_counter()
+    try:
+        yield counters
+    finally:
+        seconds = time.perf_counter() - start
+        with _metrics_lock:
+            entry = metrics.setdefault(operation, {
+                "calls": 0, "seconds": 0.0, "rows": 0, "bytes_read": 0, "bytes_written": 0, "peak_memory_mb": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            for name in ("rows", "bytes_read", "bytes_written"):
+                entry[name] += counters.get(name, 0)
+            entry["peak_memory_mb"] = max(entry["peak_memory_mb"], _peak_memory_mb())
+
+def instrumented(operation: str):
+    """
+    Décorateur qui mesure chaque appel d'une fonction avec track.
+
+    PRE: operation est le nom de l'opération.
+    POST: Le nombre de lignes retenu est celui du DataFrame retourné, sinon celui de la base
+          de l'InventoryDatabase (premier argument) après l'appel.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with track(operation) as counters:
+                result = function(*args, **kwargs)
+                counters["rows"] = len(result) if isinstance(result, pd.DataFrame) else len(args[0].database)
+            return result
+        return wrapper
+    return decorator
+
+def exclusive(method):
+    """
+    Décorateur qui exécute une méthode d'InventoryDatabase sous son verrou des écritures.
+
+    PRE: method est une méthode qui modifie la base ou le store.
+    POST: Deux méthodes décorées d'une même instance ne s'exécutent jamais en même temps.
+          Les lecteurs ne sont pas bloqués : la méthode prend le verrou en écriture
+          seulement pour publier son résultat.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._writer_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def _file_size(path) -> int:
+    """
+    PRE: path est un chemin.
+    POST: Retourne la taille du fichier en octets, 0 s'il n'existe pas.
+    """
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def _file_signature(path) -> tuple:
+    """
+    PRE: path est un chemin.
+    POST: Retourne (taille en octets, date de modification en ns) du fichier, None s'il n'existe pas.
+    """
+    try:
+        status = os.stat(path)
+    except OSError:
+        return None
+    return status.st_size, status.st_mtime_ns
+
+def _fsync_file(path: Path):
+    """
+    Force l'écriture sur disque du contenu d'un fichier.
+
+    PRE: path est un fichier existant.
+    POST: Le contenu de path survit à un arrêt brutal du système.
+    """
+    with open(path, "rb+") as written:
+        os.fsync(written.fileno())
+
+def _fsync_directory(path: Path):
+    """
+    Force l'écriture sur disque des entrées d'un dossier (créations, renommages).
+
+    PRE: path est un dossier existant.
+    POST: Les renommages faits dans path survivent à un arrêt brutal. Sans effet sous Windows,
+          qui ne permet pas d'ouvrir un dossier.
+    """
+    if os.name == "nt":
+        return
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+@contextlib.contextmanager
+def atomic_write(path: Path):
+    """
+    Remplace un fichier d'un seul coup : le contenu est écrit à côté, forcé sur disque, puis renommé.
+
+    Un arrêt pendant l'écriture laisse l'ancien fichier intact, sans copie de sauvegarde :
+    seul le fichier temporaire est perdu.
+
+    PRE: path est le chemin final. Le bloc with écrit le contenu complet dans le chemin
+         temporaire qui lui est donné.
+    POST: path contient l'ancien contenu ou le nouveau en entier, jamais un fichier tronqué.
+          Si le bloc échoue, le fichier temporaire est supprimé et path est inchangé.
+    """
+    path = Path(path)
+    temporary_path = path.with_name(path.name + ".tmp")
+    try:
+        yield temporary_path
+        _fsync_file(temporary_path)
+        os.replace(temporary_path, path)
+    except BaseException:
+        temporary_path.unlink(missing_ok=True)
+        raise
+    _fsync_directory(path.parent)
+
+def metrics_report() -> dict:
+    """
+    Retourne une copie des mesures, sérialisable en JSON.
+
+    PRE: /
+    POST: Retourne {opération: {calls, seconds, rows, bytes_read, bytes_written, peak_memory_mb}}.
+    """
+    with _metrics_lock:
+        return {operation: dict(entry) for operation, entry in metrics.items()}
+
+def reset_metrics():
+    """
+    PRE: /
+    POST: Les mesures sont remises à zéro.
+    """
+    with _metrics_lock:
+        metrics.clear()
+
+def csv_options() -> dict:
+    """
+    Retourne les options de pd.read_csv qui appliquent le schéma dès la lecture.
+
+    PRE: /
+    POST: Retourne {na_values, keep_default_na, dtype} pour les colonnes textuelles du schéma.
+    """
+    return {
+        "na_values": NULL_VALUES,
+        "keep_default_na": True,
+        "dtype": {column: "category" for column, kind in INVENTORY_SCHEMA.items() if kind == "category"},
+    }
+
+def _smallest_integer(column: pd.Series) -> pd.Series:
+    """
+    Convertit une colonne entière vers le plus petit type entier qui contient ses valeurs.
+
+    PRE: column est une Series numérique.
+    POST: Retourne la colonne en int8/16/32/64, ou Int8/16/32/64 si elle contient des valeurs
+          manquantes. Une colonne qui contient des décimales, ou déjà d'un type entier réduit,
+          est laissée telle quelle (sans parcourir ses valeurs).
+    """
+    if pd.api.types.is_integer_dtype(column) and column.dtype.itemsize < 8:
+        return column
+    present = column.dropna()
+    if present.empty or not (present == np.floor(present)).all():
+        return column
+    for bits in (8, 16, 32, 64):
+        limits = np.iinfo(f"int{bits}")
+        if limits.min <= present.min() and present.max() <= limits.max:
+            return column.astype(f"int{bits}" if len(present) == len(column) else f"Int{bits}")
+    return column
+
+def apply_schema(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applique INVENTORY_SCHEMA aux colonnes présentes d'un DataFrame.
+
+    PRE: frame est un DataFrame.
+    POST: Retourne frame avec des catégories pour le texte, le plus petit type entier pour les
+          quantités et float64 pour les prix. Les colonnes hors schéma sont inchangées.
+    """
+    converted = {}
+    for column, kind in INVENTORY_SCHEMA.items():
+        if column not in frame.columns:
+            continue
+        if kind == "category" and not isinstance(frame[column].dtype, pd.CategoricalDtype):
+            converted[column] = frame[column].astype("category")
+        elif kind == "integer" and pd.api.types.is_numeric_dtype(frame[column]):
+            converted[column] = _smallest_integer(frame[column])
+        elif kind == "float64" and pd.api.types.is_numeric_dtype(frame[column]):
+            converted[column] = frame[column].astype("float64")
+    return frame.assign(**converted) if converted else frame
+
+@instrumented("concat")
+def concat_inventory(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatène des DataFrames d'inventaire en conservant les types du schéma.
+
+    Les dictionnaires de catégories sont réunis avant la concaténation, sans quoi pandas
+    retomberait sur des chaînes de caractères.
+
+    PRE: frames est une liste de DataFrames (éventuellement vides).
+    POST: Retourne la concaténation, index renuméroté, avec les types de apply_schema.
+    """
+    frames = [frame for frame in frames if len(frame.columns)]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return apply_schema(frames[0].reset_index(drop=True))
+    for column, kind in INVENTORY_SCHEMA.items():
+        parts = [frame[column] for frame in frames if column in frame.columns]
+        if kind != "category" or not parts or not all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            continue
+        categories = pd.Index(pd.unique(np.concatenate([part.cat.categories.to_numpy() for part in parts])))
+        frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)})
+                  if column in frame.columns else frame for frame in frames]
+    return apply_schema(pd.concat(frames, ignore_index=True))
+
+def _read_csv_file(file_path: str) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Lit un fichier CSV sans rien afficher, en collectant les messages destinés à l'utilisateur.
+
+    PRE: file_path est un chemin vers un fichier CSV.
+    POST: Retourne (données, messages) où messages est une liste de (niveau, texte).
+          Les données sont vides si la lecture a échoué.
+    """
+    messages = [(logging.DEBUG, f"Tentative de chargement du fichier : {file_path}")]
+    try:
+        with track("read_csv") as counters:
+            data = apply_schema(pd.read_csv(file_path, **csv_options()))
+            counters.update(rows=len(data), bytes_read=_file_size(file_path))
+        return data, messages
+    except FileNotFoundError:
+        messages.append((logging.WARNING, f"Fichier non trouvé : {file_path}"))
+    except pd.errors.ParserError:
+        messages.append((logging.WARNING, f"Erreur de format dans le fichier CSV : {file_path}"))
+    except Exception as e:
+        messages.append((logging.ERROR, f"Erreur inattendue lors du chargement : {e}"))
+    return pd.DataFrame(), messages
+
+@instrumented("load_csv")
 def load_csv(file_path: str) -> pd.DataFrame:
     """
     Charge un fichier CSV en DataFrame.
@@ -13,144 +396,2465 @@ def load_csv(file_path: str) -> pd.DataFrame:
     PRE: file_path est un chemin valide vers un fichier CSV.
     POST: Retourne un DataFrame contenant les données du fichier CSV.
     """
+    data, messages = _read_csv_file(file_path)
+    for level, message in messages:
+        logger.log(level, message)
+    if not data.empty:
+        logger.debug("Contenu chargé :\n%s", data)
+    return data
+
+def _ingest_file(file_path: str) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Lit et valide un fichier d'inventaire. Exécutable dans un processus de travail.
+
+    PRE: file_path est un chemin vers un fichier CSV.
+    POST: Retourne (données, messages) où messages est une liste de (niveau, texte).
+          Les données sont vides si le fichier est illisible ou ne respecte pas le schéma attendu.
+    """
+    data, messages = _read_csv_file(file_path)
+    if not data.empty:
+        error = check_chunk_schema(data)
+        if error:
+            messages.append((logging.WARNING, f"Fichier ignoré {file_path} : {error}"))
+            data = pd.DataFrame()
+    return data, messages
+
+def _map_files(function, workers: int, *iterables):
+    """
+    Applique function à chaque fichier, séquentiellement ou sur un pool de processus.
+
+    PRE: function est une fonction de niveau module, workers est un entier >= 1.
+    POST: Retourne les résultats dans l'ordre des fichiers, quel que soit l'ordre de fin des processus.
+    """
+    if workers <= 1:
+        return map(function, *iterables)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, *iterables))
+
+def row_keys(frame: pd.DataFrame) -> np.ndarray:
+    """
+    Calcule l'empreinte de la clé (Product, Category, Color) de chaque ligne.
+
+    PRE: frame est un DataFrame typé par apply_schema ; une colonne de clé absente vaut NaN.
+    POST: Retourne un tableau uint64 aligné sur les lignes de frame. Deux lignes de même clé
+          ont la même empreinte, quel que soit le dictionnaire de catégories de leur lot.
+    """
+    keys = frame.reindex(columns=ROW_KEY_COLUMNS).astype("category")
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+def resolve_upserts(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ne garde qu'une ligne par clé : la dernière écrite, à la place de la première.
+
+    Les lignes mises à jour restent donc à leur position d'origine, comme en mémoire après
+    consolidate_files.
+
+    PRE: frame est la concaténation, dans l'ordre d'écriture, de lots de lignes.
+    POST: Retourne frame sans doublons de clé, index renuméroté.
+    """
+    if frame.empty or not any(column in frame.columns for column in ROW_KEY_COLUMNS):
+        return frame
+    codes, _ = pd.factorize(row_keys(frame))
+    if len(np.unique(codes)) == len(frame):
+        return frame
+    last = np.zeros(codes.max() + 1, dtype=np.int64)
+    np.maximum.at(last, codes, np.arange(len(frame)))
+    return frame.take(last).reset_index(drop=True)
+
+def _file_digest(file_path: Path) -> str:
+    """
+    Calcule l'empreinte SHA-256 du contenu d'un fichier, sans l'analyser.
+
+    PRE: file_path est un chemin vers un fichier.
+    POST: Retourne l'empreinte hexadécimale, ou None si le fichier n'est pas lisible.
+    """
+    digest = hashlib.sha256()
     try:
-        print(f"Tentative de chargement du fichier : {file_path}")
-        data = pd.read_csv(file_path)
-        print(f"Contenu chargé :\n{data}")
-        return data
-    except FileNotFoundError:
-        print(f"Fichier non trouvé : {file_path}")
-    except pd.errors.ParserError:
-        print(f"Erreur de format dans le fichier CSV : {file_path}")
-    except Exception as e:
-        print(f"Erreur inattendue lors du chargement : {e}")
-    return pd.DataFrame()
+        with open(file_path, "rb") as source:
+            for block in iter(lambda: source.read(1 << 20), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
 
-def consolidate_files(file_paths: list[Path]):
+def _ingest_files(file_paths: list[Path], digests: dict, workers: int) -> tuple[list[pd.DataFrame], dict]:
     """
-    Consolide plusieurs fichiers CSV en une base de données unique.
+    Lit et valide des fichiers à consolider, en parallèle si workers > 1.
 
-    PRE: file_paths est une liste de chemins vers des fichiers CSV.
-    POST: Met à jour la base de données consolidée et la sauvegarde.
+    PRE: file_paths et digests viennent de _unchanged_sources, workers est un entier >= 1.
+    POST: Retourne (DataFrames non vides dans l'ordre de file_paths, {chemin: (empreinte, lignes lues)}).
+          Les fichiers vides ou en erreur sont signalés et ignorés.
     """
-    global database
     frames = []
-    for file_path in file_paths:
-        data = load_csv(str(file_path))
+    sources = {}
+    results = _map_files(_ingest_file, workers, [str(file_path) for file_path in file_paths])
+    for file_path, (data, messages) in zip(file_paths, results):
+        for level, message in messages:
+            logger.log(level, message)
         if not data.empty:
-            print(f"Données chargées depuis {file_path} :\n{data.head()}")
+            logger.debug("Données chargées depuis %s :\n%s", file_path, data.head())
             frames.append(data)
+            sources[file_path] = (digests[file_path], len(data))
         else:
-            print(f"Fichier vide ou non valide : {file_path}")
-    if frames:
-        database = pd.concat([database] + frames, ignore_index=True)
-        print("Base consolidée mise à jour avec succès.")
-        save_database()
-    else:
-        print("Aucun fichier valide à consolider.")
+            logger.warning("Fichier vide ou non valide : %s", file_path)
+    return frames, sources
 
-def save_database():
+def _latest_rows(batch: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray, int]:
     """
-    Sauvegarde la base de données consolidée dans un fichier CSV.
+    Ne garde que la dernière ligne de chaque clé d'un lot.
 
-    PRE: La base de données peut être vide ou non.
-    POST: Sauvegarde la base dans un fichier "consolidated_database.csv".
+    PRE: batch est un DataFrame typé par apply_schema.
+    POST: Retourne (lot sans doublons de clé, empreintes de ses clés, nombre de lignes écartées).
     """
-    global database
-    if not database.empty:
-        database.to_csv("consolidated_database.csv", index=False)
-        print("Base consolidée sauvegardée.")
-    else:
-        print("La base consolidée est vide, aucune sauvegarde effectuée.")
+    keys = row_keys(batch)
+    latest = ~pd.Series(keys).duplicated(keep="last").to_numpy()
+    return batch[latest].reset_index(drop=True), keys[latest], int(len(batch) - latest.sum())
+
+def upsert_rows(existing: pd.DataFrame, existing_keys: pd.Index, batch: pd.DataFrame,
+                batch_keys: np.ndarray) -> tuple[pd.DataFrame, np.ndarray, dict]:
+    """
+    Applique un lot de lignes comme des upserts sur un DataFrame.
 
-def load_database():
+    Une clé inconnue est ajoutée à la fin, une clé connue remplace la ligne existante à sa
+    place, une ligne identique à l'existante est ignorée.
+
+    PRE: existing_keys sont les empreintes de clé des lignes de existing, batch vient de
+         _latest_rows et batch_keys sont ses empreintes.
+    POST: Retourne (DataFrame résultant, positions triées des lignes remplacées,
+          {inserted, updated, skipped}). Les lignes insérées suivent les len(existing) premières.
+    """
+    offset = len(existing)
+    matches = existing_keys.get_indexer(batch_keys)
+    combined = concat_inventory([existing, batch])
+    matched = np.flatnonzero(matches >= 0)
+    old_positions = matches[matched]
+    new_positions = offset + matched
+    changed = (pd.util.hash_pandas_object(combined.iloc[old_positions], index=False).to_numpy()
+               != pd.util.hash_pandas_object(combined.iloc[new_positions], index=False).to_numpy())
+    updated = old_positions[changed]
+    inserted = offset + np.flatnonzero(matches < 0)
+    order = np.concatenate([np.arange(offset), inserted])
+    order[updated] = new_positions[changed]
+    counts = {"inserted": len(inserted), "updated": len(updated), "skipped": len(matched) - len(updated)}
+    return combined.take(order).reset_index(drop=True), np.sort(updated), counts
+
+def check_chunk_schema(chunk: pd.DataFrame, header: list[str] = None) -> str:
     """
-    Charge la base de données consolidée à partir d'un fichier CSV.
+    Vérifie qu'un bloc de données respecte le schéma de la base consolidée.
 
-    PRE: Le fichier "consolidated_database.csv" peut exister ou non.
-    POST: Charge la base de données dans le programme ou initialise une base vide.
+    PRE: chunk est un DataFrame, header est None ou la liste des colonnes du segment en cours d'écriture.
+    POST: Retourne None si le bloc est valide, sinon un message décrivant l'erreur.
     """
-    global database
+    missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+    if missing:
+        return f"colonnes manquantes : {', '.join(missing)}"
+    if header is not None:
+        extra = [column for column in chunk.columns if column not in header]
+        if extra:
+            return f"colonnes inconnues du segment en cours : {', '.join(extra)}"
+    for column in NUMERIC_COLUMNS:
+        if not pd.api.types.is_numeric_dtype(chunk[column]):
+            return f"la colonne '{column}' n'est pas numérique"
+    return None
+
+def _stream_file(file_path: str, chunksize: int, segment_path: Path) -> tuple[int, list[str], pd.DataFrame]:
+    """
+    Copie un fichier CSV bloc par bloc dans un segment. Exécutable dans un processus de travail.
+
+    PRE: file_path est un chemin vers un fichier CSV, chunksize est un entier > 0,
+         segment_path est un segment réservé et non encore écrit.
+    POST: Retourne (lignes écrites, messages (niveau, texte), delta du récapitulatif des blocs écrits).
+          Les blocs invalides sont ignorés et signalés.
+    """
+    messages = []
+    rows = 0
+    header = None
+    delta = summary_delta(pd.DataFrame(columns=REPORT_COLUMNS))
     try:
-        database = pd.read_csv("consolidated_database.csv")
-        print("Base consolidée chargée avec succès.")
+        for number, chunk in enumerate(pd.read_csv(file_path, chunksize=chunksize, **csv_options())):
+            error = check_chunk_schema(chunk, header)
+            if error:
+                messages.append((logging.WARNING, f"Bloc {number} ignoré dans {file_path} : {error}"))
+                continue
+            write_header = header is None
+            if write_header:
+                header = list(chunk.columns)
+            chunk.reindex(columns=header).to_csv(
+                segment_path, mode="a", header=write_header, index=False
+            )
+            delta = merge_summaries(delta, summary_delta(chunk))
+            rows += len(chunk)
     except FileNotFoundError:
-        print("Aucune base consolidée trouvée, démarrage avec une base vide.")
-        database = pd.DataFrame()
+        messages.append((logging.WARNING, f"Fichier non trouvé : {file_path}"))
+    except pd.errors.EmptyDataError:
+        messages.append((logging.WARNING, f"Fichier vide ou non valide : {file_path}"))
+    except pd.errors.ParserError:
+        messages.append((logging.WARNING, f"Erreur de format dans le fichier CSV : {file_path}"))
+    if rows:
+        _fsync_file(segment_path)
+    return rows, messages, delta
 
-def search_inventory(criteria: str, value: str):
+def _table_columns(path: Path) -> list[str]:
     """
-    Recherche des éléments dans la base de données selon un critère et une valeur donnés.
+    Lit la liste des colonnes d'un fichier du store sans lire les données.
 
-    PRE: criteria est une colonne existante dans la base de données.
-    POST: Affiche les résultats correspondants à la recherche.
+    PRE: path est un fichier CSV, Parquet, Feather ou Arrow existant.
+    POST: Retourne les noms de colonnes du fichier.
     """
-    global database
-    if criteria not in database.columns:
-        print(f"Critère '{criteria}' non valide. Colonnes disponibles : {', '.join(database.columns)}")
-        return
+    if path.suffix == ".parquet":
+        import pyarrow.parquet
+        return pyarrow.parquet.read_schema(path).names
+    if path.suffix in (".feather", ".arrow"):
+        import pyarrow.ipc
+        with pyarrow.ipc.open_file(path) as reader:
+            return reader.schema.names
+    return list(pd.read_csv(path, nrows=0).columns)
 
-    if value.lower() == "nan":
-        results = database[pd.isnull(database[criteria])]
-    else:
-        column_type = database[criteria].dtype
-        try:
-            if column_type == 'int64':
-                value = int(value)
-            elif column_type == 'float64':
-                value = float(value)
-        except ValueError:
-            print(f"Impossible de convertir la valeur '{value}' au type attendu ({column_type}).")
-            return
+def _read_mapped(path: Path, columns: list[str] = None) -> pd.DataFrame:
+    """
+    Projette un fichier Arrow IPC non compressé en mémoire, sans le lire.
 
-        results = database[database[criteria] == value]
+    Les colonnes numériques sans valeurs manquantes sont des vues sur la projection : le
+    système charge leurs pages à la première lecture, et plusieurs processus qui ouvrent le
+    même fichier partagent ces pages dans le cache du système.
 
-    if results.empty:
-        print("Aucun résultat trouvé.")
-    else:
-        print(f"Résultats trouvés pour {criteria} = {value} :\n{results}")
+    PRE: path est un fichier écrit par write_table avec l'extension ".arrow".
+    POST: Retourne un DataFrame limité aux colonnes demandées.
+    """
+    import pyarrow
+    import pyarrow.ipc
+    table = pyarrow.ipc.open_file(pyarrow.memory_map(str(path))).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas(split_blocks=True)
 
-def generate_report(output_path: str = None):
+def read_table(path: Path, columns: list[str] = None) -> pd.DataFrame:
     """
-    Génère un rapport récapitulatif sous forme de tableau.
+    Lit un fichier du store, au format déduit de son extension.
 
-    PRE: La base de données contient les colonnes 'Product', 'Category', 'Quantity', et 'UnitPrice'.
-    POST: Affiche un tableau dans la console et sauvegarde un fichier CSV si un chemin est fourni.
+    PRE: path est un fichier CSV, Parquet, Feather ou Arrow existant.
+         columns est None (toutes les colonnes) ou une liste de noms de colonnes.
+    POST: Retourne un DataFrame limité aux colonnes demandées présentes dans le fichier,
+          typé selon INVENTORY_SCHEMA.
     """
-    global database
-    if database.empty:
-        print("La base consolidée est vide. Aucun rapport à générer.")
-        return
+    if columns is not None:
+        available = _table_columns(path)
+        columns = [column for column in columns if column in available]
+    with track("read_table") as counters:
+        if path.suffix == ".parquet":
+            frame = pd.read_parquet(path, columns=columns)
+        elif path.suffix == ".feather":
+            frame = pd.read_feather(path, columns=columns)
+        elif path.suffix == ".arrow":
+            frame = _read_mapped(path, columns)
+        else:
+            frame = pd.read_csv(path, usecols=columns, **csv_options())
+        counters.update(rows=len(frame), bytes_read=_file_size(path))
+    return apply_schema(frame)
+
+def write_table(frame: pd.DataFrame, path: Path):
+    """
+    Écrit un DataFrame dans un fichier du store, au format déduit de son extension.
+
+    Le fichier est écrit par atomic_write : une écriture interrompue ne tronque jamais
+    l'ancien fichier, et une base projetée en mémoire par _read_mapped n'est jamais
+    modifiée sous les pieds de ses lecteurs.
+
+    PRE: frame est un DataFrame, path a une extension de STORAGE_FORMATS.
+    POST: Le fichier path contient frame, types des colonnes compris pour Parquet, Feather et Arrow.
+    """
+    with track("write_table") as counters:
+        with atomic_write(path) as temporary_path:
+            if path.suffix == ".parquet":
+                frame.to_parquet(temporary_path, index=False)
+            elif path.suffix == ".feather":
+                frame.reset_index(drop=True).to_feather(temporary_path)
+            elif path.suffix == ".arrow":
+                import pyarrow
+                import pyarrow.ipc
+                table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+                with pyarrow.OSFile(str(temporary_path), "wb") as sink, pyarrow.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            else:
+                frame.to_csv(temporary_path, index=False)
+        counters.update(rows=len(frame), bytes_written=_file_size(path))
+
+def _consolidate_shard(source: str, batch: pd.DataFrame, target: str) -> tuple[int, dict]:
+    """
+    Applique un lot d'upserts à une partition et l'écrit dans un nouveau fichier.
+
+    Fonction de niveau module : les partitions sont consolidées en parallèle par _map_files.
 
-    summary = database.groupby(['Category', 'Product']).agg(
-        TotalQuantity=('Quantity', 'sum'),
-        TotalValue=('UnitPrice', lambda x: (x * database.loc[x.index, 'Quantity']).sum())
-    ).reset_index()
+    PRE: source est le fichier actuel de la partition ou None pour une nouvelle partition,
+         batch vient de _latest_rows et ne contient que des lignes de cette partition,
+         target est un chemin de fichier inutilisé.
+    POST: Si des lignes ont été insérées ou modifiées, target contient la partition complète
+          et son récapitulatif est écrit à côté (extension ".summary.csv").
+          Retourne (nombre de lignes de la partition, {inserted, updated, skipped}).
+    """
+    existing = read_table(Path(source)) if source else pd.DataFrame()
+    existing_keys = pd.Index(row_keys(existing) if not existing.empty else [], dtype="uint64")
+    merged, _, counts = upsert_rows(existing, existing_keys, batch, row_keys(batch))
+    if counts["inserted"] or counts["updated"]:
+        write_table(merged, Path(target))
+        if all(column in merged.columns for column in REPORT_COLUMNS):
+            with atomic_write(Path(target).with_suffix(".summary.csv")) as summary_path:
+                summary_delta(merged).reset_index().to_csv(summary_path, index=False)
+    return len(merged), counts
+
+def _hash_index(column: pd.Series, offset: int = 0) -> dict:
+    """
+    Construit un index d'égalité sur une colonne.
+
+    PRE: column est une Series, offset est la position de sa première ligne dans la base.
+    POST: Retourne {"kind": "hash", "values": {valeur: positions}, "nulls": positions des valeurs manquantes}.
+    """
+    groups = column.groupby(column, sort=False, dropna=True, observed=True).indices
+    return {
+        "kind": "hash",
+        "values": {value: positions + offset for value, positions in groups.items()},
+        "nulls": np.flatnonzero(column.isna().to_numpy()) + offset,
+    }
+
+def _sorted_index(column: pd.Series, offset: int = 0) -> dict:
+    """
+    Construit un index trié sur une colonne numérique.
+
+    PRE: column est une Series numérique, offset est la position de sa première ligne dans la base.
+    POST: Retourne {"kind": "sorted", "values": valeurs triées (float64 quel que soit le type
+          compact de la colonne), "positions": positions correspondantes,
+          "nulls": positions des valeurs manquantes}.
+    """
+    values = column.to_numpy(dtype="float64", na_value=np.nan)
+    present = np.flatnonzero(~column.isna().to_numpy())
+    order = present[np.argsort(values[present], kind="stable")]
+    return {
+        "kind": "sorted",
+        "values": values[order],
+        "positions": order + offset,
+        "nulls": np.flatnonzero(column.isna().to_numpy()) + offset,
+    }
+
+class QueryCache:
+    """
+    Cache LRU de résultats, borné en nombre d'entrées.
+
+    Les clés commencent par la version de la base : un résultat calculé sur une version
+    antérieure n'est jamais servi. Les méthodes peuvent être appelées depuis plusieurs threads.
+    """
+
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE):
+        """
+        PRE: maxsize est un entier >= 0 (0 désactive le cache).
+        POST: Le cache est vide, ses compteurs sont à zéro.
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        PRE: key est hachable.
+        POST: Retourne la valeur associée à key (entrée marquée comme récente), ou None.
+        """
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def peek(self, key):
+        """
+        PRE: key est hachable.
+        POST: Retourne la valeur associée à key, ou None, sans modifier l'ordre des entrées ni
+              les compteurs.
+        """
+        with self._lock:
+            return self.entries.get(key)
+
+    def put(self, key, value):
+        """
+        PRE: key est hachable, value n'est pas None.
+        POST: value est associée à key ; les entrées les moins récentes sont évincées au-delà de maxsize.
+        """
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self, version: int = None):
+        """
+        PRE: version est None ou la nouvelle version de la base.
+        POST: Le cache est vide, les compteurs sont conservés.
+        """
+        with self._lock:
+            self.entries.clear()
+            if version is not None:
+                self.version = version
+
+    def stats(self) -> dict:
+        """
+        PRE: /
+        POST: Retourne {hits, misses, size, maxsize, version}.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.entries),
+                    "maxsize": self.maxsize, "version": self.version}
+
+def parse_query(text: str) -> list[list[tuple[str, str, str]]]:
+    """
+    Analyse une requête textuelle, par exemple "Quantity<5 AND Color=Red OR Product^=Pa".
+
+    Opérateurs : = != < <= > >= (comparaison), ^= (préfixe), ~= (sous-chaîne).
+    AND est prioritaire sur OR. La valeur "nan" désigne une valeur manquante pour = et !=.
+    Une valeur peut être entourée de guillemets. AND et OR ne séparent deux prédicats que hors
+    des guillemets et devant un nouveau prédicat : Category=Lawn and Garden et
+    Product="Black and Decker" ne sont pas coupés.
+
+    PRE: text est une chaîne non vide.
+    POST: Retourne une liste de groupes OR, chacun étant une liste de prédicats AND
+          (colonne, opérateur, valeur brute). Lève ValueError si la syntaxe est invalide.
+    """
+    text = text.strip()
+    predicates, start = [], 0
+    for match in _QUERY_TOKEN_PATTERN.finditer(text):
+        if match.group(2):
+            predicates.append((text[start:match.start()], match.group(2).upper()))
+            start = match.end()
+    predicates.append((text[start:], None))
+
+    groups, group = [], []
+    for predicate_text, keyword in predicates:
+        match = _PREDICATE_PATTERN.match(predicate_text)
+        if not match:
+            raise ValueError(f"Prédicat invalide : '{predicate_text}'")
+        column, operator, value = match.groups()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        group.append((column, operator, value))
+        if keyword != "AND":
+            groups.append(group)
+            group = []
+    return groups
+
+def _matching_keys(index: dict, operator: str, value: str) -> list:
+    """
+    Retourne les clés d'un index d'égalité qui commencent par ou contiennent value.
+
+    PRE: index est un index "hash", operator vaut "^=" ou "~=".
+    POST: Retourne la liste des clés correspondantes (coût proportionnel au nombre de valeurs distinctes).
+    """
+    if operator == "^=":
+        return [key for key in index["values"] if str(key).startswith(value)]
+    return [key for key in index["values"] if value in str(key)]
 
-    print("\n=== Rapport Récapitulatif ===")
-    print(tabulate(summary, headers='keys', tablefmt='grid', showindex=False))
+def _sorted_range(index: dict, operator: str, value) -> tuple[int, int]:
+    """
+    Retourne la tranche [start, stop) des valeurs d'un index trié qui satisfont le prédicat.
 
-    if output_path:
-        summary.to_csv(output_path, index=False)
-        print(f"Rapport sauvegardé avec succès : {output_path}")
+    PRE: index est un index "sorted", operator est une comparaison.
+    POST: Retourne (start, stop).
+    """
+    values = index["values"]
+    if operator == "=":
+        return np.searchsorted(values, value, "left"), np.searchsorted(values, value, "right")
+    if operator == "<":
+        return 0, np.searchsorted(values, value, "left")
+    if operator == "<=":
+        return 0, np.searchsorted(values, value, "right")
+    if operator == ">":
+        return np.searchsorted(values, value, "right"), len(values)
+    return np.searchsorted(values, value, "left"), len(values)
 
-def show_data():
+def _predicate_mask(column: pd.Series, operator: str, value) -> np.ndarray:
     """
-    Affiche les données consolidées.
+    Évalue un prédicat sur une colonne de façon vectorisée.
 
-    PRE: La base consolidée peut être vide ou non.
-    POST: Affiche les données dans la console.
+    PRE: value est convertie au type de la colonne.
+    POST: Retourne un tableau booléen de la longueur de column.
     """
-    global database
-    if database.empty:
-        print("La base consolidée est vide.")
+    if value is None:
+        mask = column.isna() if operator == "=" else column.notna()
+    elif operator in ("^=", "~="):
+        text = column.astype(str).str
+        found = text.startswith(value) if operator == "^=" else text.contains(value, regex=False)
+        mask = column.notna() & found
     else:
-        print("Données consolidées :")
-        print(database)
+        if isinstance(column.dtype, pd.CategoricalDtype) and operator not in ("=", "!="):
+            column = column.astype(object)
+        mask = {
+            "=": column.__eq__, "!=": column.__ne__, "<": column.__lt__,
+            "<=": column.__le__, ">": column.__gt__, ">=": column.__ge__,
+        }[operator](value)
+    return mask.to_numpy(dtype=bool)
+
+def _report_values(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prépare les colonnes du rapport et la valeur de chaque ligne.
+
+    PRE: frame contient les colonnes de REPORT_COLUMNS.
+    POST: Retourne ces colonnes avec Quantity élargie à 64 bits (les sommes ne débordent pas
+          du type compact du schéma) et une colonne Value = Quantity * UnitPrice.
+    """
+    values = frame[REPORT_COLUMNS]
+    quantity = values["Quantity"]
+    if pd.api.types.is_integer_dtype(quantity):
+        quantity = quantity.astype("Int64" if isinstance(quantity.dtype, pd.api.extensions.ExtensionDtype) else "int64")
+    return values.assign(Quantity=quantity, Value=quantity * values["UnitPrice"])
+
+def _string_keys(grouped: pd.DataFrame) -> pd.DataFrame:
+    """
+    Remplace les catégories de l'index (Category, Product) par des chaînes.
+
+    Les lots n'ont pas les mêmes dictionnaires de catégories : des clés en chaînes se
+    combinent et se sauvegardent sans dépendre du lot d'origine.
+
+    PRE: grouped est indexé par (Category, Product).
+    POST: Retourne grouped avec un index de chaînes de caractères, trié par ordre alphabétique
+          (l'ordre des catégories est celui de leur apparition).
+    """
+    names = list(grouped.index.names)
+    grouped.index = pd.MultiIndex.from_arrays(
+        [grouped.index.get_level_values(name).astype(str) for name in names], names=names)
+    return grouped.sort_index()
+
+def compute_report(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcule le récapitulatif par (Category, Product) en une seule agrégation vectorisée.
+
+    La valeur de chaque ligne (Quantity * UnitPrice) est calculée une fois pour toute la
+    colonne, puis toutes les agrégations sont faites par le même groupby.
+
+    PRE: frame contient les colonnes 'Product', 'Category', 'Quantity' et 'UnitPrice'.
+    POST: Retourne un DataFrame trié par (Category, Product) avec les colonnes TotalQuantity,
+          TotalValue, MeanUnitPrice, MinQuantity, MaxQuantity et RowCount.
+    """
+    with track("groupby") as counters:
+        values = _report_values(frame)
+        counters["rows"] = len(values)
+        return _string_keys(values.groupby(['Category', 'Product'], sort=True, observed=True).agg(
+            TotalQuantity=('Quantity', 'sum'),
+            TotalValue=('Value', 'sum'),
+            MeanUnitPrice=('UnitPrice', 'mean'),
+            MinQuantity=('Quantity', 'min'),
+            MaxQuantity=('Quantity', 'max'),
+            RowCount=('Quantity', 'size')
+        )).reset_index()
+
+SUMMARY_COLUMNS = ["TotalQuantity", "TotalValue", "UnitPriceSum", "UnitPriceCount",
+                   "MinQuantity", "MaxQuantity", "RowCount"]
+
+def summary_delta(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcule les agrégats combinables du rapport pour un lot de lignes.
+
+    Les sommes, comptes, minimums et maximums se combinent entre lots sans relire les lignes.
+
+    PRE: frame contient les colonnes 'Product', 'Category', 'Quantity' et 'UnitPrice'.
+    POST: Retourne un DataFrame indexé par (Category, Product) avec les colonnes SUMMARY_COLUMNS.
+    """
+    with track("groupby") as counters:
+        values = _report_values(frame)
+        counters["rows"] = len(values)
+        return _string_keys(values.groupby(['Category', 'Product'], sort=True, observed=True).agg(
+            TotalQuantity=('Quantity', 'sum'),
+            TotalValue=('Value', 'sum'),
+            UnitPriceSum=('UnitPrice', 'sum'),
+            UnitPriceCount=('UnitPrice', 'count'),
+            MinQuantity=('Quantity', 'min'),
+            MaxQuantity=('Quantity', 'max'),
+            RowCount=('Quantity', 'size')
+        ))
+
+def merge_summaries(summary: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """
+    Combine deux récapitulatifs calculés par summary_delta.
+
+    PRE: summary et delta sont indexés par (Category, Product) avec les colonnes SUMMARY_COLUMNS.
+    POST: Retourne le récapitulatif de l'union des deux lots, en un temps proportionnel au nombre de groupes.
+    """
+    if delta.empty:
+        return summary
+    if summary.empty:
+        return delta
+    combined = pd.concat([summary, delta]).groupby(level=['Category', 'Product'], sort=True)
+    return combined.agg({
+        "TotalQuantity": "sum", "TotalValue": "sum", "UnitPriceSum": "sum", "UnitPriceCount": "sum",
+        "MinQuantity": "min", "MaxQuantity": "max", "RowCount": "sum",
+    })
+
+def summary_report(summary: pd.DataFrame) -> pd.DataFrame:
+    """
+    Met un récapitulatif matérialisé au format de compute_report.
+
+    PRE: summary vient de summary_delta ou merge_summaries.
+    POST: Retourne un DataFrame avec les mêmes colonnes que compute_report.
+    """
+    report = summary.reset_index()
+    report["MeanUnitPrice"] = report["UnitPriceSum"] / report["UnitPriceCount"]
+    return report[['Category', 'Product', 'TotalQuantity', 'TotalValue', 'MeanUnitPrice',
+                   'MinQuantity', 'MaxQuantity', 'RowCount']]
+
+def _summary_groups(frame: pd.DataFrame) -> pd.MultiIndex:
+    """
+    Retourne les groupes (Category, Product) du récapitulatif touchés par des lignes.
+
+    PRE: frame est un DataFrame.
+    POST: Retourne un MultiIndex de chaînes sans doublons, vide si frame n'a pas ces colonnes.
+    """
+    if frame.empty or not all(column in frame.columns for column in ['Category', 'Product']):
+        return pd.MultiIndex.from_arrays([[], []], names=['Category', 'Product'])
+    groups = frame[['Category', 'Product']].dropna().astype(str).drop_duplicates()
+    return pd.MultiIndex.from_frame(groups)
+
+def _integer_values(column: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convertit une colonne numérique en entiers exacts.
+
+    PRE: column est une Series de nombres entiers, éventuellement manquants.
+    POST: Retourne (valeurs en int64, 0 pour les manquantes ; masque des valeurs présentes).
+          Lève ValueError si une valeur présente n'est pas un entier.
+    """
+    try:
+        integers = pd.to_numeric(column).astype("Int64")
+    except (TypeError, ValueError):
+        raise ValueError(f"La colonne {column.name} doit contenir des entiers pour le rapport exact.") from None
+    return integers.to_numpy(dtype="int64", na_value=0), integers.notna().to_numpy()
+
+def exact_prices(frame: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Retourne le prix de chaque ligne sous forme de fraction d'entiers.
+
+    Les colonnes UnitPriceNum et UnitPriceDen sont utilisées là où elles sont renseignées ;
+    ailleurs, UnitPrice est arrondi au centime (numérateur en centimes, dénominateur PRICE_SCALE).
+
+    PRE: frame contient UnitPrice et éventuellement les colonnes EXACT_PRICE_COLUMNS.
+    POST: Retourne (numérateurs, dénominateurs > 0, masque des prix présents) en int64.
+          Lève ValueError si un dénominateur est nul ou si une colonne n'est pas entière.
+    """
+    prices = frame["UnitPrice"].to_numpy(dtype="float64", na_value=np.nan)
+    present = ~np.isnan(prices)
+    numerators = np.rint(np.where(present, prices, 0) * PRICE_SCALE).astype("int64")
+    denominators = np.full(len(frame), PRICE_SCALE, dtype="int64")
+    if all(column in frame.columns for column in EXACT_PRICE_COLUMNS):
+        numerator, numerator_present = _integer_values(frame["UnitPriceNum"])
+        denominator, denominator_present = _integer_values(frame["UnitPriceDen"])
+        rational = numerator_present & denominator_present
+        if (denominator[rational] == 0).any():
+            raise ValueError("Le dénominateur d'un prix ne peut pas être égal à zéro.")
+        sign = np.where(denominator < 0, -1, 1)
+        numerators = np.where(rational, numerator * sign, numerators)
+        denominators = np.where(rational, denominator * sign, denominators)
+        present = present | rational
+    return numerators, denominators, present
+
+def _reduced_fractions(numerators: np.ndarray, denominators: np.ndarray) -> list:
+    """
+    Réduit des fractions en une seule passe vectorisée.
+
+    PRE: numerators et denominators sont des tableaux d'entiers de même taille (int64 ou object),
+         un dénominateur nul marquant une valeur manquante.
+    POST: Retourne une liste de Fraction (None pour les valeurs manquantes).
+    """
+    divisors = np.gcd(numerators, denominators)
+    divisors = np.where(divisors == 0, 1, divisors)
+    return [Fraction(int(numerator), int(denominator)) if denominator else None
+            for numerator, denominator in zip(numerators // divisors, denominators // divisors)]
+
+def compute_exact_report(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcule le récapitulatif par (Category, Product) en arithmétique rationnelle exacte.
+
+    Tous les prix sont mis au même dénominateur (le PPCM des dénominateurs présents), puis
+    les numérateurs Quantity * prix sont sommés en entiers par un seul groupby : aucune
+    fraction n'est créée par ligne, et chaque total n'est réduit qu'une fois, à la fin.
+    Si un total pouvait dépasser INT64_MAX, les sommes sont faites en entiers Python (object).
+
+    PRE: frame contient les colonnes 'Product', 'Category', 'Quantity' (entiers) et 'UnitPrice',
+         et éventuellement les colonnes EXACT_PRICE_COLUMNS.
+    POST: Retourne un DataFrame avec les colonnes de compute_report ; TotalValue et
+          MeanUnitPrice y sont des Fraction exactes.
+    """
+    with track("groupby") as counters:
+        counters["rows"] = len(frame)
+        quantity, quantity_present = _integer_values(frame["Quantity"])
+        numerators, denominators, price_present = exact_prices(frame)
+        common = math.lcm(*np.unique(denominators[price_present]).tolist())
+        bound = (max(int(np.abs(quantity).max(initial=0)), 1) * int(np.abs(numerators).max(initial=0))
+                 * (common // int(denominators.min(initial=1))) * len(frame))
+        exact = "int64" if max(common, bound) <= INT64_MAX else object
+        quantity, numerators, denominators = (array.astype(exact) for array in (quantity, numerators, denominators))
+        scaled = np.where(price_present, numerators * (common // denominators), 0)
+        values = _report_values(frame).assign(
+            ValueNumerator=np.where(quantity_present, quantity * scaled, 0),
+            PriceNumerator=scaled,
+            PriceCount=price_present.astype("int64"))
+        grouped = _string_keys(values.groupby(['Category', 'Product'], sort=True, observed=True).agg(
+            TotalQuantity=('Quantity', 'sum'),
+            ValueNumerator=('ValueNumerator', 'sum'),
+            PriceNumerator=('PriceNumerator', 'sum'),
+            PriceCount=('PriceCount', 'sum'),
+            MinQuantity=('Quantity', 'min'),
+            MaxQuantity=('Quantity', 'max'),
+            RowCount=('Quantity', 'size')
+        )).reset_index()
+
+    value_numerators = grouped["ValueNumerator"].to_numpy().astype(exact)
+    price_numerators = grouped["PriceNumerator"].to_numpy().astype(exact)
+    counts = grouped["PriceCount"].to_numpy().astype(exact)
+    grouped["TotalValue"] = _reduced_fractions(value_numerators, np.full(len(grouped), common, dtype=exact))
+    grouped["MeanUnitPrice"] = _reduced_fractions(price_numerators, counts * common)
+    return grouped[['Category', 'Product', 'TotalQuantity', 'TotalValue', 'MeanUnitPrice',
+                    'MinQuantity', 'MaxQuantity', 'RowCount']]
+
+class DataViewer:
+    """
+    Curseur de pagination sur un DataFrame.
+
+    Seule la page demandée est extraite et mise en forme, quelle que soit la taille de la base.
+    """
+
+    def __init__(self, frame: pd.DataFrame, page_size: int = PAGE_SIZE, columns: list[str] = None):
+        """
+        PRE: frame est un DataFrame, page_size est un entier > 0,
+             columns est None (toutes) ou une liste de colonnes de frame.
+        POST: Le curseur est positionné sur la première page.
+        """
+        self.frame = frame
+        self.page_size = page_size
+        self.columns = columns
+        self.position = 0
 
-def interactive_mode():
+    @property
+    def page_count(self) -> int:
+        """
+        PRE: /
+        POST: Retourne le nombre de pages (au moins 1).
+        """
+        return max(1, -(-len(self.frame) // self.page_size))
+
+    def page(self, number: int = None) -> pd.DataFrame:
+        """
+        Retourne une page de données.
+
+        PRE: number est None (page courante) ou un numéro de page à partir de 0.
+        POST: Retourne au plus page_size lignes, limitées aux colonnes choisies.
+        """
+        number = self.position if number is None else number
+        rows = self.frame.iloc[number * self.page_size:(number + 1) * self.page_size]
+        return rows if self.columns is None else rows[self.columns]
+
+    def next(self) -> pd.DataFrame:
+        """
+        PRE: /
+        POST: Avance le curseur d'une page (sans dépasser la dernière) et la retourne.
+        """
+        self.position = min(self.position + 1, self.page_count - 1)
+        return self.page()
+
+    def previous(self) -> pd.DataFrame:
+        """
+        PRE: /
+        POST: Recule le curseur d'une page (sans dépasser la première) et la retourne.
+        """
+        self.position = max(self.position - 1, 0)
+        return self.page()
+
+    def render(self) -> str:
+        """
+        PRE: /
+        POST: Retourne la page courante mise en forme, suivie de sa position.
+        """
+        return f"{self.page()}\nPage {self.position + 1}/{self.page_count} ({len(self.frame)} lignes)"
+
+class ReadWriteLock:
+    """
+    Verrou lecteurs-rédacteur : plusieurs lectures simultanées ou une seule écriture.
+
+    Un rédacteur en attente bloque les nouveaux lecteurs, pour qu'un flot continu de
+    recherches ne retarde pas indéfiniment une consolidation. Le verrou n'est pas réentrant.
+    """
+
+    def __init__(self):
+        """
+        PRE: /
+        POST: Le verrou est libre.
+        """
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        """
+        PRE: Le thread ne détient pas déjà le verrou.
+        POST: Le thread détient le verrou en lecture.
+        """
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        """
+        PRE: Le thread détient le verrou en lecture.
+        POST: Le verrou en lecture est rendu.
+        """
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def read(self):
+        """
+        PRE: Le thread ne détient pas déjà le verrou.
+        POST: Le bloc s'exécute avec le verrou en lecture.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write(self):
+        """
+        PRE: Le thread ne détient pas déjà le verrou.
+        POST: Le bloc s'exécute seul, sans aucun lecteur.
+        """
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+class InventoryDatabase:
+    """
+    Base consolidée d'un inventaire : données en mémoire, store sur disque, index,
+    récapitulatif du rapport et cache des requêtes.
+
+    Les recherches et rapports prennent le verrou en lecture et s'exécutent en parallèle.
+    Une consolidation ou un chargement prépare la nouvelle base sans bloquer les lecteurs,
+    puis la publie sous le verrou en écriture : un lecteur voit l'ancienne base ou la
+    nouvelle, jamais un état intermédiaire. Les écritures sont exécutées une à une.
+    Plusieurs instances avec des chemins différents peuvent coexister dans un processus.
+    """
+
+    def __init__(self, path: str = DATABASE_FILE, storage_format: str = "csv", shard_key: str = None,
+                 cache_size: int = QUERY_CACHE_SIZE):
+        """
+        PRE: path est le chemin du fichier de base ; le store segmenté, le récapitulatif et les
+             partitions sont rangés à côté, sous le même nom avec une autre extension.
+             storage_format est une clé de STORAGE_FORMATS, shard_key est None ou une colonne
+             de ROW_KEY_COLUMNS, cache_size est un entier >= 0.
+        POST: La base en mémoire est vide ; load_database charge le store existant.
+        """
+        self.path = Path(path)
+        self.segments_dir = self.path.with_suffix(".segments")
+        self.summary_file = self.path.with_suffix(".summary.csv")
+        self.shards_dir = self.path.with_suffix(".shards")
+        self.database = pd.DataFrame()
+        self.lock = ReadWriteLock()
+        # Une seule écriture à la fois ; les structures construites à la demande pendant une
+        # lecture (index, récapitulatif, cache) sont protégées par _lazy_lock.
+        self._writer_lock = threading.RLock()
+        self._lazy_lock = threading.RLock()
+        self._store_lock = threading.Lock()
+        # Récapitulatif validé par une consolidation, écrit après le verrou d'écriture
+        self._summary_lock = threading.Lock()
+        self._pending_summary = None
+        # Vrai après une consolidation par blocs : la base est rechargée à la lecture suivante
+        self._stale = False
+        self._compaction_thread = None
+        self.storage_format = None
+        self.set_storage_format(storage_format)
+        self.shard_key = None
+        self.shard_catalog = None
+        self.loaded_shards = set()
+        self._shard_columns = None
+        self.set_shard_key(shard_key)
+        self.indexes = {}
+        self._indexed_database = None
+        self._key_index = pd.Index([], dtype="uint64")
+        self.report_summary = None
+        self._summarized_database = None
+        self.query_cache = QueryCache(cache_size)
+        self.database_version = 0
+        self._cached_database = None
+
+    @contextlib.contextmanager
+    def _reading(self, shards: list[str] = None):
+        """
+        Donne un accès en lecture à la base, avec les partitions demandées chargées.
+
+        PRE: shards est None (toutes les partitions) ou une liste de noms de partitions ;
+             ignoré si la base n'est pas partitionnée.
+        POST: Le bloc s'exécute sous le verrou en lecture.
+        """
+        while True:
+            self.load_shards(shards)
+            self.lock.acquire_read()
+            if self._has_shards(shards) and not self._stale:
+                break
+            self.lock.release_read()
+        try:
+            yield
+        finally:
+            self.lock.release_read()
+
+    def _unchanged_sources(self, file_paths: list[Path]) -> tuple[list[Path], dict, int]:
+        """
+        Sépare les fichiers déjà consolidés à l'identique des fichiers à lire.
+
+        PRE: file_paths est une liste de chemins vers des fichiers CSV.
+        POST: Retourne (fichiers à lire, {chemin: empreinte} de ces fichiers, lignes des fichiers ignorés).
+              Les empreintes enregistrées sont ignorées si le store est vide.
+        """
+        if self._store_is_empty():
+            known = {}
+        elif self.shard_key is not None:
+            known = self._read_catalog().get("sources", {})
+        else:
+            known = self._read_manifest().get("sources", {})
+        to_read, digests, skipped = [], {}, 0
+        for file_path in file_paths:
+            digest = _file_digest(file_path)
+            source = known.get(str(Path(file_path).resolve()))
+            if digest is not None and source is not None and source["sha256"] == digest:
+                logger.info("Fichier inchangé ignoré : %s", file_path)
+                skipped += source["rows"]
+                continue
+            to_read.append(file_path)
+            digests[file_path] = digest
+        return to_read, digests, skipped
+
+    def _record_sources(self, sources: dict):
+        """
+        Enregistre dans le manifeste (ou le catalogue des partitions) l'empreinte des fichiers consolidés.
+
+        PRE: sources est un dictionnaire {chemin: (empreinte, lignes lues)}.
+        POST: Une prochaine consolidation de ces fichiers inchangés est ignorée sans les lire.
+        """
+        if not sources:
+            return
+        with self._store_lock:
+            if self.shard_key is not None:
+                state = self._read_catalog()
+            else:
+                self.segments_dir.mkdir(exist_ok=True)
+                state = self._read_manifest()
+            known = state.setdefault("sources", {})
+            for file_path, (digest, rows) in sources.items():
+                if digest is not None:
+                    known[str(Path(file_path).resolve())] = {"sha256": digest, "rows": rows}
+            if self.shard_key is not None:
+                self._write_catalog(state)
+            else:
+                self._write_manifest(state)
+
+    @instrumented("consolidate_files")
+    def consolidate_files(self, file_paths: list[Path], chunksize: int = None, workers: int = 1):
+        """
+        Consolide plusieurs fichiers CSV en une base de données unique.
+
+        Un fichier dont le contenu n'a pas changé depuis sa dernière consolidation est ignoré
+        sans être lu. Les lignes sont appliquées comme des upserts sur la clé ROW_KEY_COLUMNS :
+        une clé inconnue est insérée, une clé connue met à jour la ligne existante (à sa place),
+        une ligne identique à l'existante est ignorée. Seules les lignes insérées ou modifiées
+        sont écrites sur disque, dans un nouveau segment du store.
+        Avec workers > 1, les fichiers sont lus et validés en parallèle ; les résultats sont
+        fusionnés dans l'ordre de file_paths. La nouvelle base est préparée pendant que les
+        recherches continuent sur l'ancienne, puis publiée d'un seul coup. Le récapitulatif mis
+        à jour est écrit sur disque après avoir rendu le verrou d'écriture.
+
+        PRE: file_paths est une liste de chemins vers des fichiers CSV.
+             chunksize est None ou un entier > 0, workers est un entier >= 1.
+        POST: Met à jour la base de données consolidée et ajoute les lignes modifiées au store.
+              Un fichier en erreur est signalé et ignoré sans interrompre les autres.
+              Retourne {inserted, updated, skipped} (nombres de lignes).
+              Si chunksize est donné, délègue à consolidate_files_streaming : la base en mémoire
+              n'est rechargée qu'à la lecture suivante. Si la base est partitionnée, délègue à consolidate_shards
+              (chunksize est alors ignoré).
+        """
+        counts = self._consolidate_files(file_paths, chunksize, workers)
+        self._flush_report_summary()
+        return counts
+
+    @exclusive
+    def _consolidate_files(self, file_paths: list[Path], chunksize: int = None, workers: int = 1):
+        """
+        PRE: Voir consolidate_files.
+        POST: Voir consolidate_files. Le récapitulatif mis à jour reste en attente d'écriture
+              (voir _flush_report_summary).
+        """
+        if self.shard_key is not None:
+            return self.consolidate_shards(file_paths, workers)
+        if chunksize:
+            return self.consolidate_files_streaming(file_paths, chunksize, workers)
+        self._refresh()
+        file_paths, digests, skipped = self._unchanged_sources(file_paths)
+        frames, sources = _ingest_files(file_paths, digests, workers)
+        counts = {"inserted": 0, "updated": 0, "skipped": skipped}
+        if not frames:
+            if not skipped:
+                logger.warning("Aucun fichier valide à consolider.")
+            return counts
+
+        batch, batch_keys, duplicates = _latest_rows(concat_inventory(frames))
+        self._ensure_indexes()
+        self._ensure_report_summary()
+        offset = len(self.database)
+        database, updated, changes = upsert_rows(self.database, self._key_index, batch, batch_keys)
+        counts.update(inserted=changes["inserted"], updated=changes["updated"],
+                      skipped=skipped + duplicates + changes["skipped"])
+        # Les lignes modifiées gardent leur position : les groupes touchés se cherchent dans l'ancienne base.
+        replaced = _summary_groups(database.iloc[updated])
+        touched = np.union1d(self._group_positions(replaced), np.arange(offset, len(database)))
+        delta = summary_delta(database.iloc[touched])
+
+        with self.lock.write():
+            self.database = database
+            self.invalidate_cache()
+            if len(updated):
+                self._update_indexes(updated)
+            self._extend_indexes(database.iloc[offset:], offset)
+            self._update_report_summary(delta, replaced)
+        logger.info("Base consolidée mise à jour avec succès.")
+        logger.info("%d lignes insérées, %d mises à jour, %d ignorées.",
+                    counts["inserted"], counts["updated"], counts["skipped"])
+        if len(updated) or len(database) > offset:
+            self.append_segment(database.iloc[np.concatenate([updated, np.arange(offset, len(database))])])
+        self._record_sources(sources)
+        return counts
+
+    @exclusive
+    def consolidate_files_streaming(self, file_paths: list[Path], chunksize: int = 100_000, workers: int = 1) -> dict:
+        """
+        Consolide des fichiers CSV par blocs de taille bornée, sans charger la base entière en mémoire.
+
+        Chaque fichier est écrit bloc par bloc dans un nouveau segment CSV du store (seul format
+        qui accepte des ajouts) ; la compaction le réécrit ensuite dans le format courant.
+        Les blocs invalides sont ignorés et signalés, les autres blocs du fichier sont conservés.
+        Un fichier inchangé depuis sa dernière consolidation est ignoré sans être lu. Les clés
+        déjà présentes ne sont pas comparées ici : les upserts sont résolus au chargement par
+        resolve_upserts.
+        Avec workers > 1, les fichiers sont copiés en parallèle et les segments enregistrés
+        dans l'ordre de file_paths.
+
+        PRE: file_paths est une liste de chemins vers des fichiers CSV, chunksize est un entier > 0,
+             workers est un entier >= 1.
+        POST: Un segment est ajouté au store par fichier contenant au moins un bloc valide.
+              La base en mémoire est vidée (elle n'est plus à jour) et marquée pour être
+              rechargée à la lecture suivante (voir _refresh). Le récapitulatif du rapport reste à jour sans rechargement si le
+              store était vide ; sinon les lignes écrites peuvent être des mises à jour et il est
+              recalculé au prochain chargement.
+              Retourne un dictionnaire {rows, skipped, seconds, rows_per_second, peak_memory} ;
+              peak_memory ne mesure que le processus principal.
+        """
+        file_paths, digests, skipped = self._unchanged_sources(file_paths)
+        if self._store_is_empty():
+            summary = summary_delta(pd.DataFrame(columns=REPORT_COLUMNS))
+        else:
+            summary = None
+            with self._summary_lock:
+                self._pending_summary = None
+                self.summary_file.unlink(missing_ok=True)
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        rows = 0
+        sources = {}
+        try:
+            segment_paths = [self._new_segment_path("csv") for _ in file_paths]
+            results = _map_files(_stream_file, workers, [str(file_path) for file_path in file_paths],
+                                 [chunksize] * len(file_paths), segment_paths)
+            for file_path, segment_path, (segment_rows, messages, delta) in zip(file_paths, segment_paths, results):
+                for level, message in messages:
+                    logger.log(level, message)
+                if segment_rows:
+                    self._register_segment(segment_path, segment_rows)
+                    sources[file_path] = (digests[file_path], segment_rows)
+                    rows += segment_rows
+                    if summary is not None:
+                        summary = merge_summaries(summary, delta)
+                else:
+                    segment_path.unlink(missing_ok=True)
+        finally:
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            if not was_tracing:
+                tracemalloc.stop()
+
+        self._record_sources(sources)
+        with self.lock.write():
+            self.database = pd.DataFrame()
+            self._stale = True
+            self.invalidate_cache()
+            self.build_indexes()
+            self.report_summary = summary
+            self._summarized_database = self.database if summary is not None else None
+        if summary is not None:
+            self.save_report_summary()
+        stats = {
+            "rows": rows,
+            "skipped": skipped,
+            "seconds": elapsed,
+            "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+            "peak_memory": peak,
+        }
+        if rows:
+            logger.info("Base consolidée mise à jour avec succès.")
+            self.start_background_compaction()
+        elif not skipped:
+            logger.warning("Aucun fichier valide à consolider.")
+        logger.info("%d lignes ajoutées en %.2f s (%.0f lignes/s, pic mémoire : %.1f Mo).",
+                    rows, elapsed, stats["rows_per_second"], peak / 1_000_000)
+        return stats
+
+    def _store_is_empty(self) -> bool:
+        """
+        Indique si le store ne contient encore aucune donnée.
+
+        PRE: /
+        POST: Retourne True si aucun fichier de base ni segment n'existe, ou si aucune partition
+              n'existe quand la base est partitionnée.
+        """
+        if self.shard_key is not None:
+            return not self._read_catalog()["shards"]
+        if any(self._base_path(name).exists() for name in STORAGE_FORMATS):
+            return False
+        with self._store_lock:
+            return not self._read_manifest()["segments"]
+
+    @exclusive
+    def set_storage_format(self, name: str):
+        """
+        Choisit le format des fichiers écrits par le store (base et segments).
+
+        PRE: name est une clé de STORAGE_FORMATS.
+        POST: Les prochaines écritures utilisent ce format. Les fichiers existants restent
+              lisibles quel que soit leur format.
+        """
+        if name not in STORAGE_FORMATS:
+            raise ValueError(f"Format de stockage inconnu : {name}. Formats disponibles : {', '.join(STORAGE_FORMATS)}")
+        self.storage_format = name
+
+    def _base_path(self, name: str = None) -> Path:
+        """
+        Retourne le chemin du fichier de base pour un format donné.
+
+        PRE: name est None (format courant) ou une clé de STORAGE_FORMATS.
+        POST: Retourne DATABASE_FILE avec l'extension du format.
+        """
+        return self.path.with_suffix(STORAGE_FORMATS[name or self.storage_format])
+
+    def _read_manifest(self) -> dict:
+        """
+        Lit le manifeste du store segmenté.
+
+        PRE: /
+        POST: Retourne le manifeste {next_id, segments}, vide si le store n'existe pas encore.
+        """
+        manifest_path = self.segments_dir / MANIFEST_FILE
+        if not manifest_path.exists():
+            return {"next_id": 1, "segments": []}
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+
+    def _write_manifest(self, manifest: dict):
+        """
+        Écrit le manifeste du store segmenté en remplaçant l'ancien d'un seul coup.
+
+        PRE: manifest est un dictionnaire {next_id, segments}.
+        POST: Le manifeste est remplacé par atomic_write, un lecteur voit l'ancien ou le nouveau.
+        """
+        with atomic_write(self.segments_dir / MANIFEST_FILE) as temporary_path:
+            with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+                json.dump(manifest, manifest_file, indent=2)
+
+    def _new_segment_path(self, name: str = None) -> Path:
+        """
+        Réserve un nom de segment inutilisé dans le store.
+
+        PRE: name est None (format courant) ou une clé de STORAGE_FORMATS.
+        POST: Retourne le chemin du prochain segment. Le fichier n'est pas encore référencé
+              par le manifeste, il est ignoré au chargement tant qu'il n'est pas enregistré.
+        """
+        with self._store_lock:
+            self.segments_dir.mkdir(exist_ok=True)
+            manifest = self._read_manifest()
+            segment_id = manifest["next_id"]
+            manifest["next_id"] = segment_id + 1
+            self._write_manifest(manifest)
+        return self.segments_dir / f"segment-{segment_id:06d}{STORAGE_FORMATS[name or self.storage_format]}"
+
+    def _register_segment(self, segment_path: Path, rows: int):
+        """
+        Ajoute un segment complètement écrit à la fin du manifeste.
+
+        PRE: segment_path a été réservé par _new_segment_path et contient rows lignes.
+        POST: Le segment fait partie de la base consolidée.
+        """
+        with self._store_lock:
+            manifest = self._read_manifest()
+            manifest["segments"].append({"file": segment_path.name, "rows": rows})
+            self._write_manifest(manifest)
+
+    def _journal_append(self, segment_path: Path, rows: int):
+        """
+        Inscrit un ajout dans le journal avant d'écrire son segment.
+
+        Seuls le nom du segment réservé et son nombre de lignes sont journalisés : les données
+        ne sont écrites qu'une fois, dans le segment, par write_table (atomique).
+
+        PRE: segment_path a été réservé par _new_segment_path, rows est le nombre de lignes de l'ajout.
+        POST: L'entrée {file, rows} est forcée sur disque à la fin de JOURNAL_FILE : si le segment
+              est écrit mais pas encore référencé par le manifeste, _replay_journal l'y ajoute.
+        """
+        entry = {"file": segment_path.name, "rows": rows}
+        with open(self.segments_dir / JOURNAL_FILE, "a", encoding="utf-8") as journal:
+            journal.write(json.dumps(entry) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def _replay_journal(self) -> int:
+        """
+        Rejoue les ajouts du journal qui n'ont pas atteint le manifeste, puis vide le journal.
+
+        write_table est atomique : un segment présent sur disque est complet et il est ajouté
+        au manifeste. Un ajout interrompu avant la fin de l'écriture de son segment n'a jamais
+        été validé : il est abandonné, avec son fichier temporaire. Une dernière entrée
+        incomplète (arrêt pendant son écriture) est ignorée.
+
+        PRE: Aucune écriture n'est en cours sur le store.
+        POST: Chaque segment journalisé et écrit est référencé par le manifeste, une seule fois.
+              Retourne le nombre d'ajouts rejoués.
+        """
+        journal_path = self.segments_dir / JOURNAL_FILE
+        if not journal_path.exists():
+            return 0
+        with self._store_lock:
+            registered = {segment["file"] for segment in self._read_manifest()["segments"]}
+        replayed = discarded = 0
+        with open(journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Entrée incomplète du journal ignorée : ajout interrompu avant sa validation.")
+                    break
+                if entry["file"] in registered:
+                    continue
+                segment_path = self.segments_dir / entry["file"]
+                if not segment_path.exists():
+                    segment_path.with_name(segment_path.name + ".tmp").unlink(missing_ok=True)
+                    discarded += 1
+                    continue
+                self._register_segment(segment_path, entry["rows"])
+                replayed += 1
+        journal_path.unlink()
+        if replayed:
+            logger.warning("%d ajout(s) interrompu(s) rejoué(s) depuis le journal.", replayed)
+        if discarded:
+            logger.warning("%d ajout(s) interrompu(s) avant l'écriture de leur segment abandonné(s).", discarded)
+        return replayed
+
+    def append_segment(self, frame: pd.DataFrame):
+        """
+        Ajoute des lignes au store sous la forme d'un nouveau segment.
+
+        Le coût d'écriture est proportionnel à la taille de frame, pas à celle de la base.
+        L'ajout est d'abord inscrit dans le journal (nom du segment et nombre de lignes) : si
+        le segment est écrit mais que l'ajout est interrompu avant d'atteindre le manifeste,
+        load_database l'y ajoute.
+
+        PRE: frame est un DataFrame non vide.
+        POST: Un nouveau segment contenant frame est référencé par le manifeste et le journal est vidé.
+              Une compaction en arrière-plan est lancée si trop de petits segments existent.
+        """
+        segment_path = self._new_segment_path()
+        self._journal_append(segment_path, len(frame))
+        write_table(frame, segment_path)
+        self._register_segment(segment_path, len(frame))
+        (self.segments_dir / JOURNAL_FILE).unlink(missing_ok=True)
+        logger.debug("Segment ajouté : %s (%d lignes).", segment_path.name, len(frame))
+        self.start_background_compaction()
+
+    def compact_segments(self, min_rows: int = None) -> int:
+        """
+        Fusionne les suites de petits segments consécutifs en un seul segment.
+
+        L'ordre des lignes est conservé et les clés mises à jour dans la suite n'y gardent que
+        leur dernière version. Les segments sont immuables : la fusion est écrite dans un
+        nouveau fichier puis le manifeste est remplacé, avant de supprimer les anciens.
+        load_database lit les segments sous le verrou du store : le remplacement du manifeste
+        attend la fin de ses lectures, qui ne portent jamais sur un segment supprimé.
+
+        PRE: min_rows est None ou un entier > 0 (taille en dessous de laquelle un segment est petit).
+        POST: Retourne le nombre de segments en moins dans le manifeste.
+        """
+        min_rows = min_rows or COMPACTION_MIN_ROWS
+        with self._store_lock:
+            segments = self._read_manifest()["segments"]
+
+        runs, run = [], []
+        for segment in segments:
+            if segment["rows"] < min_rows:
+                run.append(segment)
+                continue
+            if len(run) > 1:
+                runs.append(run)
+            run = []
+        if len(run) > 1:
+            runs.append(run)
+
+        merged = []
+        for run in runs:
+            data = resolve_upserts(concat_inventory(
+                [read_table(self.segments_dir / segment["file"]) for segment in run]))
+            segment_path = self._new_segment_path()
+            write_table(data, segment_path)
+            merged.append((run, {"file": segment_path.name, "rows": len(data)}))
+
+        if not merged:
+            return 0
+        removed = []
+        compacted = 0
+        with self._store_lock:
+            manifest = self._read_manifest()
+            for run, replacement in merged:
+                names = [segment["file"] for segment in run]
+                current = [segment["file"] for segment in manifest["segments"]]
+                if names[0] not in current:
+                    removed.append(replacement["file"])
+                    continue
+                position = current.index(names[0])
+                if current[position:position + len(run)] != names:
+                    removed.append(replacement["file"])
+                    continue
+                manifest["segments"][position:position + len(run)] = [replacement]
+                removed.extend(names)
+                compacted += len(run) - 1
+            self._write_manifest(manifest)
+        for name in removed:
+            (self.segments_dir / name).unlink(missing_ok=True)
+        return compacted
+
+    def start_background_compaction(self):
+        """
+        Lance compact_segments dans un thread si trop de petits segments se sont accumulés.
+
+        PRE: /
+        POST: Au plus une compaction tourne à la fois. Retourne sans attendre.
+        """
+        small = [segment for segment in self._read_manifest()["segments"] if segment["rows"] < COMPACTION_MIN_ROWS]
+        if len(small) < COMPACTION_TRIGGER:
+            return
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(target=self.compact_segments, daemon=True)
+        self._compaction_thread.start()
+
+    def wait_for_compaction(self):
+        """
+        Attend la fin de la compaction en arrière-plan éventuelle.
+
+        PRE: /
+        POST: Aucune compaction n'est en cours.
+        """
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+
+    @instrumented("save_database")
+    @exclusive
+    def save_database(self):
+        """
+        Sauvegarde complète de la base consolidée dans le fichier de base, au format courant.
+
+        Réécrit toute la base : à réserver aux points de sauvegarde explicites. Les ajouts
+        courants passent par append_segment. Les recherches continuent pendant l'écriture.
+        Le fichier de base est remplacé d'un seul coup par write_table, et les segments ne sont
+        retirés du manifeste qu'une fois la nouvelle base sur disque : un arrêt à n'importe quel
+        moment laisse une base complète, sans copie de sauvegarde.
+
+        PRE: La base de données peut être vide ou non.
+        POST: Sauvegarde la base dans le fichier de base du format courant, supprime les fichiers
+              de base des autres formats et vide le store segmenté, désormais inclus.
+              Ne fait rien si la base est partitionnée.
+        """
+        self._refresh()
+        if self.shard_key is not None:
+            logger.info("Base partitionnée : chaque partition est déjà écrite à sa consolidation.")
+        elif not self.database.empty:
+            self.wait_for_compaction()
+            write_table(self.database, self._base_path())
+            for name in STORAGE_FORMATS:
+                if name != self.storage_format:
+                    self._base_path(name).unlink(missing_ok=True)
+            with self._store_lock:
+                manifest = self._read_manifest()
+                segments = manifest["segments"]
+                if segments:
+                    manifest["segments"] = []
+                    self._write_manifest(manifest)
+                for segment in segments:
+                    (self.segments_dir / segment["file"]).unlink(missing_ok=True)
+            logger.info("Base consolidée sauvegardée.")
+        else:
+            logger.warning("La base consolidée est vide, aucune sauvegarde effectuée.")
+
+    @instrumented("load_database")
+    @exclusive
+    def load_database(self, columns: list[str] = None):
+        """
+        Charge la base de données consolidée à partir du fichier de base et des segments.
+
+        Le fichier de base du format courant est lu en priorité, à défaut celui d'un autre format.
+        Les ajouts journalisés mais interrompus avant d'atteindre le manifeste sont d'abord rejoués.
+        Une clé écrite dans plusieurs segments est résolue par resolve_upserts (dernière écriture).
+        Les index sont construits à la première recherche et non au chargement : avec le format
+        "arrow", le chargement ne fait que projeter la base en mémoire. Les recherches continuent
+        sur l'ancienne base jusqu'à la publication de la nouvelle.
+
+        PRE: Le fichier de base et le store segmenté peuvent exister ou non.
+             columns est None (toutes les colonnes) ou la liste des colonnes à charger,
+             par exemple REPORT_COLUMNS pour generate_report.
+        POST: Charge la base de données dans le programme ou initialise une base vide.
+              Si la base est partitionnée, seuls le catalogue et le récapitulatif sont lus :
+              les partitions sont chargées à la demande par load_shards.
+        """
+        if self.shard_key is not None:
+            self._load_catalog(columns)
+            return
+        self._replay_journal()
+        frames = []
+        wanted = None if columns is None else list(dict.fromkeys(columns + ROW_KEY_COLUMNS))
+        candidates = [self.storage_format] + [name for name in STORAGE_FORMATS if name != self.storage_format]
+        for name in candidates:
+            if self._base_path(name).exists():
+                frames.append(read_table(self._base_path(name), wanted))
+                break
+        # La compaction supprime les anciens segments juste après avoir remplacé le manifeste :
+        # ils sont lus sous le même verrou que le manifeste qui les référence.
+        with self._store_lock:
+            segments = self._read_manifest()["segments"]
+            frames.extend(read_table(self.segments_dir / segment["file"], wanted) for segment in segments)
+        if frames:
+            database = concat_inventory(frames)
+            if len(frames) > 1:
+                database = resolve_upserts(database)
+            if columns is not None:
+                database = database[[column for column in columns if column in database.columns]]
+        else:
+            database = pd.DataFrame()
+        with self.lock.write():
+            self.database = database
+            self._stale = False
+            self.invalidate_cache()
+            self._load_report_summary()
+        if frames:
+            logger.info("Base consolidée chargée avec succès.")
+        else:
+            logger.info("Aucune base consolidée trouvée, démarrage avec une base vide.")
+
+    @exclusive
+    def set_shard_key(self, column: str = None):
+        """
+        Active ou désactive le partitionnement de la base par une colonne.
+
+        PRE: column est None (base non partitionnée) ou une colonne de ROW_KEY_COLUMNS : une
+             clé ne change jamais de partition, les upserts restent locaux à une partition.
+        POST: Les prochains chargements et consolidations utilisent les partitions de SHARDS_DIR.
+              Lève ValueError si column ne fait pas partie de la clé.
+        """
+        if column is not None and column not in ROW_KEY_COLUMNS:
+            raise ValueError(f"Colonne de partitionnement non valide : {column}. "
+                             f"Colonnes possibles : {', '.join(ROW_KEY_COLUMNS)}")
+        with self.lock.write():
+            self.shard_key = column
+            self.shard_catalog = None
+            self.loaded_shards = set()
+
+    def _read_catalog(self) -> dict:
+        """
+        Lit le catalogue des partitions.
+
+        PRE: shard_key n'est pas None.
+        POST: Retourne le catalogue {key, next_id, columns, shards}, vide s'il n'existe pas encore.
+              shards associe le nom de chaque partition à {file, summary, rows}.
+              Lève ValueError si les partitions existantes ont été faites sur une autre colonne.
+        """
+        catalog_path = self.shards_dir / CATALOG_FILE
+        if not catalog_path.exists():
+            return {"key": self.shard_key, "next_id": 1, "columns": [], "shards": {}}
+        with open(catalog_path, encoding="utf-8") as catalog_file:
+            catalog = json.load(catalog_file)
+        if catalog["key"] != self.shard_key:
+            raise ValueError(f"La base est partitionnée par {catalog['key']} et non par {self.shard_key}.")
+        return catalog
+
+    def _write_catalog(self, catalog: dict):
+        """
+        Écrit le catalogue des partitions en remplaçant l'ancien d'un seul coup.
+
+        PRE: catalog vient de _read_catalog.
+        POST: Le catalogue est remplacé par atomic_write, un lecteur voit l'ancien ou le nouveau.
+        """
+        self.shards_dir.mkdir(exist_ok=True)
+        with atomic_write(self.shards_dir / CATALOG_FILE) as temporary_path:
+            with open(temporary_path, "w", encoding="utf-8") as catalog_file:
+                json.dump(catalog, catalog_file, indent=2)
+
+    def _shard_names(self, frame: pd.DataFrame) -> pd.Series:
+        """
+        Retourne le nom de la partition de chaque ligne.
+
+        PRE: shard_key n'est pas None.
+        POST: Retourne une Series de chaînes alignée sur frame, NULL_SHARD pour une valeur manquante.
+        """
+        if self.shard_key not in frame.columns:
+            return pd.Series(NULL_SHARD, index=frame.index)
+        values = frame[self.shard_key].astype(object)
+        return values.where(values.notna(), NULL_SHARD).astype(str)
+
+    def _upsert_shards(self, batch: pd.DataFrame, workers: int = 1) -> tuple[dict, list[str]]:
+        """
+        Répartit un lot de lignes entre les partitions et consolide chacune d'elles.
+
+        Seules les partitions qui reçoivent des lignes sont lues et réécrites ; avec workers > 1,
+        elles le sont en parallèle. Le catalogue n'est remplacé qu'une fois toutes les partitions
+        écrites, puis les anciens fichiers sont supprimés.
+
+        PRE: shard_key n'est pas None, batch vient de _latest_rows, workers est un entier >= 1.
+        POST: Retourne ({inserted, updated, skipped}, noms des partitions modifiées).
+        """
+        with self._store_lock:
+            catalog = self._read_catalog()
+        jobs = []
+        for name, positions in batch.groupby(self._shard_names(batch), sort=False).indices.items():
+            entry = catalog["shards"].get(name)
+            source = str(self.shards_dir / entry["file"]) if entry else None
+            target = self.shards_dir / f"shard-{catalog['next_id']:06d}{STORAGE_FORMATS[self.storage_format]}"
+            catalog["next_id"] += 1
+            jobs.append((name, source, batch.iloc[positions].reset_index(drop=True), str(target)))
+        self.shards_dir.mkdir(exist_ok=True)
+        results = _map_files(_consolidate_shard, workers, *zip(*[job[1:] for job in jobs]))
+
+        counts = {"inserted": 0, "updated": 0, "skipped": 0}
+        changed, stale = [], []
+        for (name, source, _, target), (rows, shard_counts) in zip(jobs, results):
+            for field in counts:
+                counts[field] += shard_counts[field]
+            if not shard_counts["inserted"] and not shard_counts["updated"]:
+                continue
+            summary_path = Path(target).with_suffix(".summary.csv")
+            previous = catalog["shards"].get(name)
+            catalog["shards"][name] = {"file": Path(target).name,
+                                       "summary": summary_path.name if summary_path.exists() else None,
+                                       "rows": rows}
+            changed.append(name)
+            if previous:
+                stale.extend(previous[field] for field in ("file", "summary") if previous[field])
+        catalog["columns"] = list(dict.fromkeys(catalog["columns"] + list(batch.columns)))
+        with self._store_lock:
+            catalog["sources"] = self._read_catalog().get("sources", {})
+            self._write_catalog(catalog)
+        for name in stale:
+            (self.shards_dir / name).unlink(missing_ok=True)
+        self.shard_catalog = catalog
+        return counts, changed
+
+    @instrumented("consolidate_shards")
+    @exclusive
+    def consolidate_shards(self, file_paths: list[Path], workers: int = 1) -> dict:
+        """
+        Consolide des fichiers CSV dans la base partitionnée.
+
+        Les lignes sont appliquées comme des upserts, comme dans consolidate_files, mais chaque
+        partition touchée est réécrite entière : le coût dépend de la taille des partitions
+        touchées et non de celle de la base. Avec workers > 1, les fichiers sont lus puis les
+        partitions consolidées en parallèle.
+
+        PRE: shard_key n'est pas None, file_paths est une liste de chemins vers des fichiers CSV,
+             workers est un entier >= 1.
+        POST: Les partitions et le catalogue sont à jour. Les partitions modifiées sont retirées
+              de la base en mémoire et rechargées à la prochaine requête qui les touche.
+              Retourne {inserted, updated, skipped} (nombres de lignes).
+        """
+        file_paths, digests, skipped = self._unchanged_sources(file_paths)
+        frames, sources = _ingest_files(file_paths, digests, workers)
+        counts = {"inserted": 0, "updated": 0, "skipped": skipped}
+        if not frames:
+            if not skipped:
+                logger.warning("Aucun fichier valide à consolider.")
+            return counts
+
+        batch, _, duplicates = _latest_rows(concat_inventory(frames))
+        changes, changed = self._upsert_shards(batch, workers)
+        counts.update(inserted=changes["inserted"], updated=changes["updated"],
+                      skipped=skipped + duplicates + changes["skipped"])
+        self._unload_shards(changed)
+        self._record_sources(sources)
+        logger.info("Base consolidée mise à jour avec succès (%d partitions modifiées).", len(changed))
+        logger.info("%d lignes insérées, %d mises à jour, %d ignorées.",
+                    counts["inserted"], counts["updated"], counts["skipped"])
+        return counts
+
+    @exclusive
+    def partition_database(self, column: str, workers: int = 1) -> dict:
+        """
+        Répartit la base non partitionnée en mémoire dans des partitions par column.
+
+        PRE: La base a été chargée par load_database sans partitionnement, column est une
+             colonne de ROW_KEY_COLUMNS, workers est un entier >= 1.
+        POST: Le partitionnement par column est activé et les lignes de la base sont écrites
+              dans les partitions. Retourne {inserted, updated, skipped}.
+        """
+        self._refresh()
+        rows = self.database
+        self.set_shard_key(column)
+        if rows.empty:
+            self._load_catalog()
+            return {"inserted": 0, "updated": 0, "skipped": 0}
+        counts, _ = self._upsert_shards(rows.reset_index(drop=True), workers)
+        self._load_catalog()
+        logger.info("Base répartie en %d partitions par %s.", len(self.shard_catalog["shards"]), column)
+        return counts
+
+    def _shard_summary(self) -> pd.DataFrame:
+        """
+        Combine les récapitulatifs de toutes les partitions, sans lire leurs lignes.
+
+        PRE: shard_catalog a été lu.
+        POST: Retourne le récapitulatif de la base entière, indexé par (Category, Product).
+        """
+        summaries = [pd.read_csv(self.shards_dir / entry["summary"]).set_index(['Category', 'Product'])
+                     for entry in self.shard_catalog["shards"].values() if entry.get("summary")]
+        if not summaries:
+            return summary_delta(pd.DataFrame(columns=REPORT_COLUMNS))
+        if len(summaries) == 1:
+            return summaries[0]
+        return merge_summaries(summaries[0], pd.concat(summaries[1:]))
+
+    def _load_catalog(self, columns: list[str] = None):
+        """
+        Charge le catalogue des partitions et le récapitulatif, sans lire aucune partition.
+
+        PRE: shard_key n'est pas None, columns est None ou la liste des colonnes à charger
+             avec les partitions.
+        POST: La base en mémoire est vide, report_summary décrit la base entière.
+        """
+        with self._store_lock:
+            catalog = self._read_catalog()
+        with self.lock.write():
+            self.shard_catalog = catalog
+            self._shard_columns = columns
+            self.loaded_shards = set()
+            self.database = pd.DataFrame()
+            self.invalidate_cache()
+            self.report_summary = self._shard_summary()
+            self._summarized_database = self.database
+        logger.info("Catalogue chargé : %d partitions, %d lignes (chargées à la demande).",
+                    len(self.shard_catalog["shards"]), sum(entry["rows"] for entry in self.shard_catalog["shards"].values()))
+
+    def load_shards(self, names: list[str] = None):
+        """
+        Ajoute des partitions à la base en mémoire si elles n'y sont pas encore.
+
+        Appelée avant chaque lecture : le verrou d'écriture n'est pris que s'il manque des
+        partitions, pour qu'une lecture n'attende pas la fin d'une consolidation en cours.
+
+        PRE: names est None (toutes les partitions) ou une liste de noms de partitions.
+        POST: La base en mémoire contient les partitions demandées qui existent. Les index déjà
+              construits sont étendus aux lignes ajoutées. Ne fait rien si la base n'est pas partitionnée.
+        """
+        self._refresh()
+        if self.shard_key is None or (self._has_shards(names) and not self.database.columns.empty):
+            return
+        with self._writer_lock:
+            self._load_missing_shards(names)
+
+    def _refresh(self):
+        """
+        Recharge la base si une consolidation par blocs l'a laissée vide.
+
+        Le rechargement n'a lieu qu'à la première lecture qui suit : une série de consolidations
+        par blocs ne charge jamais la base entière en mémoire.
+
+        PRE: /
+        POST: La base en mémoire reflète le store. Ne fait rien si elle est déjà à jour.
+        """
+        if not self._stale:
+            return
+        with self._writer_lock:
+            if self._stale:
+                self.load_database()
+
+    def _load_missing_shards(self, names: list[str] = None):
+        """
+        PRE: La base est partitionnée, le verrou d'écriture est pris.
+             names est None (toutes les partitions) ou une liste de noms de partitions.
+        POST: Voir load_shards.
+        """
+        if self.shard_key is None:
+            return
+        if self.shard_catalog is None:
+            self._load_catalog()
+        shards = self.shard_catalog["shards"]
+        missing = [name for name in (shards if names is None else names) if name in shards and name not in self.loaded_shards]
+        if not missing:
+            if self.database.columns.empty:
+                with self.lock.write():
+                    self.database = pd.DataFrame(columns=self.shard_catalog["columns"])
+                    self._summarized_database = self.database
+            return
+        wanted = None if self._shard_columns is None else list(dict.fromkeys(self._shard_columns + ROW_KEY_COLUMNS))
+        frames = [read_table(self.shards_dir / shards[name]["file"], wanted) for name in missing]
+        offset = len(self.database)
+        database = concat_inventory([frame for frame in [self.database] + frames if not frame.empty])
+        if self._shard_columns is not None:
+            database = database[[column for column in self._shard_columns if column in database.columns]]
+        with self.lock.write():
+            extend = self._indexed_database is self.database and offset
+            self.database = database
+            if extend:
+                self._extend_indexes(database.iloc[offset:], offset)
+            self.loaded_shards |= set(missing)
+            self.invalidate_cache()
+            self._summarized_database = database
+        logger.debug("Partitions chargées : %s.", ", ".join(missing))
+
+    def _unload_shards(self, names: list[str]):
+        """
+        Retire des partitions de la base en mémoire et relit le récapitulatif des partitions.
+
+        PRE: names sont des noms de partitions dont les fichiers viennent d'être remplacés.
+        POST: La base en mémoire ne contient plus ces partitions, report_summary décrit la base entière.
+        """
+        stale = self.loaded_shards & set(names)
+        database = self.database
+        if self.shard_key not in database.columns:
+            database, stale = pd.DataFrame(), set(self.loaded_shards)
+        elif stale:
+            database = database[~self._shard_names(database).isin(stale).to_numpy()].reset_index(drop=True)
+        summary = self._shard_summary()
+        with self.lock.write():
+            self.database = database
+            self.loaded_shards -= stale
+            self.invalidate_cache()
+            self.report_summary = summary
+            self._summarized_database = database
+
+    def query_shards(self, groups: list[list[tuple[str, str, str]]]) -> list[str]:
+        """
+        Retourne les partitions qu'une requête peut toucher, d'après ses prédicats sur shard_key.
+
+        Les prédicats =, != (valeur ou "nan"), ^= et ~= sur la colonne de partitionnement
+        restreignent les partitions d'un groupe AND ; les groupes OR sont réunis.
+
+        PRE: groups vient de parse_query.
+        POST: Retourne les noms de partitions du catalogue, dans l'ordre du catalogue,
+              ou None si la base n'est pas partitionnée.
+        """
+        if self.shard_key is None:
+            return None
+        if self.shard_catalog is None:
+            self.load_shards([])
+        names = list(self.shard_catalog["shards"])
+        selected = set()
+        for group in groups:
+            candidates = set(names)
+            for column, operator, value in group:
+                if column != self.shard_key:
+                    continue
+                if operator in ("=", "!=") and value.lower() == "nan":
+                    matched = {NULL_SHARD}
+                elif operator in ("=", "!="):
+                    matched = {value}
+                elif operator == "^=":
+                    matched = {name for name in names if name != NULL_SHARD and name.startswith(value)}
+                elif operator == "~=":
+                    matched = {name for name in names if name != NULL_SHARD and value in name}
+                else:
+                    continue
+                candidates = candidates - matched if operator == "!=" else candidates & matched
+            selected |= candidates
+        return [name for name in names if name in selected]
+
+
+    def row_count(self) -> int:
+        """
+        Compte les lignes de la base entière, partitions non chargées comprises.
+
+        PRE: /
+        POST: Retourne le nombre de lignes du catalogue si la base est partitionnée,
+              sinon celui de la base en mémoire.
+        """
+        if self.shard_key is not None and self.shard_catalog is not None:
+            return sum(entry["rows"] for entry in self.shard_catalog["shards"].values())
+        self._refresh()
+        return len(self.database)
+
+    def _has_shards(self, names: list[str] = None) -> bool:
+        """
+        PRE: names est None (toutes les partitions) ou une liste de noms de partitions.
+        POST: Retourne True si ces partitions sont en mémoire ou si la base n'est pas partitionnée.
+        """
+        if self.shard_key is None:
+            return True
+        if self.shard_catalog is None:
+            return False
+        shards = self.shard_catalog["shards"]
+        return all(name in self.loaded_shards for name in (shards if names is None else names) if name in shards)
+    def build_indexes(self):
+        """
+        Construit les index secondaires de la base en mémoire.
+
+        PRE: /
+        POST: indexes contient un index par colonne de HASH_INDEX_COLUMNS et SORTED_INDEX_COLUMNS
+              présente dans la base, _key_index les empreintes de clé des lignes.
+        """
+        self._key_index = pd.Index(row_keys(self.database) if not self.database.empty else [], dtype="uint64")
+        self.indexes = {}
+        for column in HASH_INDEX_COLUMNS:
+            if column in self.database.columns:
+                self.indexes[column] = _hash_index(self.database[column])
+        for column in SORTED_INDEX_COLUMNS:
+            if column in self.database.columns and pd.api.types.is_numeric_dtype(self.database[column]):
+                self.indexes[column] = _sorted_index(self.database[column])
+        self._indexed_database = self.database
+
+    def _ensure_indexes(self):
+        """
+        Reconstruit les index si la base a été remplacée sans passer par load_database
+        ou consolidate_files.
+
+        PRE: /
+        POST: indexes décrit la base en mémoire. Deux lecteurs ne construisent pas les index
+              en même temps.
+        """
+        with self._lazy_lock:
+            if self._indexed_database is not self.database:
+                self.build_indexes()
+
+    def _extend_indexes(self, new_rows: pd.DataFrame, offset: int):
+        """
+        Met à jour les index après l'ajout de lignes à la fin de la base.
+
+        Le coût dépend du nombre de lignes ajoutées et des groupes qu'elles touchent,
+        pas d'une reconstruction complète.
+
+        PRE: new_rows vient d'être ajouté à la base à partir de la position offset.
+        POST: indexes décrit la base en mémoire.
+        """
+        if any(column in new_rows.columns and column not in self.indexes
+               for column in HASH_INDEX_COLUMNS + SORTED_INDEX_COLUMNS):
+            self.build_indexes()
+            return
+        for column, index in self.indexes.items():
+            if index["kind"] == "hash":
+                added = _hash_index(new_rows[column], offset) if column in new_rows.columns else {
+                    "values": {}, "nulls": np.arange(offset, offset + len(new_rows))}
+                for value, positions in added["values"].items():
+                    existing = index["values"].get(value)
+                    index["values"][value] = positions if existing is None else np.concatenate([existing, positions])
+                index["nulls"] = np.concatenate([index["nulls"], added["nulls"]])
+            else:
+                if column not in new_rows.columns or not pd.api.types.is_numeric_dtype(new_rows[column]):
+                    self.build_indexes()
+                    return
+                added = _sorted_index(new_rows[column], offset)
+                insert_at = np.searchsorted(index["values"], added["values"], side="right")
+                index["values"] = np.insert(index["values"], insert_at, added["values"])
+                index["positions"] = np.insert(index["positions"], insert_at, added["positions"])
+                index["nulls"] = np.concatenate([index["nulls"], added["nulls"]])
+        self._key_index = self._key_index.append(pd.Index(row_keys(new_rows), dtype="uint64"))
+        self._indexed_database = self.database
+
+    def _update_indexes(self, positions: np.ndarray):
+        """
+        Met à jour les index après la modification de lignes existantes (upserts).
+
+        Les colonnes de la clé ne changent pas : seuls les index des autres colonnes sont corrigés.
+
+        PRE: positions sont les positions des lignes modifiées dans la base en mémoire.
+        POST: indexes décrit la base en mémoire, sauf pour les lignes ajoutées ensuite.
+        """
+        for column, index in self.indexes.items():
+            if column in ROW_KEY_COLUMNS:
+                continue
+            if index["kind"] == "hash":
+                self.indexes[column] = _hash_index(self.database[column])
+                continue
+            kept = ~np.isin(index["positions"], positions)
+            added = _sorted_index(self.database[column].iloc[positions])
+            added_positions = positions[added["positions"]]
+            values, stale_positions = index["values"][kept], index["positions"][kept]
+            insert_at = np.searchsorted(values, added["values"], side="right")
+            index["values"] = np.insert(values, insert_at, added["values"])
+            index["positions"] = np.insert(stale_positions, insert_at, added_positions)
+            index["nulls"] = np.sort(np.concatenate([index["nulls"][~np.isin(index["nulls"], positions)],
+                                                     positions[added["nulls"]]]))
+
+    def _index_lookup(self, criteria: str, value) -> np.ndarray:
+        """
+        Cherche les positions des lignes où criteria vaut value à l'aide des index.
+
+        Le coût est proportionnel au nombre de lignes trouvées, pas à la taille de la base.
+
+        PRE: value est déjà converti au type de la colonne, ou None pour les valeurs manquantes.
+        POST: Retourne les positions triées des lignes correspondantes, ou None si la colonne
+              n'est pas indexée.
+        """
+        self._ensure_indexes()
+        index = self.indexes.get(criteria)
+        if index is None:
+            return None
+        if value is None:
+            return index["nulls"]
+        if index["kind"] == "hash":
+            return index["values"].get(value, np.array([], dtype=np.intp))
+        start = np.searchsorted(index["values"], value, side="left")
+        stop = np.searchsorted(index["values"], value, side="right")
+        return np.sort(index["positions"][start:stop])
+
+    def invalidate_cache(self):
+        """
+        Passe à une nouvelle version de la base et vide le cache des requêtes.
+
+        PRE: /
+        POST: database_version est incrémenté, aucun résultat antérieur n'est servi.
+        """
+        self.database_version += 1
+        self._cached_database = self.database
+        self.query_cache.clear(self.database_version)
+
+    def _cached(self, key: tuple, compute):
+        """
+        Retourne le résultat en cache pour key, ou le calcule et le met en cache.
+
+        Une base remplacée sans passer par consolidate_files ou load_database invalide aussi le cache.
+
+        PRE: key est un tuple hachable qui décrit la requête normalisée, compute est appelable sans argument.
+        POST: Retourne le résultat de compute() pour la version courante de la base.
+        """
+        with self._lazy_lock:
+            if self._cached_database is not self.database:
+                self.invalidate_cache()
+            key = (self.database_version,) + key
+        result = self.query_cache.get(key)
+        if result is None:
+            result = compute()
+            self.query_cache.put(key, result)
+        return result
+
+    def _search_rows(self, criteria: str, value) -> pd.DataFrame:
+        """
+        Cherche les lignes où criteria vaut value, via l'index de la colonne s'il existe.
+
+        PRE: criteria est une colonne de la base, value est convertie au type de la colonne
+             ou None pour les valeurs manquantes.
+        POST: Retourne les lignes correspondantes, dans l'ordre de la base.
+        """
+        positions = self._index_lookup(criteria, value)
+        if positions is not None:
+            return self.database.iloc[positions]
+        if value is None:
+            return self.database[pd.isnull(self.database[criteria])]
+        return self.database[self.database[criteria] == value]
+
+    @instrumented("search_inventory")
+    def search_inventory(self, criteria: str, value: str):
+        """
+        Recherche des éléments dans la base de données selon un critère et une valeur donnés.
+
+        Les colonnes indexées sont servies par les index secondaires, les autres par un parcours complet.
+        Une recherche déjà faite sur la même version de la base est servie par le cache.
+
+        PRE: criteria est une colonne existante dans la base de données.
+        POST: Affiche et retourne les résultats correspondants à la recherche.
+              Si la base est partitionnée, seules les partitions concernées sont chargées.
+        """
+        with self._reading(self.query_shards([[(criteria, "=", value)]])):
+            if criteria not in self.database.columns:
+                logger.error("Critère '%s' non valide. Colonnes disponibles : %s", criteria, ", ".join(self.database.columns))
+                return
+
+            try:
+                key = self._coerce_value(criteria, "=", value)
+            except ValueError as e:
+                logger.error("%s", e)
+                return
+            results = self._cached(("search", criteria, key), lambda: self._search_rows(criteria, key))
+        if key is not None:
+            value = key
+
+        with track("display"):
+            if results.empty:
+                print("Aucun résultat trouvé.")
+            else:
+                print(f"Résultats trouvés pour {criteria} = {value} :\n{results}")
+        return results
+
+    def _coerce_value(self, column: str, operator: str, value: str):
+        """
+        Convertit la valeur d'un prédicat au type de la colonne.
+
+        PRE: column est une colonne de la base.
+        POST: Retourne la valeur convertie, None pour une valeur manquante.
+              Lève ValueError si la conversion est impossible.
+        """
+        if operator in ("=", "!=") and value.lower() == "nan":
+            return None
+        if operator in ("^=", "~="):
+            return value
+        column_type = self.database[column].dtype
+        try:
+            if pd.api.types.is_integer_dtype(column_type):
+                return int(value) if operator in ("=", "!=") or value.lstrip("-").isdigit() else float(value)
+            if pd.api.types.is_float_dtype(column_type):
+                return float(value)
+        except ValueError:
+            raise ValueError(f"Impossible de convertir la valeur '{value}' au type attendu ({column_type}).")
+        return value
+
+    def _estimate(self, column: str, operator: str, value) -> int:
+        """
+        Estime le nombre de lignes sélectionnées par un prédicat, à l'aide des index.
+
+        PRE: value est convertie au type de la colonne.
+        POST: Retourne le nombre exact de lignes si l'index peut répondre, sinon la taille de la base.
+        """
+        index = self.indexes.get(column)
+        if index is None:
+            return len(self.database)
+        if value is None and operator == "=":
+            return len(index["nulls"])
+        if index["kind"] == "hash":
+            if operator == "=":
+                return len(index["values"].get(value, ()))
+            if operator in ("^=", "~="):
+                return sum(len(index["values"][key]) for key in _matching_keys(index, operator, value))
+            return len(self.database)
+        if operator in ("=", "<", "<=", ">", ">="):
+            start, stop = _sorted_range(index, operator, value)
+            return int(stop - start)
+        return len(self.database)
+
+    def _predicate_positions(self, column: str, operator: str, value) -> np.ndarray:
+        """
+        Calcule les positions des lignes qui satisfont un prédicat.
+
+        PRE: value est convertie au type de la colonne.
+        POST: Retourne les positions triées, via l'index si possible, sinon par un parcours complet.
+        """
+        index = self.indexes.get(column)
+        if index is not None and value is None and operator == "=":
+            return index["nulls"]
+        if index is not None and index["kind"] == "hash" and operator == "=":
+            return index["values"].get(value, np.array([], dtype=np.intp))
+        if index is not None and index["kind"] == "hash" and operator in ("^=", "~="):
+            keys = _matching_keys(index, operator, value)
+            if not keys:
+                return np.array([], dtype=np.intp)
+            return np.sort(np.concatenate([index["values"][key] for key in keys]))
+        if index is not None and index["kind"] == "sorted" and operator in ("=", "<", "<=", ">", ">="):
+            start, stop = _sorted_range(index, operator, value)
+            return np.sort(index["positions"][start:stop])
+        return np.flatnonzero(_predicate_mask(self.database[column], operator, value))
+
+    def plan_query(self, group: list[tuple[str, str, str]]) -> list[tuple[str, str, object, int]]:
+        """
+        Ordonne les prédicats d'un groupe AND du plus sélectif au moins sélectif.
+
+        PRE: group est un groupe de parse_query dont les colonnes existent dans la base.
+        POST: Retourne la liste (colonne, opérateur, valeur convertie, estimation) triée par estimation.
+              Lève ValueError si une valeur ne peut pas être convertie.
+        """
+        self._ensure_indexes()
+        plan = []
+        for column, operator, raw_value in group:
+            value = self._coerce_value(column, operator, raw_value)
+            plan.append((column, operator, value, self._estimate(column, operator, value)))
+        return sorted(plan, key=lambda step: step[3])
+
+    def _execute_plan(self, plan: list[tuple[str, str, object, int]]) -> np.ndarray:
+        """
+        Exécute un plan AND : le premier prédicat donne les candidats, les suivants les filtrent.
+
+        Un prédicat indexé plus sélectif que les candidats restants est appliqué par intersection,
+        les autres sont évalués uniquement sur les candidats.
+
+        PRE: plan vient de plan_query.
+        POST: Retourne les positions triées des lignes qui satisfont tous les prédicats.
+        """
+        column, operator, value, _ = plan[0]
+        candidates = self._predicate_positions(column, operator, value)
+        for column, operator, value, estimate in plan[1:]:
+            if len(candidates) == 0:
+                break
+            if estimate < len(candidates) and column in self.indexes:
+                candidates = np.intersect1d(candidates, self._predicate_positions(column, operator, value),
+                                            assume_unique=True)
+            else:
+                subset = self.database[column].iloc[candidates]
+                candidates = candidates[_predicate_mask(subset, operator, value)]
+        return candidates
+
+    @instrumented("run_query")
+    def run_query(self, query) -> pd.DataFrame:
+        """
+        Exécute une requête sans rien afficher.
+
+        Chaque groupe AND est exécuté selon plan_query, puis les groupes OR sont réunis.
+        La requête est normalisée (ordre des prédicats et des groupes) pour le cache : une
+        requête équivalente déjà exécutée sur la même version de la base n'est pas recalculée.
+
+        PRE: query est une chaîne au format de parse_query ou le résultat de parse_query.
+        POST: Retourne les lignes correspondantes, dans l'ordre de la base.
+              Si la base est partitionnée, seules les partitions que la requête touche sont chargées.
+              Lève ValueError si la requête est invalide.
+        """
+        groups = parse_query(query) if isinstance(query, str) else query
+        with self._reading(self.query_shards(groups)):
+            unknown = [column for group in groups for column, _, _ in group if column not in self.database.columns]
+            if unknown:
+                raise ValueError(f"Critère '{unknown[0]}' non valide. Colonnes disponibles : {', '.join(self.database.columns)}")
+            normalized = tuple(sorted({tuple(sorted(set(group))) for group in groups}))
+            return self._cached(("query", normalized), lambda: self._run_groups(groups))
+
+    def _run_groups(self, groups: list[list[tuple[str, str, str]]]) -> pd.DataFrame:
+        """
+        Exécute les groupes d'une requête validée par run_query.
+
+        PRE: groups vient de parse_query, ses colonnes existent dans la base.
+        POST: Retourne les lignes correspondantes. Lève ValueError si une valeur ne se convertit pas.
+        """
+        positions = None
+        for group in groups:
+            found = self._execute_plan(self.plan_query(group))
+            positions = found if positions is None else np.union1d(positions, found)
+        return self.database.iloc[positions]
+
+    def query_inventory(self, query) -> pd.DataFrame:
+        """
+        Recherche des éléments avec une requête combinant plusieurs critères.
+
+        Exemple : query_inventory("Quantity<5 AND Category=Power Tools OR Product^=Pai").
+
+        PRE: query est une chaîne au format de parse_query ou le résultat de parse_query.
+        POST: Affiche et retourne les lignes correspondantes, dans l'ordre de la base.
+              Retourne None si la requête est invalide.
+        """
+        try:
+            results = self.run_query(query)
+        except ValueError as e:
+            logger.error("%s", e)
+            return None
+
+        with track("display"):
+            if results.empty:
+                print("Aucun résultat trouvé.")
+            else:
+                print(f"Résultats trouvés pour {query} :\n{results}")
+        return results
+
+    def _read_report_summary(self) -> pd.DataFrame:
+        """
+        Lit le récapitulatif sauvegardé à côté de la base.
+
+        PRE: /
+        POST: Retourne le récapitulatif indexé par (Category, Product), ou None s'il n'existe pas.
+              Un récapitulatif en attente d'écriture est d'abord écrit.
+        """
+        self._flush_report_summary()
+        if not self.summary_file.exists():
+            return None
+        return pd.read_csv(self.summary_file).set_index(['Category', 'Product'])
+
+    def save_report_summary(self):
+        """
+        Sauvegarde le récapitulatif matérialisé à côté de la base.
+
+        PRE: report_summary n'est pas None.
+        POST: REPORT_SUMMARY_FILE contient le récapitulatif (taille proportionnelle au nombre de groupes).
+              Un récapitulatif plus ancien en attente d'écriture est abandonné.
+        """
+        with self._summary_lock:
+            self._pending_summary = None
+            with atomic_write(self.summary_file) as temporary_path:
+                self.report_summary.reset_index().to_csv(temporary_path, index=False)
+
+    def _flush_report_summary(self):
+        """
+        Écrit le récapitulatif laissé en attente par la dernière consolidation.
+
+        consolidate_files l'écrit après avoir rendu le verrou d'écriture : ces entrées-sorties
+        synchronisées ne retardent pas les autres écritures. Seul le dernier récapitulatif en
+        attente est écrit, et toute lecture du fichier l'écrit d'abord.
+
+        PRE: /
+        POST: REPORT_SUMMARY_FILE correspond à la dernière consolidation validée.
+        """
+        with self._summary_lock:
+            summary, self._pending_summary = self._pending_summary, None
+            if summary is not None:
+                with atomic_write(self.summary_file) as temporary_path:
+                    summary.reset_index().to_csv(temporary_path, index=False)
+
+    def rebuild_report_summary(self):
+        """
+        Recalcule entièrement le récapitulatif à partir de la base en mémoire.
+
+        PRE: /
+        POST: report_summary décrit la base en mémoire, ou vaut None si les colonnes du rapport
+              n'ont pas été chargées.
+        """
+        if self.database.empty:
+            self.report_summary = summary_delta(pd.DataFrame(columns=REPORT_COLUMNS))
+        elif all(column in self.database.columns for column in REPORT_COLUMNS):
+            self.report_summary = summary_delta(self.database)
+        else:
+            self.report_summary = None
+        self._summarized_database = self.database
+
+    def _ensure_report_summary(self):
+        """
+        Recalcule le récapitulatif si la base a été remplacée sans passer par load_database
+        ou consolidate_files.
+
+        PRE: /
+        POST: report_summary décrit la base en mémoire.
+        """
+        with self._lazy_lock:
+            if self._summarized_database is not self.database:
+                self.rebuild_report_summary()
+
+    def _load_report_summary(self):
+        """
+        Charge le récapitulatif sauvegardé, ou le recalcule s'il manque ou ne correspond pas à la base.
+
+        PRE: La base vient d'être chargée par load_database.
+        POST: report_summary décrit la base en mémoire et est sauvegardé.
+        """
+        summary = self._read_report_summary()
+        if summary is not None and all(column in self.database.columns for column in ['Category', 'Product']):
+            keyed_rows = int(self.database[['Category', 'Product']].notna().all(axis=1).sum())
+            if keyed_rows == summary["RowCount"].sum():
+                self.report_summary = summary
+                self._summarized_database = self.database
+                return
+        self.rebuild_report_summary()
+        if self.report_summary is not None and not self.database.empty:
+            self.save_report_summary()
+
+    def _group_positions(self, groups: pd.MultiIndex) -> np.ndarray:
+        """
+        Cherche les positions des lignes de la base qui appartiennent à des groupes du récapitulatif.
+
+        Le coût est proportionnel au nombre de lignes des produits concernés, grâce à l'index de Product.
+
+        PRE: groups vient de _summary_groups, les index décrivent la base en mémoire.
+        POST: Retourne les positions triées.
+        """
+        if groups.empty:
+            return np.array([], dtype=np.intp)
+        candidates = np.unique(np.concatenate([
+            self._index_lookup("Product", product) for product in groups.get_level_values("Product").unique()]))
+        rows = self.database.iloc[candidates]
+        inside = pd.MultiIndex.from_arrays(
+            [rows["Category"].astype(str), rows["Product"].astype(str)]).isin(groups)
+        return candidates[inside]
+
+    def _update_report_summary(self, delta: pd.DataFrame, replaced: pd.MultiIndex = None):
+        """
+        Ajoute un delta au récapitulatif matérialisé et le met en attente d'écriture.
+
+        Les minimums et maximums ne se retranchent pas : un groupe dont des lignes ont été
+        modifiées est retiré puis recalculé à partir de toutes ses lignes, incluses dans delta.
+
+        PRE: delta vient de summary_delta sur les lignes ajoutées à la base et sur toutes les
+             lignes des groupes replaced (None si aucune ligne n'a été modifiée).
+        POST: report_summary décrit la base en mémoire ; _flush_report_summary le sauvegarde.
+        """
+        if self.report_summary is None:
+            self.rebuild_report_summary()
+        else:
+            if replaced is not None and not replaced.empty:
+                self.report_summary = self.report_summary.drop(replaced, errors="ignore")
+            self.report_summary = merge_summaries(self.report_summary, delta)
+            self._summarized_database = self.database
+        if self.report_summary is not None:
+            with self._summary_lock:
+                self._pending_summary = self.report_summary
+
+    def verify_report_summary(self) -> bool:
+        """
+        Compare le récapitulatif matérialisé à un recalcul complet sur la base.
+
+        PRE: La base en mémoire contient les colonnes du rapport, ou est vide.
+        POST: Affiche le résultat et retourne True si les deux rapports concordent (toujours
+              True pour une base vide). Si la base est partitionnée, toutes les partitions sont chargées.
+        """
+        with self._reading():
+            if self.database.empty:
+                return True
+            self._ensure_report_summary()
+            expected = compute_report(self.database)
+            actual = summary_report(self.report_summary)
+            matches = (
+                len(expected) == len(actual)
+                and expected[['Category', 'Product']].astype(str).equals(actual[['Category', 'Product']].astype(str))
+                and all(np.allclose(expected[column].astype(float), actual[column].astype(float), equal_nan=True)
+                        for column in expected.columns[2:])
+            )
+            if matches:
+                logger.info("Récapitulatif vérifié : identique au recalcul complet.")
+            else:
+                logger.warning("Récapitulatif incohérent avec la base : il est recalculé.")
+                with self._lazy_lock:
+                    self.invalidate_cache()
+                    self.rebuild_report_summary()
+                    self.save_report_summary()
+        return matches
+
+    @instrumented("generate_report")
+    def generate_report(self, output_path: str = None, verify: bool = False, display: bool = True,
+                        exact: bool = False):
+        """
+        Génère un rapport récapitulatif sous forme de tableau.
+
+        Le rapport est servi par le récapitulatif matérialisé, en un temps proportionnel au
+        nombre de groupes (Category, Product) et non au nombre de lignes. Il est mis en cache
+        jusqu'au prochain changement de la base, et un fichier dont le dernier contenu écrit
+        est le rapport de la version courante, dans le même mode, n'est pas réécrit tant que sa
+        taille et sa date de modification n'ont pas changé. En mode exact, les montants sont recalculés sur toute la
+        base par compute_exact_report, sans erreur d'arrondi.
+
+        PRE: La base de données contient les colonnes 'Product', 'Category', 'Quantity', et 'UnitPrice'.
+             verify indique s'il faut d'abord comparer le récapitulatif à un recalcul complet.
+        POST: Affiche un tableau dans la console si display est vrai, sauvegarde un fichier CSV
+              si un chemin est fourni et retourne le récapitulatif. Si la base est partitionnée,
+              aucune partition n'est lue, sauf pour verify et pour le mode exact.
+              En mode exact, TotalValue et MeanUnitPrice sont des Fraction.
+        """
+        if verify:
+            self.verify_report_summary()
+        if exact:
+            with self._reading():
+                if self.database.empty:
+                    logger.warning("La base consolidée est vide. Aucun rapport à générer.")
+                    return
+                summary = self._cached(("report", "exact"), lambda: compute_exact_report(self.database))
+                version = self.database_version
+        else:
+            if self.report_summary is None:
+                # Récapitulatif invalidé par une consolidation par blocs : recalculé au rechargement
+                self._refresh()
+            with self.lock.read():
+                self._ensure_report_summary()
+                if self.report_summary is None or self.report_summary.empty:
+                    logger.warning("La base consolidée est vide. Aucun rapport à générer.")
+                    return
+                summary = self._cached(("report",), lambda: summary_report(self.report_summary))
+                version = self.database_version
+
+        if display:
+            with track("display"):
+                print("\n=== Rapport Récapitulatif ===")
+                # tabulate afficherait les Fraction comme des flottants arrondis
+                shown = summary.astype({"TotalValue": str, "MeanUnitPrice": str}) if exact else summary
+                print(tabulate(shown, headers='keys', tablefmt='grid', showindex=False))
+
+        if output_path:
+            # Le cache retient le mode, la taille et la date du dernier rapport écrit dans ce
+            # fichier pour cette version : un fichier modifié depuis par un autre programme est réécrit.
+            written = (version, "report_file", str(Path(output_path).resolve()))
+            mode = "exact" if exact else "float"
+            signature = _file_signature(output_path)
+            if signature is not None and self.query_cache.peek(written) == (mode, *signature):
+                logger.info("Rapport déjà à jour : %s", output_path)
+            else:
+                with track("write_report") as counters:
+                    summary.to_csv(output_path, index=False)
+                    counters.update(rows=len(summary), bytes_written=_file_size(output_path))
+                self.query_cache.put(written, (mode, *_file_signature(output_path)))
+                logger.info("Rapport sauvegardé avec succès : %s", output_path)
+        return summary
+
+    def show_data(self, page: int = 1, page_size: int = PAGE_SIZE, columns: list[str] = None) -> DataViewer:
+        """
+        Affiche une page des données consolidées.
+
+        PRE: La base consolidée peut être vide ou non. page est un numéro de page à partir de 1,
+             page_size est un entier > 0, columns est None ou une liste de colonnes de la base.
+        POST: Affiche la page demandée dans la console et retourne le curseur positionné dessus,
+              ou None si la base est vide. Si la base est partitionnée, toutes les partitions sont chargées.
+        """
+        with self._reading():
+            database = self.database
+        if database.empty:
+            print("La base consolidée est vide.")
+            return None
+        viewer = DataViewer(database, page_size, columns)
+        viewer.position = min(max(page - 1, 0), viewer.page_count - 1)
+        with track("display"):
+            print("Données consolidées :")
+            print(viewer.render())
+        return viewer
+
+# Base par défaut, utilisée par la ligne de commande et le service. Les fonctions du module
+# sont les méthodes de cette instance ; son état se lit par default_database.database, etc.
+default_database = InventoryDatabase()
+consolidate_files = default_database.consolidate_files
+consolidate_files_streaming = default_database.consolidate_files_streaming
+consolidate_shards = default_database.consolidate_shards
+partition_database = default_database.partition_database
+set_storage_format = default_database.set_storage_format
+set_shard_key = default_database.set_shard_key
+append_segment = default_database.append_segment
+compact_segments = default_database.compact_segments
+start_background_compaction = default_database.start_background_compaction
+wait_for_compaction = default_database.wait_for_compaction
+save_database = default_database.save_database
+load_database = default_database.load_database
+load_shards = default_database.load_shards
+query_shards = default_database.query_shards
+row_count = default_database.row_count
+build_indexes = default_database.build_indexes
+invalidate_cache = default_database.invalidate_cache
+search_inventory = default_database.search_inventory
+plan_query = default_database.plan_query
+run_query = default_database.run_query
+query_inventory = default_database.query_inventory
+save_report_summary = default_database.save_report_summary
+rebuild_report_summary = default_database.rebuild_report_summary
+verify_report_summary = default_database.verify_report_summary
+generate_report = default_database.generate_report
+show_data = default_database.show_data
+
+def interactive_mode(chunksize: int = None, workers: int = 1):
     """
     Lancer le programme en mode interactif pour une interaction utilisateur.
+
+    PRE: chunksize est None ou un entier > 0 (consolidation par blocs).
+         workers est le nombre de processus utilisés pour lire les fichiers à consolider.
     """
     while True:
         print("""
@@ -165,13 +2869,26 @@ def interactive_mode():
 
         if choice == "1":
             files = input("Entrez les chemins des fichiers CSV à consolider (séparés par des espaces) : ").strip().split()
-            consolidate_files([Path(file) for file in files])
+            consolidate_files([Path(file) for file in files], chunksize, workers)
         elif choice == "2":
-            show_data()
+            viewer = show_data()
+            while viewer is not None and viewer.page_count > 1:
+                move = input("Page suivante (s), précédente (p) ou retour au menu (q) : ").strip().lower()
+                if move == "s":
+                    viewer.next()
+                elif move == "p":
+                    viewer.previous()
+                else:
+                    break
+                print(viewer.render())
         elif choice == "3":
-            criteria = input("Entrez le nom de la colonne pour la recherche : ").strip()
-            value = input("Entrez la valeur à rechercher : ").strip()
-            search_inventory(criteria, value)
+            criteria = input("Entrez le nom de la colonne pour la recherche "
+                             "(ou une requête, ex. Quantity<5 AND Color=Red) : ").strip()
+            if re.search(r"[<>=!^~]", criteria):
+                query_inventory(criteria)
+            else:
+                value = input("Entrez la valeur à rechercher : ").strip()
+                search_inventory(criteria, value)
         elif choice == "4":
             output_path = input("Entrez le chemin du fichier de rapport à générer : ").strip()
             generate_report(output_path)
@@ -180,6 +2897,96 @@ def interactive_mode():
         else:
             print("Choix invalide. Veuillez entrer un chiffre entre 1 et 5.")
 
+def _write_frame(frame: pd.DataFrame, output_format: str, stream, header: bool = True):
+    """
+    Écrit un DataFrame sur un flux au format JSON (une liste de lignes) ou CSV.
+
+    PRE: output_format vaut "json" ou "csv", stream est un flux texte ouvert.
+    POST: frame est écrit sur stream, suivi d'un retour à la ligne pour JSON.
+    """
+    if output_format == "csv":
+        frame.to_csv(stream, index=False, header=header)
+    else:
+        stream.write(frame.to_json(orient="records", default_handler=str) + "\n")
+
+def _read_queries(args) -> list[str]:
+    """
+    Rassemble les requêtes passées par --query et --queries-file.
+
+    PRE: args vient de l'analyse de la sous-commande search.
+    POST: Retourne les requêtes dans l'ordre, sans lignes vides ni commentaires (#).
+    """
+    queries = list(args.query or [])
+    if args.queries_file:
+        lines = sys.stdin if args.queries_file == "-" else open(args.queries_file, encoding="utf-8")
+        with lines:
+            queries.extend(line.strip() for line in lines)
+    return [query for query in queries if query and not query.startswith("#")]
+
+def log_cache_stats():
+    """
+    Affiche les statistiques du cache des requêtes.
+
+    PRE: /
+    POST: Un message résume les succès, échecs et entrées du cache.
+    """
+    logger.info("Cache des requêtes : %(hits)d succès, %(misses)d échecs, %(size)d/%(maxsize)d entrées "
+                "(version %(version)d de la base).", default_database.query_cache.stats())
+
+def run_command(args, stdout=None) -> int:
+    """
+    Exécute une sous-commande non interactive et écrit son résultat sur la sortie standard.
+
+    Les messages destinés à l'utilisateur sont envoyés sur la sortie d'erreur, la sortie
+    standard ne contient que le résultat (JSON ou CSV) exploitable par un script.
+
+    PRE: args vient de main, args.command vaut consolidate, search, report ou show.
+    POST: Retourne le code de sortie du programme (0 si tout s'est bien passé, 1 si une
+          requête de la sous-commande search était invalide).
+          consolidate écrit total_rows (lignes de la base) et rows_added (lignes écrites par
+          cette consolidation), avec ou sans --chunksize.
+    """
+    stdout = stdout or sys.stdout
+    status = 0
+    header = True
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.command == "consolidate":
+            load_database()
+            stats = consolidate_files([Path(file) for file in args.files], args.chunksize, args.workers)
+            # En mode par blocs, "rows" compte les lignes écrites : il devient rows_added
+            rows_added = stats.pop("rows") if "rows" in stats else stats["inserted"] + stats["updated"]
+            result = pd.DataFrame([{"total_rows": default_database.row_count(), "rows_added": rows_added, **stats}])
+            _write_frame(result, args.output_format, stdout)
+        elif args.command == "search":
+            load_database()
+            for query in _read_queries(args):
+                try:
+                    results = run_query(query)
+                except ValueError as e:
+                    logger.error("%s : %s", query, e)
+                    status = 1
+                    if args.output_format == "json":
+                        stdout.write(json.dumps({"query": query, "error": str(e)}) + "\n")
+                    continue
+                if args.output_format == "csv":
+                    _write_frame(results.assign(Query=query), "csv", stdout, header=header)
+                    header = False
+                else:
+                    stdout.write(f'{{"query": {json.dumps(query)}, "rows": {results.to_json(orient="records")}}}\n')
+        elif args.command == "report":
+            load_database(columns=REPORT_COLUMNS + EXACT_PRICE_COLUMNS if args.exact else REPORT_COLUMNS)
+            summary = generate_report(args.output, args.verify, display=False, exact=args.exact)
+            _write_frame(summary if summary is not None else pd.DataFrame(), args.output_format, stdout)
+        elif args.command == "show":
+            load_database(columns=args.columns)
+            load_shards()
+            stop = args.offset + args.limit if args.limit else None
+            frame = default_database.database.iloc[args.offset:stop]
+            _write_frame(frame, args.output_format, stdout)
+        if args.cache_stats:
+            log_cache_stats()
+    return status
+
 def main():
     """
     Point d'entrée principal du programme.
@@ -188,15 +2995,99 @@ def main():
     """
     parser = argparse.ArgumentParser(description="Gestion d'inventaire consolidée.")
     parser.add_argument('--interactive', action='store_true', help="Lancer le programme en mode interactif.")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Consolider les fichiers par blocs de N lignes sans charger la base en mémoire.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Nombre de processus pour lire et valider les fichiers à consolider.")
+    parser.add_argument('--format', choices=list(STORAGE_FORMATS), default="csv",
+                        help="Format de stockage de la base consolidée (parquet, feather et arrow nécessitent pyarrow).")
+    parser.add_argument('--shard-by', choices=ROW_KEY_COLUMNS, default=None,
+                        help="Partitionner la base par cette colonne (une partition par valeur, chargée à la demande).")
+    parser.add_argument('--serve', action='store_true',
+                        help="Lancer le service qui garde la base en mémoire et répond aux requêtes JSON.")
+    parser.add_argument('--host', default="127.0.0.1", help="Adresse d'écoute du service.")
+    parser.add_argument('--port', type=int, default=8765, help="Port d'écoute du service.")
+    parser.add_argument('--socket', default=None, help="Socket Unix d'écoute du service (remplace --host/--port).")
+    parser.add_argument('--log-level', choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="INFO",
+                        help="Niveau des messages affichés.")
+    parser.add_argument('--output-format', choices=["json", "csv"], default="json",
+                        help="Format du résultat des sous-commandes sur la sortie standard.")
+    parser.add_argument('--cache-size', type=int, default=QUERY_CACHE_SIZE,
+                        help="Nombre maximal de résultats gardés en cache (0 pour désactiver le cache).")
+    parser.add_argument('--cache-stats', action='store_true',
+                        help="Afficher les statistiques du cache des requêtes en fin d'exécution.")
+    parser.add_argument('--metrics-json', metavar="PATH",
+                        help="Écrire les mesures par opération en JSON à la fin de l'exécution ('-' pour la sortie d'erreur).")
+    parser.add_argument('--profile', metavar="PATH",
+                        help="Profiler l'exécution avec cProfile et écrire le résultat (lisible avec pstats ou snakeviz).")
+
+    commands = parser.add_subparsers(dest="command", title="sous-commandes")
+    consolidate_parser = commands.add_parser("consolidate", help="Consolider des fichiers CSV.")
+    consolidate_parser.add_argument('files', nargs='+', help="Fichiers CSV à consolider.")
+    search_parser = commands.add_parser("search", help="Exécuter des requêtes sur la base consolidée.")
+    search_parser.add_argument('-q', '--query', action='append',
+                               help="Requête, par exemple 'Quantity<5 AND Color=Red'. Peut être répétée.")
+    search_parser.add_argument('--queries-file',
+                               help="Fichier contenant une requête par ligne ('-' pour l'entrée standard).")
+    report_parser = commands.add_parser("report", help="Générer le rapport récapitulatif.")
+    report_parser.add_argument('--output', help="Chemin du fichier CSV du rapport.")
+    report_parser.add_argument('--verify', action='store_true',
+                               help="Vérifier le récapitulatif matérialisé par un recalcul complet.")
+    report_parser.add_argument('--exact', action='store_true',
+                               help="Calculer les montants en fractions exactes (UnitPriceNum/UnitPriceDen "
+                                    "ou prix au centime).")
+    show_parser = commands.add_parser("show", help="Afficher les données consolidées.")
+    show_parser.add_argument('--offset', type=int, default=0, help="Position de la première ligne.")
+    show_parser.add_argument('--limit', type=int, default=None, help="Nombre maximal de lignes.")
+    show_parser.add_argument('--columns', nargs='+', default=None, help="Colonnes à afficher.")
     args = parser.parse_args()
 
+    logger.setLevel(args.log_level)
+    set_storage_format(args.format)
+    set_shard_key(args.shard_by)
+    default_database.query_cache.maxsize = args.cache_size
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+
+    if args.command:
+        status = run_command(args)
+        wait_for_compaction()
+        _finish_run(args, profiler)
+        sys.exit(status)
+
     load_database()
 
-    if args.interactive:
-        interactive_mode()
+    if args.serve:
+        from service import serve
+        serve(args.host, args.port, args.socket, default_database)
+    elif args.interactive:
+        interactive_mode(args.chunksize, args.workers)
     else:
         print("Utilisez l'option '--interactive' pour lancer le mode interactif ou passez des commandes via argparse.")
         print("Exemple : python script.py --interactive")
+    if args.cache_stats:
+        log_cache_stats()
+    wait_for_compaction()
+    _finish_run(args, profiler)
+
+def _finish_run(args, profiler: cProfile.Profile = None):
+    """
+    Écrit le profil et les mesures demandés sur la ligne de commande.
+
+    PRE: args vient de main, profiler est le profileur démarré par --profile ou None.
+    POST: Le profil cProfile est écrit dans args.profile, les mesures en JSON dans
+          args.metrics_json (sur la sortie d'erreur pour '-').
+    """
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        logger.info("Profil écrit : %s", args.profile)
+    if args.metrics_json == "-":
+        sys.stderr.write(json.dumps(metrics_report(), indent=2) + "\n")
+    elif args.metrics_json:
+        with open(args.metrics_json, "w", encoding="utf-8") as metrics_file:
+            json.dump(metrics_report(), metrics_file, indent=2)
 
 if __name__ == "__main__":
     main()
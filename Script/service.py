@@ -0,0 +1,234 @@
+import asyncio
+import contextlib
+import io
+import json
+import socket
+from pathlib import Path
+import pandas as pd
+
+import script
+
+# Protocole : une requête JSON par ligne, une réponse JSON par ligne.
+# Exemple : {"op": "search", "query": "Quantity<5"} -> {"ok": true, "rows": [...], "messages": "..."}
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+SHOW_LIMIT = 100
+
+
+def _records(frame: pd.DataFrame) -> list[dict]:
+    """
+    Convertit un DataFrame en liste de dictionnaires sérialisables en JSON.
+
+    PRE: frame est un DataFrame ou None.
+    POST: Retourne une liste de lignes, les valeurs manquantes devenant null.
+    """
+    if frame is None or frame.empty:
+        return []
+    return json.loads(frame.to_json(orient="records", default_handler=str))
+
+
+def _consolidate(database: script.InventoryDatabase, request: dict) -> dict:
+    """
+    Consolide les fichiers de la requête dans la base chaude.
+
+    PRE: request contient "files", et éventuellement "chunksize" et "workers".
+    POST: Retourne le nombre de lignes de la base après consolidation, partitions non
+          chargées comprises.
+    """
+    files = [Path(file) for file in request["files"]]
+    stats = database.consolidate_files(files, request.get("chunksize"), request.get("workers", 1))
+    return {"rows": database.row_count(), "stats": stats}
+
+
+def _search(database: script.InventoryDatabase, request: dict) -> dict:
+    """
+    Exécute une recherche simple (criteria/value) ou une requête composée (query).
+
+    PRE: request contient "query", ou "criteria" et "value".
+    POST: Retourne les lignes trouvées. Lève ValueError si la requête ou le critère est
+          rejeté par la base (la raison est dans les messages).
+    """
+    if "query" in request:
+        rows = database.query_inventory(request["query"])
+    else:
+        rows = database.search_inventory(request["criteria"], str(request["value"]))
+    if rows is None:
+        raise ValueError("recherche rejetée, voir les messages.")
+    return {"rows": _records(rows)}
+
+
+def _report(database: script.InventoryDatabase, request: dict) -> dict:
+    """
+    Génère le rapport récapitulatif.
+
+    PRE: request peut contenir "output" (chemin du CSV), "verify" et "exact".
+    POST: Retourne les lignes du rapport ; en mode exact, les montants sont des chaînes (par exemple "2/3").
+    """
+    report = database.generate_report(request.get("output"), request.get("verify", False),
+                                      exact=request.get("exact", False))
+    return {"rows": _records(report)}
+
+
+def _show(database: script.InventoryDatabase, request: dict) -> dict:
+    """
+    Retourne les premières lignes de la base chaude.
+
+    PRE: request peut contenir "limit" (SHOW_LIMIT par défaut).
+    POST: Retourne au plus limit lignes et le nombre total de lignes.
+    """
+    limit = request.get("limit", SHOW_LIMIT)
+    database.load_shards()
+    rows = database.database
+    return {"rows": _records(rows.head(limit)), "total": len(rows)}
+
+
+OPERATIONS = {
+    "consolidate": _consolidate,
+    "search": _search,
+    "report": _report,
+    "show": _show,
+    "cache": lambda database, request: {"cache": database.query_cache.stats()},
+    "metrics": lambda database, request: {"metrics": script.metrics_report()},
+    "ping": lambda database, request: {},
+}
+
+
+def handle_request(request: dict, database: script.InventoryDatabase = None) -> dict:
+    """
+    Exécute une requête sur la base chaude en capturant les messages affichés.
+
+    PRE: request est la requête JSON décodée, database est None (script.default_database)
+         ou la base servie.
+    POST: Retourne la réponse {"ok": bool, "messages": str, ...}. Toute erreur, y compris une
+          requête qui n'est pas un objet JSON, est renvoyée au client au lieu d'arrêter le service.
+    """
+    if not isinstance(request, dict):
+        return {"ok": False, "error": "Requête invalide : un objet JSON est attendu."}
+    operation = OPERATIONS.get(request.get("op"))
+    if operation is None:
+        return {"ok": False, "error": f"Opération inconnue : {request.get('op')}. "
+                                      f"Opérations disponibles : {', '.join(OPERATIONS)}"}
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            response = operation(database or script.default_database, request)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"ok": False, "error": f"Requête invalide : {e}", "messages": output.getvalue()}
+    except Exception as e:
+        return {"ok": False, "error": f"Échec de l'opération {request['op']} : {e}", "messages": output.getvalue()}
+    return {"ok": True, "messages": output.getvalue(), **response}
+
+
+class InventoryService:
+    """
+    Service asyncio qui garde la base consolidée chargée en mémoire.
+
+    Les entrées-sorties des clients sont asynchrones : un client lent ne bloque pas les
+    autres. Les opérations sur la base s'exécutent une à une dans un thread, hors de la
+    boucle d'événements : les messages affichés sont capturés en redirigeant sys.stdout,
+    commun à tout le processus.
+    """
+
+    def __init__(self, database: script.InventoryDatabase = None):
+        """
+        PRE: database est None (script.default_database) ou une base chargée avec load_database.
+        POST: Le service est prêt à être démarré.
+        """
+        self.database = database or script.default_database
+        self.lock = asyncio.Lock()
+        self.server = None
+
+    async def _execute(self, request: dict) -> dict:
+        """
+        Exécute une requête en exclusion mutuelle avec les autres.
+
+        PRE: request est un dictionnaire.
+        POST: Retourne la réponse de handle_request.
+        """
+        async with self.lock:
+            return await asyncio.to_thread(handle_request, request, self.database)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Traite les requêtes d'un client jusqu'à ce qu'il ferme la connexion.
+
+        PRE: reader et writer sont les flux de la connexion.
+        POST: Une réponse est écrite pour chaque ligne reçue.
+        """
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    response = {"ok": False, "error": f"JSON invalide : {e}"}
+                else:
+                    response = await self._execute(request)
+                writer.write(json.dumps(response, default=str).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_socket: str = None):
+        """
+        Démarre l'écoute sur un port TCP local ou sur un socket Unix.
+
+        PRE: host et port, ou unix_socket, désignent une adresse libre.
+        POST: Le serveur accepte les connexions. Retourne l'adresse d'écoute.
+        """
+        if unix_socket:
+            self.server = await asyncio.start_unix_server(self._handle_client, path=unix_socket)
+        else:
+            self.server = await asyncio.start_server(self._handle_client, host, port)
+        return self.server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        """
+        Sert les clients jusqu'à l'arrêt du serveur.
+
+        PRE: start a été appelé.
+        """
+        async with self.server:
+            await self.server.serve_forever()
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_socket: str = None,
+          database: script.InventoryDatabase = None):
+    """
+    Lance le service d'inventaire jusqu'à interruption (Ctrl+C).
+
+    PRE: database est None (script.default_database) ou une base chargée avec load_database.
+    POST: Le service s'arrête proprement sur KeyboardInterrupt.
+    """
+    async def run():
+        service = InventoryService(database)
+        address = await service.start(host, port, unix_socket)
+        print(f"Service d'inventaire à l'écoute sur {address}.")
+        await service.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("Service d'inventaire arrêté.")
+
+
+def send_request(request: dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 unix_socket: str = None) -> dict:
+    """
+    Envoie une requête au service et attend sa réponse (client synchrone).
+
+    PRE: Le service écoute à l'adresse donnée, request est sérialisable en JSON.
+    POST: Retourne la réponse décodée.
+    """
+    if unix_socket:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(unix_socket)
+    else:
+        connection = socket.create_connection((host, port))
+    with connection, connection.makefile("rwb") as stream:
+        stream.write(json.dumps(request).encode() + b"\n")
+        stream.flush()
+        return json.loads(stream.readline())
@@ -0,0 +1,41 @@
+import unittest
+import pandas as pd
+
+from benchmark import compare_to_baseline, generate_inventory
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_generate_inventory(self):
+        """Tester la taille, les cardinalités et le taux de valeurs manquantes de l'inventaire généré."""
+        data = generate_inventory(10_000, categories=8, skus=200, null_rate=0.5, seed=1)
+        self.assertEqual(list(data.columns), ["Product", "Category", "Quantity", "UnitPrice", "Color"])
+        self.assertEqual(len(data), 10_000)
+        self.assertLessEqual(data["Product"].nunique(), 200)
+        self.assertLessEqual(data["Category"].nunique(), 8)
+        self.assertTrue((data.groupby("Product")["Category"].nunique() == 1).all())
+        self.assertAlmostEqual(data["Color"].isna().mean(), 0.5, delta=0.05)
+        self.assertTrue((data["UnitPrice"] > 0).all())
+        pd.testing.assert_frame_equal(data, generate_inventory(10_000, categories=8, skus=200, null_rate=0.5, seed=1))
+
+    def test_compare_to_baseline(self):
+        """Tester la détection des régressions de durée, de mémoire et de résultat."""
+        baseline = [
+            {"operation": "search_inventory", "seconds": 1.0, "peak_mb": 10.0, "rows": 5},
+            {"operation": "generate_report", "seconds": 0.001, "peak_mb": 0.1, "rows": 3},
+        ]
+        self.assertEqual(compare_to_baseline(baseline, baseline), [])
+
+        results = [
+            {"operation": "search_inventory", "seconds": 2.0, "peak_mb": 30.0, "rows": 4},
+            {"operation": "generate_report", "seconds": 0.005, "peak_mb": 0.5, "rows": 3},
+        ]
+        regressions = compare_to_baseline(results, baseline)
+        self.assertEqual(len(regressions), 3)
+        self.assertTrue(all(regression.startswith("search_inventory") for regression in regressions))
+        self.assertEqual(compare_to_baseline(results[1:], baseline)[0],
+                         "search_inventory : opération absente des résultats")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,27 @@
 import unittest
 import pandas as pd
+import importlib.util
+import contextlib
+import json
 import os
+import shutil
+import tempfile
+import threading
+import time
+from fractions import Fraction
 from pathlib import Path
+import script
 from script import (
     load_csv,
     consolidate_files,
+    consolidate_files_streaming,
+    compact_segments,
     save_database,
     load_database,
     search_inventory,
+    parse_query,
+    plan_query,
+    query_inventory,
     generate_report,
     show_data,
     interactive_mode
@@ -23,8 +37,7 @@ class TestInventoryManagement(unittest.TestCase):
         Configuration avant chaque test.
         Initialise une base de données temporaire.
         """
-        global database
-        database = pd.DataFrame()
+        script.default_database.database = pd.DataFrame()
 
     def tearDown(self):
         """
@@ -33,8 +46,18 @@ class TestInventoryManagement(unittest.TestCase):
         """
         if os.path.exists("consolidated_database.csv"):
             os.remove("consolidated_database.csv")
+        script.wait_for_compaction()
+        shutil.rmtree(script.SEGMENTS_DIR, ignore_errors=True)
+        shutil.rmtree(script.SHARDS_DIR, ignore_errors=True)
+        script.set_shard_key(None)
+        if os.path.exists(script.REPORT_SUMMARY_FILE):
+            os.remove(script.REPORT_SUMMARY_FILE)
+        for name in script.STORAGE_FORMATS:
+            script.default_database._base_path(name).unlink(missing_ok=True)
+        script.set_storage_format("csv")
         if os.path.exists("test_report.csv"):
             os.remove("test_report.csv")
+        load_database()
 
     def test_load_csv_valid_file(self):
         """Tester le chargement d'un fichier CSV valide."""
@@ -65,8 +88,8 @@ class TestInventoryManagement(unittest.TestCase):
         }).to_csv(file2, index=False)
 
         consolidate_files([Path(file1), Path(file2)])
-        self.assertEqual(len(database), 4)
-        self.assertIn("Category", database.columns)
+        self.assertEqual(len(script.default_database.database), 4)
+        self.assertIn("Category", script.default_database.database.columns)
 
         os.remove(file1)
         os.remove(file2)
@@ -81,16 +104,15 @@ class TestInventoryManagement(unittest.TestCase):
         }).to_csv("consolidated_database.csv", index=False)
 
         load_database()
-        self.assertEqual(len(database), 1)
-        self.assertIn("Product", database.columns)
+        self.assertEqual(len(script.default_database.database), 1)
+        self.assertIn("Product", script.default_database.database.columns)
 
         save_database()
         self.assertTrue(os.path.exists("consolidated_database.csv"))
 
     def test_search_inventory(self):
         """Tester la recherche dans l'inventaire."""
-        global database
-        database = pd.DataFrame({
+        script.default_database.database = pd.DataFrame({
             "Product": ["A", "B", "C"],
             "Category": ["Tools", "Garden", "Tools"],
             "Quantity": [10, 20, 15],
@@ -101,10 +123,139 @@ class TestInventoryManagement(unittest.TestCase):
         search_inventory("Category", "Nonexistent")
         search_inventory("InvalidColumn", "Tools")
 
+    def test_search_inventory_indexes(self):
+        """Tester que les index suivent les consolidations et donnent les mêmes résultats qu'un parcours."""
+        script.default_database.database = pd.DataFrame({
+            "Product": ["A", "B", "C"],
+            "Category": ["Tools", "Garden", "Tools"],
+            "Quantity": [10, 20, 10],
+            "UnitPrice": [5.0, 7.5, 10.0],
+            "Color": ["Red", None, "Blue"]
+        })
+        self.assertEqual(list(search_inventory("Category", "Tools")["Product"]), ["A", "C"])
+        self.assertIs(script.default_database._indexed_database, script.default_database.database)
+
+        file1 = "test_data1.csv"
+        pd.DataFrame({
+            "Product": ["D", "E"],
+            "Category": ["Tools", "Garden"],
+            "Quantity": [10, 5],
+            "UnitPrice": [1.0, 7.5]
+        }).to_csv(file1, index=False)
+        consolidate_files([Path(file1)])
+        self.assertIs(script.default_database._indexed_database, script.default_database.database)
+
+        self.assertEqual(list(search_inventory("Category", "Tools")["Product"]), ["A", "C", "D"])
+        self.assertEqual(list(search_inventory("Quantity", "10")["Product"]), ["A", "C", "D"])
+        self.assertEqual(list(search_inventory("UnitPrice", "7.5")["Product"]), ["B", "E"])
+        self.assertEqual(list(search_inventory("Color", "nan")["Product"]), ["B", "D", "E"])
+        self.assertIsNone(search_inventory("InvalidColumn", "Tools"))
+        os.remove(file1)
+
+    def test_query_inventory(self):
+        """Tester les requêtes par plage, préfixe, sous-chaîne et AND/OR."""
+        script.default_database.database = pd.DataFrame({
+            "Product": ["Paint", "Pail", "Drill", "Black and Decker"],
+            "Category": ["Painting", "Lawn and Garden", "Power Tools", "Power Tools"],
+            "Quantity": [3, 12, 4, 20],
+            "UnitPrice": [15.0, 7.5, 120.0, 30.0],
+            "Color": ["Red", None, None, None]
+        })
+        self.assertEqual(parse_query("Quantity<5 AND Color=Red OR Product^=Pa"),
+                         [[("Quantity", "<", "5"), ("Color", "=", "Red")], [("Product", "^=", "Pa")]])
+        with self.assertRaises(ValueError):
+            parse_query("Quantity")
+        # AND/OR dans une valeur, entre guillemets ou non, ne sépare pas les prédicats
+        self.assertEqual(parse_query('Product="Black and Decker" OR Product=\'Salt or Pepper\''),
+                         [[("Product", "=", "Black and Decker")], [("Product", "=", "Salt or Pepper")]])
+        self.assertEqual(parse_query("Category=Lawn and Garden AND Quantity>5"),
+                         [[("Category", "=", "Lawn and Garden"), ("Quantity", ">", "5")]])
+
+        self.assertEqual(list(query_inventory("Quantity<5")["Product"]), ["Paint", "Drill"])
+        self.assertEqual(list(query_inventory("Quantity<5 AND Category=Power Tools")["Product"]), ["Drill"])
+        self.assertEqual(list(query_inventory("Product^=Pai OR UnitPrice>=100")["Product"]),
+                         ["Paint", "Pail", "Drill"])
+        self.assertEqual(list(query_inventory("Product~=ai AND Color=nan")["Product"]), ["Pail"])
+        self.assertEqual(list(query_inventory('Product="Black and Decker"')["Product"]), ["Black and Decker"])
+        self.assertEqual(list(query_inventory("Category=Lawn and Garden")["Product"]), ["Pail"])
+        self.assertIsNone(query_inventory("Weight<5"))
+
+        plan = plan_query(parse_query("Category=Power Tools AND Color=Red")[0])
+        self.assertEqual([step[0] for step in plan], ["Color", "Category"])
+
+    def test_query_cache(self):
+        """Tester le cache des requêtes : succès, normalisation, invalidation et éviction."""
+        script.default_database.database = pd.DataFrame({
+            "Product": ["A", "B"],
+            "Category": ["Tools", "Garden"],
+            "Quantity": [10, 20],
+            "UnitPrice": [5.0, 7.5]
+        })
+        hits = script.default_database.query_cache.hits
+        search_inventory("Category", "Tools")
+        search_inventory("Category", "Tools")
+        script.run_query("Quantity>5 AND Category=Tools")
+        result = script.run_query("Category=Tools AND Quantity>5")
+        self.assertEqual(script.default_database.query_cache.hits - hits, 2)
+        self.assertEqual(list(result["Product"]), ["A"])
+
+        generate_report("test_report.csv", display=False)
+        with self.assertLogs("inventory", level="INFO") as logs:
+            generate_report("test_report.csv", display=False)
+        self.assertIn("Rapport déjà à jour", "\n".join(logs.output))
+        # Un fichier tronqué ou modifié hors du programme est réécrit
+        content = Path("test_report.csv").read_text()
+        open("test_report.csv", "w").close()
+        generate_report("test_report.csv", display=False)
+        self.assertEqual(Path("test_report.csv").read_text(), content)
+        with open("test_report.csv", "a") as report:
+            report.write("Tools,Z,0,0,0,0,0,0\n")
+        generate_report("test_report.csv", display=False)
+        self.assertEqual(Path("test_report.csv").read_text(), content)
+        os.utime("test_report.csv", (0, 0))
+
+        file1 = "test_data1.csv"
+        pd.DataFrame({
+            "Product": ["C"],
+            "Category": ["Tools"],
+            "Quantity": [30],
+            "UnitPrice": [1.0]
+        }).to_csv(file1, index=False)
+        version = script.default_database.database_version
+        consolidate_files([Path(file1)])
+        self.assertGreater(script.default_database.database_version, version)
+        self.assertEqual(list(script.run_query("Category=Tools AND Quantity>5")["Product"]), ["A", "C"])
+        generate_report("test_report.csv", display=False)
+        self.assertGreater(os.path.getmtime("test_report.csv"), 0)
+
+        cache = script.QueryCache(maxsize=2)
+        for key in ["a", "b", "a", "c"]:
+            if cache.get(key) is None:
+                cache.put(key, key.upper())
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        self.assertEqual((cache.peek("a"), cache.peek("b")), ("A", None))
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        os.remove(file1)
+
+    @patch("builtins.input", side_effect=["3", "Quantity>=12 AND UnitPrice<10", "5"])
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_interactive_query(self, mock_stdout, _):
+        """Tester la saisie d'une requête dans le mode interactif."""
+        script.default_database.database = pd.DataFrame({
+            "Product": ["A", "B"],
+            "Category": ["Tools", "Garden"],
+            "Quantity": [10, 20],
+            "UnitPrice": [5.0, 7.5]
+        })
+        interactive_mode()
+        output = mock_stdout.getvalue()
+        self.assertIn("Résultats trouvés pour Quantity>=12 AND UnitPrice<10", output)
+
     def test_generate_report(self):
         """Tester la génération d'un rapport."""
-        global database
-        database = pd.DataFrame({
+        script.default_database.database = pd.DataFrame({
             "Product": ["A", "B", "C"],
             "Category": ["Tools", "Garden", "Tools"],
             "Quantity": [10, 20, 15],
@@ -117,17 +268,696 @@ class TestInventoryManagement(unittest.TestCase):
         self.assertIn("Product", report.columns)
         self.assertIn("Category", report.columns)
 
+    def test_generate_report_aggregates(self):
+        """Tester les agrégats du rapport vectorisé."""
+        script.default_database.database = pd.DataFrame({
+            "Product": ["A", "A", "B"],
+            "Category": ["Tools", "Tools", "Garden"],
+            "Quantity": [10, 30, 20],
+            "UnitPrice": [5.0, 7.0, 7.5]
+        })
+        summary = generate_report()
+        self.assertEqual(list(summary["Product"]), ["B", "A"])
+        tools = summary[summary["Product"] == "A"].iloc[0]
+        self.assertEqual(tools["TotalQuantity"], 40)
+        self.assertAlmostEqual(tools["TotalValue"], 260.0)
+        self.assertAlmostEqual(tools["MeanUnitPrice"], 6.0)
+        self.assertEqual((tools["MinQuantity"], tools["MaxQuantity"], tools["RowCount"]), (10, 30, 2))
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_generate_report_exact(self, mock_stdout):
+        """Tester le rapport exact : centimes, prix rationnels, réduction et dépassement de int64."""
+        script.default_database.database = pd.DataFrame({
+            "Product": ["A", "A", "B", "C"],
+            "Category": ["Tools", "Tools", "Garden", "Garden"],
+            "Quantity": [3, None, 2, 10 ** 12],
+            "UnitPrice": [0.1, 0.2, None, 0.1],
+            "UnitPriceNum": [None, None, 1, 10 ** 12 + 1],
+            "UnitPriceDen": [None, None, 3, 7]
+        })
+        summary = generate_report(exact=True).set_index("Product")
+        self.assertEqual(summary.loc["A", "TotalValue"], Fraction(3, 10))
+        self.assertEqual(summary.loc["A", "MeanUnitPrice"], Fraction(3, 20))
+        self.assertEqual(summary.loc["B", "TotalValue"], Fraction(2, 3))
+        self.assertEqual(summary.loc["C", "TotalValue"], Fraction(10 ** 12) * Fraction(10 ** 12 + 1, 7))
+        self.assertEqual(summary.loc["A", "TotalQuantity"], 3)
+        self.assertIn("3/10", mock_stdout.getvalue())
+
+        script.default_database.database = pd.DataFrame({
+            "Product": ["A"] * 10,
+            "Category": ["Tools"] * 10,
+            "Quantity": [3] * 10,
+            "UnitPrice": [0.1] * 10
+        })
+        self.assertNotEqual(generate_report(display=False)["TotalValue"].iloc[0], 3.0)
+        self.assertEqual(generate_report(display=False, exact=True)["TotalValue"].iloc[0], 3)
+
+        # Le fichier est réécrit quand le mode change, même sans changement de la base
+        for exact in (True, False, True):
+            generate_report("test_report.csv", display=False, exact=exact)
+            written = pd.read_csv("test_report.csv", dtype=str)["TotalValue"].iloc[0]
+            self.assertEqual(written == "3", exact)
+
+        script.default_database.database = script.default_database.database.assign(UnitPriceNum=[1] * 10, UnitPriceDen=[0] * 10)
+        with self.assertRaises(ValueError):
+            generate_report(display=False, exact=True)
+
+    def test_report_summary_incremental(self):
+        """Tester le récapitulatif maintenu par deltas, sa sauvegarde et sa vérification."""
+        file1 = "test_data1.csv"
+        file2 = "test_data2.csv"
+        pd.DataFrame({
+            "Product": ["A", "B"],
+            "Category": ["Tools", "Garden"],
+            "Quantity": [10, 20],
+            "UnitPrice": [5.0, 7.5]
+        }).to_csv(file1, index=False)
+        pd.DataFrame({
+            "Product": ["A", "C"],
+            "Category": ["Tools", "Garden"],
+            "Quantity": [2, 4],
+            "UnitPrice": [6.0, 1.0]
+        }).to_csv(file2, index=False)
+
+        consolidate_files([Path(file1)])
+        consolidate_files([Path(file2)])
+        self.assertTrue(os.path.exists(script.REPORT_SUMMARY_FILE))
+        summary = generate_report(verify=True)
+        self.assertTrue(summary.equals(script.compute_report(script.default_database.database)))
+        self.assertEqual(summary.set_index("Product").loc["A", "TotalQuantity"], 2)
+
+        pd.DataFrame({
+            "Product": ["A", "D"],
+            "Category": ["Tools", "Garden"],
+            "Quantity": [5, 1],
+            "UnitPrice": [6.0, 1.0]
+        }).to_csv(file2, index=False)
+        consolidate_files([Path(file2)], chunksize=1)
+        self.assertEqual(generate_report().set_index("Product").loc["A", "TotalQuantity"], 5)
+        self.assertEqual(sorted(script.default_database.database["Product"]), ["A", "B", "C", "D"])
+        self.assertTrue(script.verify_report_summary())
+        script.default_database.report_summary.loc[("Tools", "A"), "TotalQuantity"] = 0
+        self.assertFalse(script.verify_report_summary())
+        self.assertTrue(script.verify_report_summary())
+
+        os.remove(file1)
+        os.remove(file2)
+
     def test_show_data(self):
         """Tester l'affichage des données consolidées."""
-        global database
-        database = pd.DataFrame({
+        script.default_database.database = pd.DataFrame({
             "Product": ["A", "B", "C"],
             "Category": ["Tools", "Garden", "Tools"],
             "Quantity": [10, 20, 15],
             "UnitPrice": [5.0, 7.5, 10.0]
         })
         show_data()
-        self.assertFalse(database.empty)
+        self.assertFalse(script.default_database.database.empty)
+
+    def test_consolidate_files_streaming(self):
+        """Tester la consolidation par blocs et le rejet des blocs invalides."""
+        file1 = "test_data1.csv"
+        file2 = "test_data2.csv"
+        pd.DataFrame({
+            "Product": ["A", "B", "C"],
+            "Category": ["Tools", "Tools", "Garden"],
+            "Quantity": [10, 20, 30],
+            "UnitPrice": [5.0, 7.5, 2.0]
+        }).to_csv(file1, index=False)
+        pd.DataFrame({
+            "Product": ["D"],
+            "Category": ["Garden"],
+            "UnitPrice": [1.0]
+        }).to_csv(file2, index=False)
+
+        stats = consolidate_files_streaming([Path(file1), Path(file2)], chunksize=2)
+        self.assertEqual(stats["rows"], 3)
+        self.assertGreater(stats["peak_memory"], 0)
+        self.assertTrue(script.default_database.database.empty)
+        load_database()
+        self.assertEqual(list(script.default_database.database["Product"]), ["A", "B", "C"])
+
+        stats = consolidate_files([Path(file1)], chunksize=2)
+        self.assertEqual((stats["rows"], stats["skipped"]), (0, 3))
+        self.assertTrue(script.default_database.database.empty)
+        self.assertEqual(script.row_count(), 3)
+
+        # consolidate_files ne recharge pas la base : la lecture suivante s'en charge
+        pd.DataFrame({
+            "Product": ["E"],
+            "Category": ["Garden"],
+            "Quantity": [5],
+            "UnitPrice": [4.0]
+        }).to_csv(file2, index=False)
+        stats = consolidate_files([Path(file2)], chunksize=2)
+        self.assertEqual(stats["rows"], 1)
+        self.assertTrue(script.default_database.database.empty)
+        self.assertEqual(len(search_inventory("Category", "Garden")), 2)
+        self.assertEqual(list(script.default_database.database["Product"]), ["A", "B", "C", "E"])
+
+        os.remove(file1)
+        os.remove(file2)
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_consolidate_files_parallel(self, mock_stdout):
+        """Tester la consolidation parallèle : ordre déterministe et erreurs par fichier."""
+        files = ["test_data1.csv", "test_data2.csv", "test_data3.csv"]
+        for number, file in enumerate(files):
+            pd.DataFrame({
+                "Product": [f"P{number}a", f"P{number}b"],
+                "Category": ["Tools", "Tools"],
+                "Quantity": [number, number],
+                "UnitPrice": [1.0, 2.0]
+            }).to_csv(file, index=False)
+        pd.DataFrame({"Product": ["X"]}).to_csv(files[1], index=False)
+
+        consolidate_files([Path(files[0]), Path("missing.csv"), Path(files[1]), Path(files[2])], workers=2)
+        self.assertEqual(list(script.default_database.database["Product"]), ["P0a", "P0b", "P2a", "P2b"])
+        output = mock_stdout.getvalue()
+        self.assertIn("Fichier non trouvé : missing.csv", output)
+        self.assertIn("Fichier ignoré test_data2.csv : colonnes manquantes", output)
+
+        stats = consolidate_files([Path(file) for file in files], chunksize=1, workers=2)
+        self.assertEqual((stats["rows"], stats["skipped"]), (0, 4))
+        load_database()
+        self.assertEqual(list(script.default_database.database["Product"]), ["P0a", "P0b", "P2a", "P2b"])
+
+        for file in files:
+            os.remove(file)
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_sharded_database(self, mock_stdout):
+        """Tester la base partitionnée par Category : partitions chargées à la demande et upserts."""
+        files = ["test_data1.csv", "test_data2.csv"]
+        pd.DataFrame({
+            "Product": ["A", "B"],
+            "Category": ["Tools", "Tools"],
+            "Quantity": [10, 20],
+            "UnitPrice": [5.0, 7.5]
+        }).to_csv(files[0], index=False)
+        pd.DataFrame({
+            "Product": ["C", "D"],
+            "Category": ["Garden", "Garden"],
+            "Quantity": [15, 25],
+            "UnitPrice": [10.0, 12.5]
+        }).to_csv(files[1], index=False)
+        with self.assertRaises(ValueError):
+            script.set_shard_key("Quantity")
+        script.set_shard_key("Category")
+        load_database()
+
+        self.assertEqual(consolidate_files([Path(file) for file in files], workers=2),
+                         {"inserted": 4, "updated": 0, "skipped": 0})
+        catalog = script.default_database._read_catalog()
+        self.assertEqual({name: shard["rows"] for name, shard in catalog["shards"].items()},
+                         {"Tools": 2, "Garden": 2})
+        self.assertEqual(len(generate_report(display=False)), 4)
+        self.assertTrue(script.default_database.database.empty)
+
+        self.assertEqual(list(search_inventory("Category", "Tools")["Product"]), ["A", "B"])
+        self.assertEqual(script.default_database.loaded_shards, {"Tools"})
+        self.assertEqual(script.query_shards(parse_query("Category^=Gar OR Category=nan")), ["Garden"])
+        self.assertEqual(script.query_shards(parse_query("Category!=Tools AND Quantity<5")), ["Garden"])
+        self.assertEqual(list(query_inventory("Quantity>12")["Product"]), ["B", "C", "D"])
+        self.assertEqual(script.default_database.loaded_shards, {"Tools", "Garden"})
+
+        pd.DataFrame({
+            "Product": ["A", "B"],
+            "Category": ["Tools", "Tools"],
+            "Quantity": [10, 30],
+            "UnitPrice": [5.0, 7.5]
+        }).to_csv(files[0], index=False)
+        self.assertEqual(consolidate_files([Path(file) for file in files]),
+                         {"inserted": 0, "updated": 1, "skipped": 3})
+        self.assertEqual(script.default_database.loaded_shards, {"Garden"})
+        self.assertEqual(len(list(Path(script.SHARDS_DIR).glob("shard-*[0-9].csv"))), 2)
+
+        load_database()
+        self.assertEqual(list(search_inventory("Product", "B")["Quantity"]), [30])
+        report = generate_report(verify=True, display=False).set_index("Product")
+        self.assertEqual(report.loc["B", "TotalQuantity"], 30)
+        self.assertIn("identique au recalcul complet", mock_stdout.getvalue())
+        for file in files:
+            os.remove(file)
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_concurrent_readers_and_writers(self, mock_stdout):
+        """Tester des lectures concurrentes d'une consolidation : chaque lecture voit un état validé."""
+        with tempfile.TemporaryDirectory() as directory:
+            inventory = script.InventoryDatabase(Path(directory) / "inventory.csv")
+            files = []
+            for number in range(8):
+                file = Path(directory) / f"batch{number}.csv"
+                pd.DataFrame({
+                    "Product": [f"P{number}-{item}" for item in range(5)],
+                    "Category": ["Tools", "Garden", "Tools", "Garden", "Tools"],
+                    "Quantity": [1, 2, 3, 4, 5],
+                    "UnitPrice": [1.0, 2.0, 3.0, 4.0, 5.0]
+                }).to_csv(file, index=False)
+                files.append(file)
+            committed = set(range(5, 45, 5))
+            errors, seen = [], []
+
+            # Les lecteurs démarrent sur une base déjà validée (une base vide n'a pas de colonnes)
+            inventory.consolidate_files([files[0]])
+
+            def write():
+                try:
+                    for file in files[1:]:
+                        inventory.consolidate_files([file])
+                except Exception as e:
+                    errors.append(e)
+
+            def read():
+                try:
+                    while writer.is_alive():
+                        version = inventory.database_version
+                        rows = inventory.run_query(parse_query("Quantity>0"))
+                        report = inventory.generate_report(display=False)
+                        seen.append(len(rows))
+                        # Deux lectures séparées ne voient le même état que si aucune écriture n'a eu lieu entre elles
+                        if inventory.database_version != version:
+                            continue
+                        if len(rows) != (0 if report is None else report["TotalQuantity"].sum() // 3):
+                            raise AssertionError(f"{len(rows)} lignes pour le rapport {report}")
+                except Exception as e:
+                    errors.append(e)
+
+            writer = threading.Thread(target=write)
+            readers = [threading.Thread(target=read) for _ in range(4)]
+            writer.start()
+            for reader in readers:
+                reader.start()
+            writer.join()
+            for reader in readers:
+                reader.join()
+
+            self.assertEqual(errors, [])
+            self.assertTrue(set(seen) <= committed)
+            self.assertEqual(len(inventory.search_inventory("Category", "Tools")), 24)
+            self.assertTrue(script.default_database.database.empty)
+
+            # Une lecture se termine pendant qu'une consolidation lente tient le verrou d'écriture
+            ingest = script._ingest_files
+            started, release = threading.Event(), threading.Event()
+
+            def slow_ingest(*args):
+                started.set()
+                release.wait(10)
+                return ingest(*args)
+
+            def read_once():
+                inventory.run_query("Quantity>0")
+                inventory.search_inventory("Category", "Tools")
+                inventory.generate_report(display=False)
+
+            slow_file = Path(directory) / "slow.csv"
+            pd.DataFrame({"Product": ["S"], "Category": ["Tools"], "Quantity": [1], "UnitPrice": [1.0]}).to_csv(
+                slow_file, index=False)
+            with patch("script._ingest_files", slow_ingest):
+                writer = threading.Thread(target=inventory.consolidate_files, args=([slow_file],))
+                writer.start()
+                started.wait(5)
+                reader = threading.Thread(target=read_once)
+                reader.start()
+                reader.join(5)
+                self.assertFalse(reader.is_alive())
+                self.assertTrue(writer.is_alive())
+                release.set()
+                writer.join()
+            self.assertEqual(len(inventory.search_inventory("Category", "Tools")), 25)
+
+            # Le récapitulatif est écrit sur disque une fois le verrou d'écriture rendu
+            atomic_write = script.atomic_write
+            writer_lock_free = []
+
+            def probe():
+                acquired = inventory._writer_lock.acquire(blocking=False)
+                if acquired:
+                    inventory._writer_lock.release()
+                writer_lock_free.append(acquired)
+
+            @contextlib.contextmanager
+            def probing_atomic_write(path):
+                if path == inventory.summary_file:
+                    prober = threading.Thread(target=probe)
+                    prober.start()
+                    prober.join()
+                with atomic_write(path) as temporary_path:
+                    yield temporary_path
+
+            pd.DataFrame({"Product": ["S", "T"], "Category": ["Tools", "Tools"], "Quantity": [2, 1],
+                          "UnitPrice": [1.0, 1.0]}).to_csv(slow_file, index=False)
+            with patch("script.atomic_write", probing_atomic_write):
+                inventory.consolidate_files([slow_file])
+            self.assertEqual(writer_lock_free, [True])
+            self.assertEqual(pd.read_csv(inventory.summary_file)["RowCount"].sum(), 42)
+            inventory.wait_for_compaction()
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_crash_safe_writes(self, mock_stdout):
+        """Tester qu'une écriture interrompue laisse la base intacte et que le journal est rejoué."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "inventory.csv"
+            inventory = script.InventoryDatabase(path)
+            file1 = Path(directory) / "batch.csv"
+            pd.DataFrame({
+                "Product": ["A", "B"],
+                "Category": ["Tools", "Garden"],
+                "Quantity": [10, 2],
+                "UnitPrice": [5.0, 7.5]
+            }).to_csv(file1, index=False)
+            inventory.consolidate_files([file1])
+            inventory.save_database()
+            saved = path.read_bytes()
+
+            with patch("script.os.replace", side_effect=OSError("disque plein")), self.assertRaises(OSError):
+                inventory.save_database()
+            self.assertEqual(path.read_bytes(), saved)
+            self.assertEqual(list(Path(directory).glob("*.tmp")), [])
+
+            pd.DataFrame({
+                "Product": ["A", "C"],
+                "Category": ["Tools", "Tools"],
+                "Quantity": [30, 4],
+                "UnitPrice": [5.0, 1.0]
+            }).to_csv(file1, index=False)
+            # Arrêt après l'écriture du segment, avant son enregistrement dans le manifeste
+            with patch.object(inventory, "_register_segment", side_effect=OSError("arrêt brutal")), \
+                    self.assertRaises(OSError):
+                inventory.consolidate_files([file1])
+            # Arrêt pendant l'écriture d'un segment : seul son fichier temporaire existe
+            with open(inventory.segments_dir / script.JOURNAL_FILE, "a", encoding="utf-8") as journal:
+                journal.write('{"file": "segment-999998.csv", "rows": 1}\n')
+            (inventory.segments_dir / "segment-999998.csv.tmp").write_text("Product\nZ\n")
+            with open(inventory.segments_dir / script.JOURNAL_FILE, "a", encoding="utf-8") as journal:
+                journal.write('{"file": "segment-999999.csv", "ro')
+            self.assertNotIn("Product", (inventory.segments_dir / script.JOURNAL_FILE).read_text())
+
+            restarted = script.InventoryDatabase(path)
+            restarted.load_database()
+            self.assertFalse((inventory.segments_dir / script.JOURNAL_FILE).exists())
+            self.assertEqual(list(restarted.database["Product"]), ["A", "B", "C"])
+            self.assertEqual(list(restarted.database["Quantity"]), [30, 2, 4])
+            self.assertEqual(list(restarted.database["UnitPrice"]), [5.0, 7.5, 1.0])
+            self.assertIn("1 ajout(s) interrompu(s) rejoué(s)", mock_stdout.getvalue())
+            self.assertIn("1 ajout(s) interrompu(s) avant l'écriture de leur segment abandonné(s)", mock_stdout.getvalue())
+            self.assertFalse((inventory.segments_dir / "segment-999998.csv.tmp").exists())
+
+            restarted.load_database()
+            self.assertEqual(len(restarted.database), 3)
+
+    def test_consolidate_appends_segment(self):
+        """Tester que la consolidation n'écrit que les lignes insérées ou modifiées dans un segment."""
+        file1 = "test_data1.csv"
+        pd.DataFrame({
+            "Product": ["A", "B"],
+            "Category": ["Tools", "Tools"],
+            "Quantity": [10, 20],
+            "UnitPrice": [5.0, 7.5]
+        }).to_csv(file1, index=False)
+
+        self.assertEqual(consolidate_files([Path(file1)]), {"inserted": 2, "updated": 0, "skipped": 0})
+        self.assertEqual(consolidate_files([Path(file1)]), {"inserted": 0, "updated": 0, "skipped": 2})
+        self.assertFalse(os.path.exists("consolidated_database.csv"))
+        segments = script.default_database._read_manifest()["segments"]
+        self.assertEqual([segment["rows"] for segment in segments], [2])
+
+        pd.DataFrame({
+            "Product": ["A", "B", "C"],
+            "Category": ["Tools", "Tools", "Tools"],
+            "Quantity": [10, 25, 1],
+            "UnitPrice": [5.0, 7.5, 3.0]
+        }).to_csv(file1, index=False)
+        self.assertEqual(consolidate_files([Path(file1)]), {"inserted": 1, "updated": 1, "skipped": 1})
+        segments = script.default_database._read_manifest()["segments"]
+        self.assertEqual([segment["rows"] for segment in segments], [2, 2])
+        self.assertEqual(list(search_inventory("Quantity", "25")["Product"]), ["B"])
+        self.assertTrue(search_inventory("Quantity", "20").empty)
+        expected = script.default_database.database
+        self.assertEqual(generate_report(verify=True, display=False).set_index("Product").loc["B", "MaxQuantity"], 25)
+
+        load_database()
+        pd.testing.assert_frame_equal(script.default_database.database, expected)
+        os.remove(file1)
+
+    def test_compact_segments(self):
+        """Tester la fusion des petits segments sans perte ni réordonnancement."""
+        for product in ["A", "B", "C"]:
+            script.append_segment(pd.DataFrame({
+                "Product": [product],
+                "Category": ["Tools"],
+                "Quantity": [1],
+                "UnitPrice": [1.0]
+            }))
+        script.wait_for_compaction()
+
+        # Une compaction pendant un chargement ne supprime pas les segments en cours de lecture
+        read_table = script.read_table
+        reading = threading.Event()
+        errors = []
+
+        def slow_read_table(path, columns=None):
+            if threading.current_thread() is loader:
+                reading.set()
+                time.sleep(0.2)
+            return read_table(path, columns)
+
+        def load():
+            try:
+                load_database()
+            except Exception as e:
+                errors.append(e)
+
+        loader = threading.Thread(target=load)
+        with patch("script.read_table", slow_read_table):
+            loader.start()
+            reading.wait(5)
+            self.assertEqual(compact_segments(min_rows=10), 2)
+            loader.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(list(script.default_database.database["Product"]), ["A", "B", "C"])
+        self.assertEqual(len(script.default_database._read_manifest()["segments"]), 1)
+        load_database()
+        self.assertEqual(list(script.default_database.database["Product"]), ["A", "B", "C"])
+
+        save_database()
+        self.assertEqual(script.default_database._read_manifest()["segments"], [])
+        load_database()
+        self.assertEqual(len(script.default_database.database), 3)
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow n'est pas installé")
+    def test_columnar_storage(self):
+        """Tester la sauvegarde Parquet, les types conservés et le chargement partiel."""
+        script.set_storage_format("parquet")
+        script.default_database.database = pd.DataFrame({
+            "Product": ["A", "B"],
+            "Category": ["Tools", "Garden"],
+            "Quantity": [10, 20],
+            "UnitPrice": [5.0, 7.0],
+            "Color": [None, None]
+        })
+        save_database()
+        script.append_segment(script.default_database.database.head(1).assign(Product="C"))
+        self.assertTrue(os.path.exists("consolidated_database.parquet"))
+
+        load_database(columns=script.REPORT_COLUMNS)
+        self.assertEqual(list(script.default_database.database.columns), script.REPORT_COLUMNS)
+        self.assertEqual(len(script.default_database.database), 3)
+        self.assertEqual(script.default_database.database["UnitPrice"].dtype, "float64")
+
+        with self.assertRaises(ValueError):
+            script.set_storage_format("xml")
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow n'est pas installé")
+    def test_memory_mapped_storage(self):
+        """Tester le format Arrow projeté en mémoire : types, index construits à la demande, réécriture."""
+        script.set_storage_format("arrow")
+        script.default_database.database = script.apply_schema(pd.DataFrame({
+            "Product": ["A", "B", "C"],
+            "Category": ["Tools", "Garden", "Tools"],
+            "Quantity": [10, 20, 10],
+            "UnitPrice": [5.0, 7.0, 1.0],
+            "Color": ["Red", None, None]
+        }))
+        save_database()
+        self.assertTrue(os.path.exists("consolidated_database.arrow"))
+
+        load_database()
+        expected = script.default_database.database
+        self.assertIsNot(script.default_database._indexed_database, script.default_database.database)
+        self.assertEqual(list(search_inventory("Quantity", "10")["Product"]), ["A", "C"])
+        self.assertEqual(script.default_database.database["Category"].dtype, "category")
+
+        save_database()
+        load_database()
+        pd.testing.assert_frame_equal(script.default_database.database, expected)
+        self.assertEqual(list(expected["Product"]), ["A", "B", "C"])
+
+    def test_inventory_schema(self):
+        """Tester les types compacts du schéma, les valeurs "None" et la recherche sur ces types."""
+        file1 = "test_data1.csv"
+        file2 = "test_data2.csv"
+        pd.DataFrame({
+            "Product": ["A", "B"],
+            "Category": ["Tools", "Garden"],
+            "Quantity": [10, 20],
+            "UnitPrice": [5.0, 7.5],
+            "Color": ["None", "Red"]
+        }).to_csv(file1, index=False)
+        pd.DataFrame({
+            "Product": ["C"],
+            "Category": ["Plumbing"],
+            "Quantity": [None],
+            "UnitPrice": [1.0],
+            "Color": ["Blue"]
+        }).to_csv(file2, index=False)
+
+        consolidate_files([Path(file1), Path(file2)])
+        self.assertEqual(script.default_database.database["Category"].dtype, "category")
+        self.assertEqual(list(script.default_database.database["Category"]), ["Tools", "Garden", "Plumbing"])
+        self.assertEqual(script.default_database.database["Quantity"].dtype, "Int8")
+        self.assertTrue(pd.isna(script.default_database.database.loc[0, "Color"]))
+
+        self.assertEqual(list(search_inventory("Quantity", "20")["Product"]), ["B"])
+        self.assertEqual(list(search_inventory("Color", "nan")["Product"]), ["A"])
+        self.assertEqual(list(query_inventory("Product>=B AND Quantity<100")["Product"]), ["B"])
+        self.assertEqual(script.compute_report(pd.DataFrame({
+            "Product": ["A", "A"], "Category": ["Tools", "Tools"],
+            "Quantity": pd.Series([100, 100], dtype="int8"), "UnitPrice": [1.0, 1.0]
+        }))["TotalQuantity"].iloc[0], 200)
+        os.remove(file1)
+        os.remove(file2)
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_batch_commands(self, mock_stdout):
+        """Tester les sous-commandes non interactives et leur sortie JSON/CSV."""
+        file1 = "test_data1.csv"
+        pd.DataFrame({
+            "Product": ["A", "B"],
+            "Category": ["Tools", "Garden"],
+            "Quantity": [10, 2],
+            "UnitPrice": [5.0, 7.5]
+        }).to_csv(file1, index=False)
+
+        with patch("sys.argv", ["script.py", "consolidate", file1]), self.assertRaises(SystemExit) as exit_code:
+            script.main()
+        self.assertEqual(exit_code.exception.code, 0)
+        self.assertEqual(json.loads(mock_stdout.getvalue()),
+                         [{"total_rows": 2, "rows_added": 2, "inserted": 2, "updated": 0, "skipped": 0}])
+
+        mock_stdout.seek(0)
+        mock_stdout.truncate()
+        with patch("sys.argv", ["script.py", "search", "-q", "Quantity<5", "-q", "Category=Tools", "-q", "Bad"]), \
+                self.assertRaises(SystemExit) as exit_code:
+            script.main()
+        self.assertEqual(exit_code.exception.code, 1)
+        lines = [json.loads(line) for line in mock_stdout.getvalue().splitlines()]
+        self.assertEqual([row["Product"] for row in lines[0]["rows"]], ["B"])
+        self.assertEqual([row["Product"] for row in lines[1]["rows"]], ["A"])
+        self.assertIn("error", lines[2])
+
+        mock_stdout.seek(0)
+        mock_stdout.truncate()
+        with patch("sys.argv", ["script.py", "--output-format", "csv", "report"]), self.assertRaises(SystemExit):
+            script.main()
+        report = pd.read_csv(StringIO(mock_stdout.getvalue()))
+        self.assertEqual(list(report["Product"]), ["B", "A"])
+
+        mock_stdout.seek(0)
+        mock_stdout.truncate()
+        pd.DataFrame({"Product": ["C"], "Category": ["Garden"], "Quantity": [50], "UnitPrice": [1.0]}).to_csv(
+            "test_data2.csv", index=False)
+        with patch("sys.argv", ["script.py", "--chunksize", "1", "consolidate", "test_data2.csv"]), \
+                self.assertRaises(SystemExit):
+            script.main()
+        result = json.loads(mock_stdout.getvalue())[0]
+        self.assertEqual((result["total_rows"], result["rows_added"]), (3, 1))
+        self.assertNotIn("rows", result)
+        os.remove("test_data2.csv")
+        os.remove(file1)
+
+    @patch("sys.stderr", new_callable=StringIO)
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_metrics(self, mock_stdout, mock_stderr):
+        """Tester les mesures par opération, leur export JSON et le profil cProfile."""
+        file1 = "test_data1.csv"
+        pd.DataFrame({
+            "Product": ["A", "B"],
+            "Category": ["Tools", "Garden"],
+            "Quantity": [10, 2],
+            "UnitPrice": [5.0, 7.5]
+        }).to_csv(file1, index=False)
+        script.reset_metrics()
+        consolidate_files([Path(file1)])
+        search_inventory("Product", "A")
+        generate_report("test_report.csv")
+
+        metrics = script.metrics_report()
+        self.assertEqual(metrics["read_csv"]["bytes_read"], os.path.getsize(file1))
+        self.assertEqual(metrics["consolidate_files"]["rows"], 2)
+        self.assertGreater(metrics["write_table"]["bytes_written"], 0)
+        self.assertEqual(metrics["write_report"]["bytes_written"], os.path.getsize("test_report.csv"))
+        self.assertEqual(metrics["search_inventory"]["calls"], 1)
+        self.assertIn("display", metrics)
+        self.assertGreater(metrics["generate_report"]["peak_memory_mb"], 0)
+
+        with patch("sys.argv", ["script.py", "--metrics-json", "test_metrics.json", "--profile", "test_profile.prof",
+                                "search", "-q", "Quantity<5"]), self.assertRaises(SystemExit):
+            script.main()
+        with open("test_metrics.json", encoding="utf-8") as metrics_file:
+            self.assertEqual(json.load(metrics_file)["run_query"]["rows"], 1)
+        self.assertGreater(os.path.getsize("test_profile.prof"), 0)
+        for file in [file1, "test_metrics.json", "test_profile.prof"]:
+            os.remove(file)
+
+    def test_show_data_pages(self):
+        """Tester la pagination et la sélection de colonnes de show_data."""
+        script.default_database.database = pd.DataFrame({
+            "Product": [f"P{number}" for number in range(5)],
+            "Category": ["Tools"] * 5,
+            "Quantity": range(5),
+            "UnitPrice": [1.0] * 5
+        })
+        viewer = show_data(page=2, page_size=2, columns=["Product"])
+        self.assertEqual(viewer.page_count, 3)
+        self.assertEqual(list(viewer.page()["Product"]), ["P2", "P3"])
+        self.assertEqual(list(viewer.page().columns), ["Product"])
+        self.assertEqual(list(viewer.next()["Product"]), ["P4"])
+        self.assertEqual(list(viewer.next()["Product"]), ["P4"])
+        self.assertEqual(list(viewer.previous()["Product"]), ["P2", "P3"])
+        self.assertIn("Page 2/3 (5 lignes)", viewer.render())
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_log_levels(self, mock_stdout):
+        """Tester que le contenu des fichiers n'est journalisé qu'au niveau DEBUG."""
+        file1 = "test_data1.csv"
+        pd.DataFrame({"Product": ["A"], "Category": ["Tools"], "Quantity": [1], "UnitPrice": [1.0]}).to_csv(file1, index=False)
+        load_csv(file1)
+        self.assertNotIn("Contenu chargé", mock_stdout.getvalue())
+
+        script.logger.setLevel("DEBUG")
+        try:
+            load_csv(file1)
+        finally:
+            script.logger.setLevel("INFO")
+        self.assertIn("Contenu chargé", mock_stdout.getvalue())
+        os.remove(file1)
+
+    @patch("builtins.input", side_effect=["2", "s", "p", "q", "5"])
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_interactive_show_pages(self, mock_stdout, _):
+        """Tester la navigation entre les pages dans le mode interactif."""
+        script.default_database.database = pd.DataFrame({
+            "Product": [f"P{number}" for number in range(30)],
+            "Category": ["Tools"] * 30,
+            "Quantity": range(30),
+            "UnitPrice": [1.0] * 30
+        })
+        interactive_mode()
+        output = mock_stdout.getvalue()
+        self.assertIn("Page 2/2 (30 lignes)", output)
+        self.assertEqual(output.count("Page 1/2 (30 lignes)"), 2)
 
     @patch("builtins.input", side_effect=["5"])
     @patch("sys.stdout", new_callable=StringIO)
@@ -158,8 +988,7 @@ class TestInventoryManagement(unittest.TestCase):
     @patch("sys.stdout", new_callable=StringIO)
     def test_interactive_show_data(self, mock_stdout, _):
         """Tester l'affichage des données dans le mode interactif."""
-        global database
-        database = pd.DataFrame({
+        script.default_database.database = pd.DataFrame({
             "Product": ["A", "B"],
             "Category": ["Tools", "Garden"],
             "Quantity": [10, 20],
@@ -173,8 +1002,7 @@ class TestInventoryManagement(unittest.TestCase):
     @patch("sys.stdout", new_callable=StringIO)
     def test_interactive_generate_report(self, mock_stdout, _):
         """Tester la génération de rapport dans le mode interactif."""
-        global database
-        database = pd.DataFrame({
+        script.default_database.database = pd.DataFrame({
             "Product": ["A", "B"],
             "Category": ["Tools", "Garden"],
             "Quantity": [10, 20],
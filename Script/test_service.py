@@ -0,0 +1,115 @@
+import asyncio
+import json
+import socket
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+import pandas as pd
+
+import script
+from service import InventoryService, handle_request, send_request
+
+
+class TestInventoryService(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Configuration avant chaque test.
+        Démarre le service sur un port libre avec une petite base en mémoire.
+        """
+        script.default_database.database = pd.DataFrame({
+            "Product": ["A", "B", "C"],
+            "Category": ["Tools", "Garden", "Tools"],
+            "Quantity": [10, 20, 3],
+            "UnitPrice": [5.0, 7.5, 10.0]
+        })
+        self.loop = asyncio.new_event_loop()
+        self.service = InventoryService()
+        self.host, self.port = self.loop.run_until_complete(self.service.start("127.0.0.1", 0))
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        """
+        Nettoyage après chaque test.
+        Arrête le service et sa boucle d'événements.
+        """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.service.server.close()
+        self.loop.run_until_complete(self.service.server.wait_closed())
+        self.loop.close()
+
+    def request(self, **request) -> dict:
+        """Envoie une requête au service démarré pour le test."""
+        return send_request(request, self.host, self.port)
+
+    def test_search(self):
+        """Tester une recherche simple et une requête composée."""
+        response = self.request(op="search", criteria="Category", value="Tools")
+        self.assertTrue(response["ok"])
+        self.assertEqual([row["Product"] for row in response["rows"]], ["A", "C"])
+
+        response = self.request(op="search", query="Category=Tools AND Quantity<5")
+        self.assertEqual([row["Product"] for row in response["rows"]], ["C"])
+
+    def test_report_and_show(self):
+        """Tester le rapport et l'affichage limité de la base chaude."""
+        response = self.request(op="report")
+        self.assertEqual(len(response["rows"]), 3)
+        self.assertIn("Rapport Récapitulatif", response["messages"])
+
+        response = self.request(op="show", limit=2)
+        self.assertEqual((len(response["rows"]), response["total"]), (2, 3))
+
+        response = self.request(op="cache")
+        self.assertEqual(response["cache"]["maxsize"], script.QUERY_CACHE_SIZE)
+        self.assertGreaterEqual(self.request(op="metrics")["metrics"]["generate_report"]["calls"], 1)
+
+    def test_invalid_requests(self):
+        """Tester qu'une requête invalide renvoie une erreur sans arrêter le service."""
+        self.assertFalse(self.request(op="delete")["ok"])
+        self.assertFalse(self.request(op="search")["ok"])
+        self.assertTrue(self.request(op="ping")["ok"])
+        self.assertFalse(handle_request({})["ok"])
+        self.assertFalse(handle_request([{"op": "ping"}])["ok"])
+        self.assertFalse(self.request(op="search", query="Quantity")["ok"])
+        self.assertFalse(self.request(op="search", criteria="Weight", value="5")["ok"])
+        response = self.request(op="report", output="missing_directory/report.csv")
+        self.assertFalse(response["ok"])
+        self.assertIn("Échec de l'opération report", response["error"])
+
+        # Un JSON valide qui n'est pas un objet reçoit une réponse, la connexion reste ouverte
+        with socket.create_connection((self.host, self.port)) as client, client.makefile("rwb") as stream:
+            stream.write(b'[1, 2]\n{"op": "ping"}\n')
+            stream.flush()
+            self.assertFalse(json.loads(stream.readline())["ok"])
+            self.assertTrue(json.loads(stream.readline())["ok"])
+
+    def test_consolidate_sharded(self):
+        """Tester que la consolidation compte aussi les lignes des partitions non chargées."""
+        with tempfile.TemporaryDirectory() as directory:
+            source = Path(directory) / "data.csv"
+            pd.DataFrame({
+                "Product": ["A", "B", "C"],
+                "Category": ["Tools", "Garden", "Tools"],
+                "Quantity": [1, 2, 3],
+                "UnitPrice": [1.0, 2.0, 3.0]
+            }).to_csv(source, index=False)
+            database = script.InventoryDatabase(Path(directory) / "inventory.csv", shard_key="Category")
+            database.load_database()
+            response = handle_request({"op": "consolidate", "files": [str(source)]}, database)
+            self.assertTrue(response["ok"])
+            self.assertEqual(response["rows"], 3)
+            self.assertEqual(response["stats"]["inserted"], 3)
+
+    def test_slow_client_does_not_block(self):
+        """Tester qu'un client qui n'a pas fini sa requête ne bloque pas les autres."""
+        with socket.create_connection((self.host, self.port)) as slow_client:
+            slow_client.sendall(b'{"op": "pi')
+            self.assertTrue(self.request(op="ping")["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
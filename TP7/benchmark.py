@@ -0,0 +1,270 @@
+import argparse
+import bisect
+import fractions
+import math
+import random
+import time
+import tracemalloc
+from functools import reduce
+
+import numpy as np
+
+from fraction import Fraction
+from fraction_array import FractionArray
+
+
+class _LegacyFraction:
+    """Former implementation of Fraction, kept for comparison
+
+    Les termes sont stockés tels quels dans le __dict__ de chaque instance et ne sont réduits
+    qu'à l'affichage.
+    """
+
+    def __init__(self, num=0, den=1):
+        """PRE : num et den sont des entiers, den non nul
+        POST : self.num et self.den valent num et den, signe porté par le numérateur
+        """
+        if den < 0:
+            num = -num
+            den = -den
+        self.num = num
+        self.den = den
+
+    def __add__(self, other):
+        """PRE : other est une instance de _LegacyFraction
+        POST : Retourne la somme, au dénominateur commun ppcm(self.den, other.den)
+        """
+        lcm = (self.den * other.den) // math.gcd(self.den, other.den)
+        return _LegacyFraction(self.num * (lcm // self.den) + other.num * (lcm // other.den), lcm)
+
+    def __mul__(self, other):
+        """PRE : other est une instance de _LegacyFraction
+        POST : Retourne le produit, sans réduction
+        """
+        return _LegacyFraction(self.num * other.num, self.den * other.den)
+
+    def __pow__(self, other):
+        """PRE : other est un entier >= 0
+        POST : Retourne la puissance, sans réduction
+        """
+        return _LegacyFraction(self.num ** other, self.den ** other)
+
+
+def memory_per_instance(cls, count):
+    """Measures the memory allocated per instance of a fraction class
+
+    PRE : cls est Fraction ou _LegacyFraction, count est un entier > 0
+    POST : Retourne le nombre moyen d'octets alloués par instance (termes compris)
+    """
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    instances = [cls(number, number + 1) for number in range(count)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return (end - start) / count
+
+
+def operation_chain(cls, length):
+    """Runs a long chain of products and powers whose exact value stays small
+
+    Chaque étape multiplie par ((k+1)/k)² puis par (k/(k+1))² : la valeur reste 1/2, mais une
+    implémentation qui ne réduit pas voit ses termes grandir à chaque étape.
+
+    PRE : cls est Fraction ou _LegacyFraction, length est un entier > 0
+    POST : Retourne (durée en secondes, taille en bits du dénominateur final)
+    """
+    result = cls(1, 2)
+    start = time.perf_counter()
+    for step in range(1, length + 1):
+        result = result * cls(step + 1, step) ** 2 * cls(step, step + 1) ** 2
+    elapsed = time.perf_counter() - start
+    return elapsed, (result.den if cls is _LegacyFraction else result.denominator).bit_length()
+
+
+def sort_and_search(cls, count, lookups, seed=0):
+    """Sorts random fractions then looks values up by binary search
+
+    La moitié des fractions partage le même dénominateur (voie rapide de la comparaison),
+    les autres ont des dénominateurs quelconques (produit en croix).
+
+    PRE : cls est Fraction ou fractions.Fraction, count et lookups sont des entiers > 0
+    POST : Retourne (durée du tri en secondes, durée des recherches en secondes)
+    """
+    rng = random.Random(seed)
+    values = [cls(rng.randrange(-10 ** 6, 10 ** 6), 100 if number % 2 else rng.randrange(1, 10 ** 6))
+              for number in range(count)]
+    probes = [cls(rng.randrange(-10 ** 6, 10 ** 6), rng.randrange(1, 10 ** 6)) for _ in range(lookups)]
+    start = time.perf_counter()
+    values.sort()
+    sort_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for probe in probes:
+        bisect.bisect_left(values, probe)
+    return sort_time, time.perf_counter() - start
+
+
+def bulk_arithmetic(count, seed=0, prices=True):
+    """Compares elementwise products and a sum over Fraction objects and over a FractionArray
+
+    Les dénominateurs sont tirés parmi ceux de prix courants (1, 2, 4, 5, 10, 100...), ou,
+    si prices est faux, au hasard entre 1 et 10**6 : la somme ne peut alors pas se ramener
+    à un petit dénominateur commun.
+
+    PRE : count est un entier > 0
+    POST : Retourne [(nom, durée des produits, durée de la somme)] pour les listes de Fraction
+           et pour FractionArray ; les deux donnent les mêmes résultats
+    """
+    rng = np.random.default_rng(seed)
+    denominators = np.array([1, 2, 3, 4, 5, 8, 10, 20, 25, 100])
+    nums = [rng.integers(-10 ** 6, 10 ** 6, count) for _ in range(2)]
+    if prices:
+        dens = [denominators[rng.integers(0, len(denominators), count)] for _ in range(2)]
+    else:
+        dens = [rng.integers(1, 10 ** 6, count) for _ in range(2)]
+
+    lefts, rights = ([Fraction(int(num), int(den)) for num, den in zip(nums[index], dens[index])] for index in range(2))
+    start = time.perf_counter()
+    products = [left * right for left, right in zip(lefts, rights)]
+    product_time = time.perf_counter() - start
+    start = time.perf_counter()
+    total = reduce(lambda left, right: left + right, lefts)
+    objects = ("liste de Fraction", product_time, time.perf_counter() - start)
+
+    left, right = FractionArray(nums[0], dens[0]), FractionArray(nums[1], dens[1])
+    start = time.perf_counter()
+    array_products = left * right
+    product_time = time.perf_counter() - start
+    start = time.perf_counter()
+    array_total = left.sum()
+    arrays = ("FractionArray", product_time, time.perf_counter() - start)
+    assert array_total == total and array_products[count // 2] == products[count // 2]
+    return [objects, arrays]
+
+
+def _count_instances(run):
+    """Runs a function while counting the Fraction instances it creates
+
+    PRE : run est une fonction sans argument
+    POST : Retourne (résultat de run, durée en secondes, nombre d'instances de Fraction créées) ;
+           Fraction est restaurée même si run lève une exception
+    """
+    init, reduced = Fraction.__init__, Fraction.__dict__["_reduced"]
+    created = 0
+
+    def counting_init(self, *args):
+        nonlocal created
+        created += 1
+        init(self, *args)
+
+    def counting_reduced(cls, num, den):
+        nonlocal created
+        created += 1
+        return reduced.__func__(cls, num, den)
+
+    Fraction.__init__, Fraction._reduced = counting_init, classmethod(counting_reduced)
+    try:
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+    finally:
+        Fraction.__init__, Fraction._reduced = init, reduced
+    return result, elapsed, created
+
+
+def accumulation(count):
+    """Accumulates integers and unit fractions into a Fraction, with and without wrapping
+
+    La somme d'entiers compare l'ancienne écriture total = total + Fraction(k) à total += k,
+    qui passe par la voie rapide entière (ni ppcm ni objet intermédiaire), et à sum().
+
+    PRE : count est un entier > 0
+    POST : Retourne [(nom, durée en secondes, instances de Fraction créées par étape ou None)] ;
+           toutes les variantes d'une même somme donnent le même résultat
+    """
+    def wrapped():
+        total = Fraction(1, 3)
+        for number in range(count):
+            total = total + Fraction(number)
+        return total
+
+    def in_place():
+        total = Fraction(1, 3)
+        for number in range(count):
+            total += number
+        return total
+
+    def builtin_sum():
+        return sum(range(count), Fraction(1, 3))
+
+    def unit_fractions():
+        total = Fraction(0)
+        for number in range(1, count // 100 + 1):
+            total += Fraction(1, number)
+        return total
+
+    def stdlib_unit_fractions():
+        total = fractions.Fraction(0)
+        for number in range(1, count // 100 + 1):
+            total += fractions.Fraction(1, number)
+        return total
+
+    results, totals = [], []
+    for name, run, steps in (("entiers, total + Fraction(k)", wrapped, count),
+                             ("entiers, total += k", in_place, count),
+                             ("entiers, sum()", builtin_sum, count),
+                             ("1/k, Fraction", unit_fractions, count // 100)):
+        total, elapsed, created = _count_instances(run)
+        totals.append(total)
+        results.append((name, elapsed, created / steps))
+    start = time.perf_counter()
+    expected = stdlib_unit_fractions()
+    results.append(("1/k, fractions.Fraction", time.perf_counter() - start, None))
+    assert totals[0] == totals[1] == totals[2] and totals[3] == expected
+    return results
+
+
+def main():
+    """
+    Point d'entrée des benchmarks de Fraction.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks de la classe Fraction.")
+    parser.add_argument('--instances', type=int, default=100_000, help="Nombre d'instances pour la mesure mémoire.")
+    parser.add_argument('--chain', type=int, default=10_000, help="Longueur de la chaîne d'opérations.")
+    parser.add_argument('--sort', type=int, default=1_000_000, help="Nombre de fractions à trier.")
+    parser.add_argument('--lookups', type=int, default=100_000, help="Nombre de recherches par bisect.")
+    parser.add_argument('--bulk', type=int, default=1_000_000, help="Nombre de fractions des calculs en masse.")
+    parser.add_argument('--random-bulk', type=int, default=20_000,
+                        help="Nombre de fractions à dénominateurs aléatoires des calculs en masse.")
+    parser.add_argument('--accumulate', type=int, default=1_000_000, help="Nombre de termes des sommes accumulées.")
+    args = parser.parse_args()
+
+    print(f"\n=== Mémoire par instance ({args.instances} instances) ===")
+    for cls in (_LegacyFraction, Fraction):
+        print(f"{cls.__name__:>16} : {memory_per_instance(cls, args.instances):.0f} octets")
+
+    print(f"\n=== Chaîne de {args.chain} produits et puissances ===")
+    for cls in (_LegacyFraction, Fraction):
+        elapsed, bits = operation_chain(cls, args.chain)
+        print(f"{cls.__name__:>16} : {elapsed:.4f} s, dénominateur final de {bits} bits")
+
+    print(f"\n=== Tri de {args.sort} fractions et {args.lookups} recherches par bisect ===")
+    for name, cls in (("fractions", fractions.Fraction), ("Fraction", Fraction)):
+        sort_time, search_time = sort_and_search(cls, args.sort, args.lookups)
+        print(f"{name:>16} : tri {sort_time:.2f} s, recherches {search_time:.2f} s")
+
+    print(f"\n=== Produits élément par élément et somme de {args.bulk} fractions ===")
+    for name, product_time, sum_time in bulk_arithmetic(args.bulk):
+        print(f"{name:>17} : produits {product_time:.3f} s, somme {sum_time:.3f} s")
+    print(f"\n=== Idem, {args.random_bulk} fractions à dénominateurs aléatoires ===")
+    for name, product_time, sum_time in bulk_arithmetic(args.random_bulk, prices=False):
+        print(f"{name:>17} : produits {product_time:.3f} s, somme {sum_time:.3f} s")
+
+    print(f"\n=== Sommes accumulées ({args.accumulate} entiers, {args.accumulate // 100} fractions 1/k) ===")
+    for name, elapsed, created in accumulation(args.accumulate):
+        instances = "" if created is None else f", {created:.1f} instance(s) de Fraction par étape"
+        print(f"{name:>28} : {elapsed:.3f} s{instances}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,11 @@
 import math
+import numbers
+import sys
+
+# Constantes du hachage des nombres de Python : hash(Fraction(a, b)) == hash(fractions.Fraction(a, b))
+_HASH_MODULUS = sys.hash_info.modulus
+_HASH_INF = sys.hash_info.inf
+
 
 class Fraction:
     """Class representing a fraction and operations on it
@@ -6,41 +13,79 @@ class Fraction:
     Author : V. Van den Schrieck
     Date : October 2021
     This class allows fraction manipulations through several operations.
+    Fractions are immutable and always stored in reduced form, with a positive denominator.
     """
 
+    __slots__ = ("_num", "_den")
+
     def __init__(self, num=0, den=1):
         """This builds a fraction based on some numerator and denominator.
 
-        PRE : num est un entier positif
-              den est un entier positif
-        POST : self.num est initialisé avec la valeur de num
-               self.den est initialisé avec la valeur de den
+        PRE : num est un entier numbers.Integral (int, entier numpy...)
+              den est un entier numbers.Integral non nul
+        POST : self._num et self._den sont la forme réduite de num/den en int, avec self._den > 0
+               Lève TypeError si num ou den n'est pas un entier, ZeroDivisionError si den vaut 0
         """
+        if not isinstance(num, numbers.Integral) or not isinstance(den, numbers.Integral):
+            raise TypeError("Le numérateur et le dénominateur doivent être des entiers.")
+        # Un entier numpy de taille fixe déborderait dans les opérations suivantes
+        num, den = int(num), int(den)
         if den == 0:
             raise ZeroDivisionError("Le dénominateur ne peut pas être égal à zéro.")
         if den < 0:
             num = -num
             den = -den
-        self.num = num
-        self.den = den
+        gcd = math.gcd(num, den)
+        self._num = num // gcd
+        self._den = den // gcd
+
+    @classmethod
+    def _reduced(cls, num, den):
+        """Builds a fraction from a numerator and denominator already in reduced form.
+
+        PRE : num et den sont des entiers premiers entre eux, den > 0
+        POST : Retourne la fraction num/den sans recalculer de pgcd
+        """
+        fraction = object.__new__(cls)
+        fraction._num = num
+        fraction._den = den
+        return fraction
 
     @property
     def numerator(self):
         """Returns the numerator of the fraction.
 
         PRE : Une instance de Fraction
-        POST : Retourne le numérateur de la fraction (self.num)
+        POST : Retourne le numérateur de la forme réduite de la fraction
         """
-        return self.num
+        return self._num
 
     @property
     def denominator(self):
         """Returns the denominator of the fraction.
 
         PRE : Une instance de Fraction
-        POST : Retourne le dénominateur de la fraction (self.den)
+        POST : Retourne le dénominateur (> 0) de la forme réduite de la fraction
         """
-        return self.den
+        return self._den
+
+    @property
+    def num(self):
+        """Returns the numerator of the fraction (alias of numerator).
+
+        PRE : Une instance de Fraction
+        POST : Retourne le numérateur de la forme réduite de la fraction
+        """
+        return self._num
+
+    @property
+    def den(self):
+        """Returns the denominator of the fraction (alias of denominator).
+
+        PRE : Une instance de Fraction
+        POST : Retourne le dénominateur (> 0) de la forme réduite de la fraction
+        """
+        return self._den
 
     # ------------------ Textual representations ------------------
 
@@ -48,12 +93,9 @@ class Fraction:
         """Return a textual representation of the reduced form of the fraction
 
         PRE : /
-        POST : Retourne une chaîne de caractères au format "num/den" après réduction de la fraction
+        POST : Retourne une chaîne de caractères au format "num/den" de la forme réduite de la fraction
         """
-        gcd = math.gcd(self.num, self.den)
-        num_reduit = self.num // gcd
-        den_reduit = self.den // gcd
-        return f"{num_reduit}/{den_reduit}"
+        return f"{self._num}/{self._den}"
 
     def as_mixed_number(self):
         """Return a textual representation of the reduced form of the fraction as a mixed number
@@ -63,71 +105,242 @@ class Fraction:
         PRE : /
         POST : Retourne une chaîne au format "Partie entière : <entier> | Reste : <reste sous forme réduite>"
         """
-        gcd = math.gcd(self.num, self.den)
-        num_reduit = self.num // gcd
-        den_reduit = self.den // gcd
-        part_entier = num_reduit // den_reduit
-        reste_num = abs(num_reduit % den_reduit)
+        part_entier, reste_num = divmod(self._num, self._den)
 
         if reste_num == 0:
             return f"Partie entière : {part_entier} | Reste : 0"
-        return f"Partie entière : {part_entier} | Reste : {reste_num}/{den_reduit}"
+        return f"Partie entière : {part_entier} | Reste : {reste_num}/{self._den}"
 
     # ------------------ Operators overloading ------------------
 
+    @staticmethod
+    def _terms(other):
+        """Returns the reduced terms of an operand
+
+        PRE : other est une instance de Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne (numérateur, dénominateur > 0) de la forme réduite de other,
+               ou None si other n'est pas un opérande valide
+        """
+        if isinstance(other, Fraction):
+            return other._num, other._den
+        if isinstance(other, numbers.Integral):
+            return int(other), 1
+        if isinstance(other, numbers.Rational):
+            return other.numerator, other.denominator
+        return None
+
     def __add__(self, other):
         """Overloading of the + operator for fractions
 
-        PRE : other est une instance de Fraction
-        POST : Retourne une nouvelle instance de Fraction représentant la somme des deux fractions
+        PRE : other est une instance de Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne une nouvelle instance de Fraction représentant la somme
+               Retourne NotImplemented pour les autres types
         """
-        lcm = (self.den * other.den) // math.gcd(self.den, other.den)
-        num1 = self.num * (lcm // self.den)
-        num2 = other.num * (lcm // other.den)
-        return Fraction(num1 + num2, lcm)
+        terms = self._terms(other)
+        if terms is None:
+            return NotImplemented
+        return self._add(*terms)
+
+    # L'addition est commutative ; sum() commence par 0 + fraction
+    __radd__ = __add__
 
     def __sub__(self, other):
         """Overloading of the - operator for fractions
 
-        PRE : other est une instance de Fraction
-        POST : Retourne une nouvelle instance de Fraction représentant la différence entre les deux fractions
+        PRE : other est une instance de Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne une nouvelle instance de Fraction représentant la différence self - other
+               Retourne NotImplemented pour les autres types
+        """
+        terms = self._terms(other)
+        if terms is None:
+            return NotImplemented
+        return self._add(-terms[0], terms[1])
+
+    def __rsub__(self, other):
+        """Overloading of the - operator when the fraction is the right operand
+
+        PRE : other est un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne une nouvelle instance de Fraction représentant la différence other - self
+               Retourne NotImplemented pour les autres types
         """
-        lcm = (self.den * other.den) // math.gcd(self.den, other.den)
-        num1 = self.num * (lcm // self.den)
-        num2 = other.num * (lcm // other.den)
-        return Fraction(num1 - num2, lcm)
+        terms = self._terms(other)
+        if terms is None:
+            return NotImplemented
+        return (-self)._add(*terms)
 
     def __mul__(self, other):
         """Overloading of the * operator for fractions
 
-        PRE : other est une instance de Fraction
-        POST : Retourne une nouvelle instance de Fraction représentant le produit des deux fractions
+        PRE : other est une instance de Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne une nouvelle instance de Fraction représentant le produit
+               Retourne NotImplemented pour les autres types
         """
-        return Fraction(self.num * other.num, self.den * other.den)
+        terms = self._terms(other)
+        if terms is None:
+            return NotImplemented
+        return self._mul(*terms)
+
+    __rmul__ = __mul__
 
     def __truediv__(self, other):
         """Overloading of the / operator for fractions
 
-        PRE : other est une instance de Fraction
-        POST : Retourne une nouvelle instance de Fraction représentant le quotient des deux fractions
+        PRE : other est une instance de Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne une nouvelle instance de Fraction représentant le quotient self / other
+               Lève ZeroDivisionError si other est nul
+               Retourne NotImplemented pour les autres types
+        """
+        terms = self._terms(other)
+        if terms is None:
+            return NotImplemented
+        num, den = terms
+        if num == 0:
+            raise ZeroDivisionError("Division par une fraction nulle.")
+        if num < 0:
+            return self._mul(-den, -num)
+        return self._mul(den, num)
+
+    def __rtruediv__(self, other):
+        """Overloading of the / operator when the fraction is the right operand
+
+        PRE : other est un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne une nouvelle instance de Fraction représentant le quotient other / self
+               Lève ZeroDivisionError si la fraction est nulle
+               Retourne NotImplemented pour les autres types
         """
-        return Fraction(self.num * other.den, self.den * other.num)
+        terms = self._terms(other)
+        if terms is None:
+            return NotImplemented
+        return Fraction._reduced(*terms) / self
+
+    # Les fractions sont immuables : x += y lie x à une nouvelle fraction
+    __iadd__ = __add__
+    __isub__ = __sub__
+    __imul__ = __mul__
+    __itruediv__ = __truediv__
+
+    def __neg__(self):
+        """Overloading of the unary - operator for fractions
+
+        PRE : /
+        POST : Retourne une nouvelle instance de Fraction représentant l'opposé de la fraction
+        """
+        return Fraction._reduced(-self._num, self._den)
 
     def __pow__(self, other):
         """Overloading of the ** operator for fractions
 
         PRE : other est un entier
         POST : Retourne une nouvelle instance de Fraction représentant la fraction élevée à la puissance `other`
+               Lève ZeroDivisionError si la fraction est nulle et other < 0
         """
-        return Fraction(self.num ** other, self.den ** other)
+        # Les puissances de deux entiers premiers entre eux restent premières entre elles
+        if other >= 0:
+            return Fraction._reduced(self._num ** other, self._den ** other)
+        if self._num == 0:
+            raise ZeroDivisionError("Puissance négative d'une fraction nulle.")
+        if self._num < 0:
+            return Fraction._reduced((-self._den) ** -other, (-self._num) ** -other)
+        return Fraction._reduced(self._den ** -other, self._num ** -other)
 
     def __eq__(self, other):
         """Overloading of the == operator for fractions
 
-        PRE : other est une instance de Fraction
-        POST : Retourne True si les deux fractions sont égales, sinon False
+        PRE : other est une instance de Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne True si les deux nombres sont égaux, sinon False
+               Retourne NotImplemented pour les autres types
+        """
+        # Les fractions sont sous forme réduite : elles sont égales si leurs termes le sont
+        terms = self._terms(other)
+        if terms is None:
+            return NotImplemented
+        return self._num == terms[0] and self._den == terms[1]
+
+    def _cross_terms(self, other):
+        """Returns two integers that compare like self and other
+
+        Les deux fractions sont comparées par produit en croix : a/b < c/d équivaut à a*d < c*b
+        puisque les dénominateurs sont positifs. Aucun produit n'est calculé si les dénominateurs
+        sont égaux ou si other est un entier dont le dénominateur vaut 1.
+
+        PRE : other est une instance de Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne (gauche, droite) tels que self < other équivaut à gauche < droite (de même
+               pour <=, >, >=), ou None si other n'est pas comparable
+        """
+        terms = self._terms(other)
+        if terms is None:
+            return None
+        num, den = terms
+        if self._den == den:
+            return self._num, num
+        if den == 1:
+            return self._num, num * self._den
+        return self._num * den, num * self._den
+
+    def __lt__(self, other):
+        """Overloading of the < operator for fractions
+
+        PRE : other est une instance de Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne True si self est strictement inférieure à other, sinon False
+               Retourne NotImplemented pour les autres types
+        """
+        terms = self._cross_terms(other)
+        if terms is None:
+            return NotImplemented
+        return terms[0] < terms[1]
+
+    def __le__(self, other):
+        """Overloading of the <= operator for fractions
+
+        PRE : other est une instance de Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne True si self est inférieure ou égale à other, sinon False
+               Retourne NotImplemented pour les autres types
+        """
+        terms = self._cross_terms(other)
+        if terms is None:
+            return NotImplemented
+        return terms[0] <= terms[1]
+
+    def __gt__(self, other):
+        """Overloading of the > operator for fractions
+
+        PRE : other est une instance de Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne True si self est strictement supérieure à other, sinon False
+               Retourne NotImplemented pour les autres types
+        """
+        terms = self._cross_terms(other)
+        if terms is None:
+            return NotImplemented
+        return terms[0] > terms[1]
+
+    def __ge__(self, other):
+        """Overloading of the >= operator for fractions
+
+        PRE : other est une instance de Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne True si self est supérieure ou égale à other, sinon False
+               Retourne NotImplemented pour les autres types
+        """
+        terms = self._cross_terms(other)
+        if terms is None:
+            return NotImplemented
+        return terms[0] >= terms[1]
+
+    def __hash__(self):
+        """Hash of the fraction, equal to the hash of the same number as int, float or fractions.Fraction
+
+        PRE : /
+        POST : Retourne le même hachage que fractions.Fraction(num, den) : deux fractions égales
+               ont le même hachage et peuvent servir de clés de dictionnaire ou d'éléments d'ensemble
         """
-        return self.num // self.den == other.num // other.den
+        try:
+            inverse = pow(self._den, -1, _HASH_MODULUS)
+        except ValueError:
+            # den est un multiple du module : pas d'inverse, même convention que fractions.Fraction
+            hash_ = _HASH_INF
+        else:
+            hash_ = hash(hash(abs(self._num)) * inverse)
+        result = hash_ if self._num >= 0 else -hash_
+        return -2 if result == -1 else result
 
     def __float__(self):
         """Returns the decimal value of the fraction
@@ -135,7 +348,39 @@ class Fraction:
         PRE : /
         POST : Retourne la valeur décimale de la fraction (numérateur / dénominateur)
         """
-        return self.num / self.den
+        return self._num / self._den
+
+    def _add(self, num, den):
+        """Adds num/den to the fraction, reducing the result with small gcds only
+
+        PRE : num/den est sous forme réduite, den > 0
+        POST : Retourne une nouvelle instance de Fraction réduite égale à self + num/den
+        """
+        if den == 1:
+            # Ajouter un entier ne change pas le dénominateur ni la réduction : pas de ppcm
+            return Fraction._reduced(self._num + num * self._den, self._den)
+        gcd = math.gcd(self._den, den)
+        if gcd == 1:
+            return Fraction._reduced(self._num * den + num * self._den, self._den * den)
+        scale = self._den // gcd
+        total = self._num * (den // gcd) + num * scale
+        gcd2 = math.gcd(total, gcd)
+        if gcd2 == 1:
+            return Fraction._reduced(total, scale * den)
+        return Fraction._reduced(total // gcd2, scale * (den // gcd2))
+
+    def _mul(self, num, den):
+        """Multiplies the fraction by num/den, reducing the cross terms before multiplying
+
+        PRE : num/den est sous forme réduite, den > 0
+        POST : Retourne une nouvelle instance de Fraction réduite égale à self * num/den
+        """
+        if den == 1:
+            gcd = math.gcd(num, self._den)
+            return Fraction._reduced(self._num * (num // gcd), self._den // gcd)
+        gcd1 = math.gcd(self._num, den)
+        gcd2 = math.gcd(num, self._den)
+        return Fraction._reduced((self._num // gcd1) * (num // gcd2), (self._den // gcd2) * (den // gcd1))
 
     # ------------------ Properties checking ------------------
 
@@ -145,7 +390,7 @@ class Fraction:
         PRE : Une instance de Fraction
         POST : Retourne True si la fraction est égale à 0, sinon False
         """
-        return self.num == 0
+        return self._num == 0
 
     def is_integer(self):
         """Check if a fraction is integer (ex : 8/4, 3, 2/2, ...)
@@ -153,7 +398,7 @@ class Fraction:
         PRE : Une instance de Fraction
         POST : Retourne True si la fraction est un entier, sinon False
         """
-        return self.num % self.den == 0
+        return self._den == 1
 
     def is_proper(self):
         """Check if the absolute value of the fraction is < 1
@@ -161,15 +406,15 @@ class Fraction:
         PRE : Une instance de Fraction
         POST : Retourne True si |num| < |den|, sinon False
         """
-        return abs(self.num) < abs(self.den)
+        return abs(self._num) < self._den
 
     def is_unit(self):
         """Check if a fraction's numerator is 1 in its reduced form
 
         PRE : Une instance de Fraction
-        POST : Retourne True si num == 1, sinon False
+        POST : Retourne True si le numérateur de la forme réduite vaut 1 (par exemple 2/8), sinon False
         """
-        return self.num == 1 and self.den == 1
+        return self._num == 1
 
     def is_adjacent_to(self, other):
         """Check if two fractions differ by a unit fraction
@@ -177,11 +422,10 @@ class Fraction:
         Two fractions are adjacents if the absolute value of the difference is a unit fraction
 
         PRE : deux instances de Fraction
-        POST : Retourne True si les deux fractions sont adjacentes, sinon False
+        POST : Retourne True si la différence réduite vaut ±1/n (par exemple 3/4 et 1/4), sinon False
         """
-        num_diff = abs(self.num * other.den - other.num * self.den)
-        den_diff = self.den * other.den
-        return num_diff == 1 and den_diff > 0
+        difference = self - other
+        return abs(difference._num) == 1
 
 
 if __name__ == "__main__":
@@ -0,0 +1,397 @@
+import math
+import numbers
+
+import numpy as np
+
+from fraction import Fraction
+
+# Au-delà de cette valeur, un résultat estimé en flottants pourrait déborder de int64 :
+# le calcul passe alors en entiers Python (dtype object), sans perte de précision.
+_INT64_SAFE = 2 ** 62
+
+
+def _integers(values):
+    """Converts integer values to an int64 array, or to an object array if they do not fit
+
+    PRE : values est un entier, une séquence d'entiers ou un tableau NumPy d'entiers
+    POST : Retourne un tableau d'entiers int64 ou, si une valeur dépasse int64, de dtype object
+           Lève TypeError si une valeur n'est pas un entier
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+        if values.dtype.kind == "u" and values.size and values.max() >= 2 ** 63:
+            return values.astype(object)
+        return values.astype(np.int64)
+    array = np.array(values, dtype=object)
+    if not all(isinstance(value, (int, np.integer)) for value in array.flat):
+        raise TypeError("Les numérateurs et les dénominateurs doivent être des entiers.")
+    return _compact(np.vectorize(int, otypes=[object])(array) if array.size else array.astype(np.int64))
+
+
+def _compact(array):
+    """Converts an object array of integers back to int64 when all values fit
+
+    PRE : array est un tableau d'entiers (int64 ou object)
+    POST : Retourne array en int64 si toutes ses valeurs tiennent dans int64, sinon array inchangé
+    """
+    if array.dtype != object:
+        return array
+    if not array.size or max(abs(int(array.max())), abs(int(array.min()))) < 2 ** 63:
+        return array.astype(np.int64)
+    return array
+
+
+def _multiply(left, right):
+    """Multiplies two integer arrays elementwise without overflow
+
+    Le résultat est estimé en flottants : s'il peut dépasser int64, le produit est calculé
+    en entiers Python.
+
+    PRE : left et right sont des tableaux d'entiers (int64 ou object) de formes compatibles
+    POST : Retourne le produit exact, en int64 si possible, sinon de dtype object
+    """
+    if left.dtype != object and right.dtype != object:
+        estimate = np.abs(left.astype(np.float64)) * np.abs(right.astype(np.float64))
+        if not estimate.size or estimate.max() < _INT64_SAFE:
+            return left * right
+    return left.astype(object) * right.astype(object)
+
+
+def _power(base, exponent):
+    """Raises an integer array to a non-negative integer power without overflow
+
+    PRE : base est un tableau d'entiers (int64 ou object), exponent est un entier >= 0
+    POST : Retourne base ** exponent exact, en int64 si possible, sinon de dtype object
+    """
+    if base.dtype != object:
+        estimate = np.abs(base.astype(np.float64)) ** exponent
+        if not estimate.size or estimate.max() < _INT64_SAFE:
+            return base ** exponent
+    return base.astype(object) ** exponent
+
+
+def _rounded_quotient(num, den):
+    """Rounds num/den to the nearest integer in exact integer arithmetic
+
+    PRE : num et den sont des entiers, den > 0
+    POST : Retourne l'entier le plus proche de num/den, l'entier pair à égalité (comme np.rint)
+    """
+    quotient, remainder = divmod(num, den)
+    if 2 * remainder > den or (2 * remainder == den and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+class FractionArray:
+    """Array of fractions stored as two NumPy integer arrays (numerators, denominators)
+
+    Les opérations sont élémentaires et vectorisées : aucun objet Fraction n'est créé par
+    élément, et les fractions sont réduites par un pgcd calculé sur tout le tableau à la fois.
+    Les termes sont stockés en int64, ou en entiers Python (dtype object) quand ils débordent.
+    """
+
+    __slots__ = ("_num", "_den")
+
+    def __init__(self, numerators, denominators=1):
+        """This builds an array of fractions from numerators and denominators.
+
+        PRE : numerators est une séquence ou un tableau d'entiers
+              denominators est un entier ou une séquence d'entiers non nuls de même longueur
+        POST : Le tableau contient les formes réduites des fractions numerators[i]/denominators[i],
+               avec des dénominateurs positifs
+               Lève TypeError si un terme n'est pas un entier, ZeroDivisionError si un dénominateur vaut 0
+        """
+        num = np.atleast_1d(_integers(numerators))
+        den = np.broadcast_to(_integers(denominators), num.shape)
+        if num.ndim != 1:
+            raise ValueError("Un FractionArray est un tableau à une dimension.")
+        if (den == 0).any():
+            raise ZeroDivisionError("Le dénominateur ne peut pas être égal à zéro.")
+        self._num, self._den = self._normalize(num, den)
+
+    @staticmethod
+    def _normalize(num, den):
+        """Reduces fractions with one batched gcd and moves the sign to the numerators
+
+        PRE : num et den sont des tableaux d'entiers de même forme, den sans zéro
+        POST : Retourne (numérateurs, dénominateurs > 0) réduits, en int64 si possible
+        """
+        sign = np.where(den < 0, -1, 1)
+        gcd = np.gcd(num, den)
+        return _compact(_multiply(num, sign) // gcd), _compact(_multiply(den, sign) // gcd)
+
+    @classmethod
+    def _reduced(cls, num, den):
+        """Builds an array from terms already in reduced form.
+
+        PRE : num et den sont des tableaux d'entiers de même forme, premiers entre eux
+              élément par élément, den > 0
+        POST : Retourne le FractionArray correspondant sans recalculer de pgcd
+        """
+        array = object.__new__(cls)
+        array._num = _compact(num)
+        array._den = _compact(den)
+        return array
+
+    @classmethod
+    def from_fractions(cls, fractions):
+        """Builds an array from a list of Fraction
+
+        PRE : fractions est une séquence d'instances de Fraction
+        POST : Retourne le FractionArray des mêmes valeurs
+        """
+        return cls._reduced(_integers([fraction.numerator for fraction in fractions]),
+                            _integers([fraction.denominator for fraction in fractions]))
+
+    @classmethod
+    def from_floats(cls, values, denominator=None):
+        """Builds an array from floats, exactly or rounded to a fixed denominator
+
+        PRE : values est une séquence ou un tableau de flottants finis
+              denominator est None ou un entier > 0 (par exemple 100 pour des centimes)
+        POST : Si denominator est None, retourne la valeur exacte de chaque flottant ;
+               sinon chaque valeur est arrondie au multiple de 1/denominator le plus proche
+               (à égalité, au numérateur pair), en entiers Python si le résultat dépasse int64
+               Lève ValueError si une valeur est infinie ou NaN
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not np.isfinite(values).all():
+            raise ValueError("Les valeurs infinies ou NaN ne sont pas des fractions.")
+        if denominator is not None:
+            scaled = values * denominator
+            if not scaled.size or np.abs(scaled).max() < _INT64_SAFE:
+                return cls(np.rint(scaled).astype(np.int64), denominator)
+        ratios = [value.as_integer_ratio() for value in values.tolist()]
+        if denominator is not None:
+            # Hors de int64 : arrondi exact à partir de la valeur exacte de chaque flottant
+            return cls(_integers([_rounded_quotient(num * denominator, den) for num, den in ratios]), denominator)
+        return cls._reduced(_integers([num for num, _ in ratios]), _integers([den for _, den in ratios]))
+
+    @property
+    def numerators(self):
+        """Returns the numerators of the reduced fractions.
+
+        PRE : /
+        POST : Retourne une copie du tableau des numérateurs (int64 ou object)
+        """
+        return self._num.copy()
+
+    @property
+    def denominators(self):
+        """Returns the denominators of the reduced fractions.
+
+        PRE : /
+        POST : Retourne une copie du tableau des dénominateurs (> 0, int64 ou object)
+        """
+        return self._den.copy()
+
+    def to_fractions(self):
+        """Returns the elements as a list of Fraction
+
+        PRE : /
+        POST : Retourne une liste de Fraction de même longueur que le tableau
+        """
+        return [Fraction._reduced(int(num), int(den)) for num, den in zip(self._num, self._den)]
+
+    def to_floats(self):
+        """Returns the decimal values of the fractions
+
+        PRE : /
+        POST : Retourne un tableau float64 des valeurs num/den
+        """
+        return np.asarray(self._num / self._den, dtype=np.float64)
+
+    # ------------------ Container protocol ------------------
+
+    def __len__(self):
+        """Returns the number of fractions in the array.
+
+        PRE : /
+        POST : Retourne le nombre d'éléments
+        """
+        return len(self._num)
+
+    def __getitem__(self, index):
+        """Returns one fraction, or a sub-array for a slice or an index array
+
+        PRE : index est un entier, une tranche ou un tableau d'indices ou de booléens
+        POST : Retourne une Fraction pour un entier, sinon un FractionArray
+        """
+        if isinstance(index, (int, np.integer)):
+            return Fraction._reduced(int(self._num[index]), int(self._den[index]))
+        return FractionArray._reduced(self._num[index], self._den[index])
+
+    def __iter__(self):
+        """Iterates over the fractions of the array.
+
+        PRE : /
+        POST : Produit les éléments sous forme de Fraction
+        """
+        return iter(self.to_fractions())
+
+    def __repr__(self):
+        """Return a textual representation of the array
+
+        PRE : /
+        POST : Retourne une chaîne au format "FractionArray([num/den, ...])"
+        """
+        return f"FractionArray([{', '.join(f'{num}/{den}' for num, den in zip(self._num, self._den))}])"
+
+    # ------------------ Operators overloading ------------------
+
+    @staticmethod
+    def _terms(other):
+        """Returns the terms of an operand as arrays that broadcast against the array
+
+        PRE : other est un FractionArray, une Fraction, un entier ou un rationnel numbers.Rational (fractions.Fraction)
+        POST : Retourne (numérateurs, dénominateurs) ou None si other n'est pas un opérande valide
+        """
+        if isinstance(other, FractionArray):
+            return other._num, other._den
+        if isinstance(other, (Fraction, numbers.Rational)):
+            return _integers([int(other.numerator)]), _integers([int(other.denominator)])
+        return None
+
+    def _add(self, num, den):
+        """Adds num/den elementwise
+
+        PRE : num/den sont des termes réduits, den > 0, de forme compatible avec le tableau
+        POST : Retourne un nouveau FractionArray réduit
+        """
+        return FractionArray._reduced(*self._normalize(
+            _multiply(self._num, den) + _multiply(num, self._den), _multiply(self._den, den)))
+
+    def __add__(self, other):
+        """Overloading of the + operator, elementwise
+
+        PRE : other est un FractionArray de même longueur, une Fraction, un entier ou un rationnel numbers.Rational
+        POST : Retourne un nouveau FractionArray contenant les sommes
+        """
+        terms = self._terms(other)
+        if terms is None:
+            return NotImplemented
+        return self._add(*terms)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        """Overloading of the - operator, elementwise
+
+        PRE : other est un FractionArray de même longueur, une Fraction, un entier ou un rationnel numbers.Rational
+        POST : Retourne un nouveau FractionArray contenant les différences
+        """
+        terms = self._terms(other)
+        if terms is None:
+            return NotImplemented
+        return self._add(-terms[0], terms[1])
+
+    def __rsub__(self, other):
+        """Overloading of the - operator when the array is the right operand
+
+        PRE : other est une Fraction, un entier ou un rationnel numbers.Rational
+        POST : Retourne un nouveau FractionArray contenant other - self
+        """
+        return -self + other
+
+    def __neg__(self):
+        """Overloading of the unary - operator
+
+        PRE : /
+        POST : Retourne un nouveau FractionArray contenant les opposés, en entiers Python si
+               un numérateur vaut -2**63
+        """
+        return FractionArray._reduced(_multiply(self._num, np.array([-1], dtype=np.int64)), self._den)
+
+    def __mul__(self, other):
+        """Overloading of the * operator, elementwise
+
+        PRE : other est un FractionArray de même longueur, une Fraction, un entier ou un rationnel numbers.Rational
+        POST : Retourne un nouveau FractionArray contenant les produits
+        """
+        terms = self._terms(other)
+        if terms is None:
+            return NotImplemented
+        return FractionArray._reduced(*self._normalize(_multiply(self._num, terms[0]),
+                                                       _multiply(self._den, terms[1])))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        """Overloading of the / operator, elementwise
+
+        PRE : other est un FractionArray de même longueur, une Fraction, un entier ou un rationnel numbers.Rational, sans zéro
+        POST : Retourne un nouveau FractionArray contenant les quotients
+               Lève ZeroDivisionError si un diviseur est nul
+        """
+        terms = self._terms(other)
+        if terms is None:
+            return NotImplemented
+        if (terms[0] == 0).any():
+            raise ZeroDivisionError("Division par une fraction nulle.")
+        return FractionArray._reduced(*self._normalize(_multiply(self._num, terms[1]),
+                                                       _multiply(self._den, terms[0])))
+
+    def __rtruediv__(self, other):
+        """Overloading of the / operator when the array is the right operand
+
+        PRE : other est une Fraction, un entier ou un rationnel numbers.Rational, le tableau ne contient pas de zéro
+        POST : Retourne un nouveau FractionArray contenant other / self
+        """
+        return self ** -1 * other
+
+    def __pow__(self, other):
+        """Overloading of the ** operator, elementwise
+
+        PRE : other est un entier
+        POST : Retourne un nouveau FractionArray contenant les puissances
+               Lève ZeroDivisionError si other < 0 et qu'un élément est nul
+        """
+        if not isinstance(other, (int, np.integer)):
+            return NotImplemented
+        other = int(other)
+        # Les puissances de deux entiers premiers entre eux restent premières entre elles
+        if other >= 0:
+            return FractionArray._reduced(_power(self._num, other), _power(self._den, other))
+        if (self._num == 0).any():
+            raise ZeroDivisionError("Puissance négative d'une fraction nulle.")
+        sign = np.where(self._num < 0, -1, 1)
+        return FractionArray._reduced(_power(self._den * sign, -other), _power(self._num * sign, -other))
+
+    # ------------------ Reductions ------------------
+
+    def sum(self):
+        """Returns the exact sum of the fractions
+
+        Les numérateurs sont d'abord sommés par dénominateur distinct, puis les sommes partielles
+        sont additionnées deux à deux, en arbre : chaque niveau est une opération vectorisée sur
+        des termes de tailles voisines, au dénominateur ppcm(b, d). Des dénominateurs tous
+        différents ne font donc pas multiplier chaque terme par le ppcm de tout le tableau.
+
+        PRE : /
+        POST : Retourne la somme sous forme de Fraction (0 pour un tableau vide)
+        """
+        if not len(self):
+            return Fraction(0)
+        den, groups = np.unique(self._den, return_inverse=True)
+        num = self._num
+        if num.dtype == object or np.abs(num.astype(np.float64)).sum() >= _INT64_SAFE:
+            num = num.astype(object)
+        totals = np.zeros(len(den), dtype=num.dtype)
+        np.add.at(totals, groups, num)
+        num = totals
+        while len(den) > 1:
+            if len(den) % 2:
+                num, den = np.append(num, 0), np.append(den, 1)
+            gcd = np.gcd(den[0::2], den[1::2])
+            left_scale, right_scale = den[1::2] // gcd, den[0::2] // gcd
+            # Chaque produit est inférieur à 2**62 en int64 : leur somme ne déborde pas
+            num = _compact(_multiply(num[0::2], left_scale) + _multiply(num[1::2], right_scale))
+            den = _compact(_multiply(den[0::2], left_scale))
+        return Fraction(int(num[0]), int(den[0]))
+
+    def prod(self):
+        """Returns the exact product of the fractions
+
+        PRE : /
+        POST : Retourne le produit sous forme de Fraction (1 pour un tableau vide), réduit une seule fois
+        """
+        return Fraction(math.prod(int(num) for num in self._num), math.prod(int(den) for den in self._den))
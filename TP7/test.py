@@ -1,5 +1,10 @@
+import bisect
+import fractions
+import sys
 import unittest
+import numpy as np
 from fraction import Fraction
+from fraction_array import FractionArray
 
 
 class TestFraction(unittest.TestCase):
@@ -18,10 +23,10 @@ class TestFraction(unittest.TestCase):
         self.assertEqual(str(context.exception), "Le dénominateur ne peut pas être égal à zéro.")
 
     def test_zero_numerator(self):
-        """Test si la fraction avec un numérateur 0 est correcte."""
+        """Test si la fraction avec un numérateur 0 est correcte (réduite en 0/1)."""
         zero_fraction = Fraction(0, 5)
         self.assertEqual(zero_fraction.numerator, 0)
-        self.assertEqual(zero_fraction.denominator, 5)
+        self.assertEqual(zero_fraction.denominator, 1)
         self.assertTrue(zero_fraction.is_zero())
 
     def test_negative_values(self):
@@ -38,6 +43,40 @@ class TestFraction(unittest.TestCase):
         self.assertEqual(fraction3.numerator, -5)
         self.assertEqual(fraction3.denominator, 4)
 
+    def test_reduced_at_construction(self):
+        """Test si la fraction est réduite une fois pour toutes à la construction."""
+        fraction = Fraction(6, -8)
+        self.assertEqual((fraction.numerator, fraction.denominator), (-3, 4))
+        self.assertEqual((self.fract3.numerator, self.fract3.denominator), (1, 1))
+
+        result = Fraction(2, 3)
+        for _ in range(50):
+            result = result * Fraction(3, 2) * Fraction(2, 3)
+        self.assertEqual((result.numerator, result.denominator), (2, 3))
+        self.assertEqual(str(Fraction(3, 4) ** -2), "16/9")
+        self.assertEqual(str(Fraction(-3, 4) ** -1), "-4/3")
+        self.assertEqual(str(Fraction(1, 6) + Fraction(1, 3)), "1/2")
+
+    def test_immutable(self):
+        """Test si la fraction est compacte (__slots__) et non modifiable."""
+        self.assertFalse(hasattr(self.fract1, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.fract1.numerator = 3
+        with self.assertRaises(AttributeError):
+            self.fract1.num = 3
+        self.assertEqual((self.fract1.num, self.fract1.den), (5, 4))
+        with self.assertRaises(AttributeError):
+            self.fract1.color = "red"
+
+    def test_hash(self):
+        """Test si le hachage est cohérent avec l'égalité et avec fractions.Fraction."""
+        for num, den in [(1, 2), (-5, 4), (4, 2), (0, 3), (10 ** 30, 7), (1, sys.hash_info.modulus)]:
+            self.assertEqual(hash(Fraction(num, den)), hash(fractions.Fraction(num, den)))
+        self.assertEqual(hash(Fraction(1, 2)), hash(0.5))
+        self.assertEqual(hash(Fraction(4, 2)), hash(2))
+        self.assertEqual(len({Fraction(1, 2), Fraction(2, 4), Fraction(-3, -6), Fraction(1, 3)}), 2)
+        self.assertEqual({Fraction(2, 4): "moitié"}[Fraction(1, 2)], "moitié")
+
     def test_invalid_inputs(self):
         """Test si des exceptions sont levées pour des entrées invalides."""
         with self.assertRaises(TypeError):
@@ -52,6 +91,15 @@ class TestFraction(unittest.TestCase):
         with self.assertRaises(TypeError):
             Fraction(4, 2.5)  # Dénominateur flottant
 
+    def test_integral_inputs(self):
+        """Test si les entiers numpy sont acceptés et convertis en int, sans débordement ensuite."""
+        fraction = Fraction(np.int64(6), np.int32(-4))
+        self.assertEqual(str(fraction), "-3/2")
+        self.assertIs(type(fraction.num), int)
+        self.assertIs(type(fraction.den), int)
+        self.assertEqual(Fraction(np.int64(2 ** 62)) * 4, Fraction(2 ** 64))
+        self.assertEqual(Fraction(1, 3) + np.int64(2), Fraction(7, 3))
+
     # ------------------ Test Textual representations ------------------
 
     def test_str(self):
@@ -92,10 +140,72 @@ class TestFraction(unittest.TestCase):
         result = self.fract1 ** 2
         self.assertEqual(str(result), "25/16")
 
+    def test_mixed_operands(self):
+        """Test les opérations avec des entiers et des fractions.Fraction, dans les deux sens."""
+        self.assertEqual(str(self.fract1 + 1), "9/4")
+        self.assertEqual(str(1 - self.fract1), "-1/4")
+        self.assertEqual(str(self.fract2 * 4), "2/1")
+        self.assertEqual(str(2 / self.fract1), "8/5")
+        self.assertEqual(str(self.fract1 / -5), "-1/4")
+        self.assertEqual(str(self.fract1 + fractions.Fraction(1, 2)), "7/4")
+        self.assertEqual(str(fractions.Fraction(1, 2) - self.fract1), "-3/4")
+        self.assertEqual(str(fractions.Fraction(2, 3) * self.fract2), "1/3")
+        self.assertEqual(str(-self.fract1), "-5/4")
+        self.assertTrue(Fraction(1, 2) == fractions.Fraction(2, 4))
+        self.assertTrue(fractions.Fraction(1, 3) < Fraction(1, 2))
+        with self.assertRaises(TypeError):
+            self.fract1 + "1"
+        with self.assertRaises(TypeError):
+            1.5 * self.fract1
+        with self.assertRaises(ZeroDivisionError):
+            self.fract1 / 0
+
+    def test_sum_and_in_place(self):
+        """Test sum() et les opérateurs en place, qui laissent les autres références intactes."""
+        self.assertEqual(str(sum([self.fract1, self.fract2, self.fract3])), "11/4")
+        self.assertEqual(str(sum(Fraction(1, den) for den in (2, 3, 6))), "1/1")
+        total = original = Fraction(1, 2)
+        total += 3
+        total -= Fraction(1, 4)
+        total *= 2
+        total /= fractions.Fraction(1, 3)
+        self.assertEqual(str(total), "39/2")
+        self.assertEqual(str(original), "1/2")
+
     def test_equality(self):
         """Test la surcharge de l'opérateur ==."""
         self.assertTrue(self.fract1 == Fraction(5, 4))
         self.assertFalse(self.fract1 == self.fract2)
+        self.assertFalse(Fraction(1, 2) == Fraction(1, 3))
+        self.assertTrue(Fraction(1, 2) != Fraction(1, 3))
+        self.assertTrue(Fraction(4, 2) == 2)
+        self.assertTrue(2 == Fraction(4, 2))
+        self.assertFalse(Fraction(5, 2) == 2)
+        self.assertFalse(self.fract1 == "5/4")
+
+    def test_ordering(self):
+        """Test les opérateurs <, <=, >, >= entre fractions et avec des entiers."""
+        self.assertTrue(Fraction(1, 3) < Fraction(1, 2))
+        self.assertTrue(Fraction(-1, 2) < Fraction(-1, 3))
+        self.assertTrue(Fraction(3, 7) <= Fraction(6, 14))
+        self.assertFalse(Fraction(2, 7) > Fraction(3, 7))
+        self.assertTrue(self.fract1 >= self.fract2)
+        self.assertTrue(self.fract1 > 1)
+        self.assertTrue(1 < self.fract1)
+        self.assertTrue(Fraction(4, 2) <= 2)
+        self.assertTrue(2 >= Fraction(-7, 3))
+        with self.assertRaises(TypeError):
+            self.fract1 < "1"
+
+    def test_sort_and_bisect(self):
+        """Test le tri et la recherche dichotomique dans une liste de fractions."""
+        values = [Fraction(num, den) for num in range(-10, 11) for den in range(1, 8)]
+        ordered = sorted(values)
+        expected = sorted(fractions.Fraction(num, den) for num in range(-10, 11) for den in range(1, 8))
+        self.assertEqual([(value.numerator, value.denominator) for value in ordered],
+                         [(value.numerator, value.denominator) for value in expected])
+        self.assertEqual(bisect.bisect_left(ordered, Fraction(1, 2)), expected.index(fractions.Fraction(1, 2)))
+        self.assertEqual(bisect.bisect_right(ordered, 0), len([value for value in expected if value <= 0]))
 
     def test_float(self):
         """Test la conversion de la fraction en nombre flottant."""
@@ -127,12 +237,112 @@ class TestFraction(unittest.TestCase):
         unit_fraction = Fraction(1, 4)
         self.assertTrue(unit_fraction.is_unit())
         self.assertFalse(self.fract1.is_unit())
+        # Le numérateur est celui de la forme réduite
+        self.assertTrue(Fraction(2, 8).is_unit())
+        self.assertTrue(Fraction(3, 3).is_unit())
+        self.assertFalse(Fraction(-1, 4).is_unit())
 
     def test_is_adjacent_to(self):
         """Test si deux fractions sont adjacentes (diffèrent d'une unité)."""
         adjacent_fraction = Fraction(4, 4)
         self.assertTrue(self.fract1.is_adjacent_to(adjacent_fraction))
         self.assertFalse(self.fract1.is_adjacent_to(self.fract2))
+        # La différence est réduite avant d'être comparée à une fraction unitaire
+        self.assertTrue(Fraction(3, 4).is_adjacent_to(Fraction(1, 4)))
+        self.assertTrue(Fraction(2, 4).is_adjacent_to(Fraction(2, 6)))
+        self.assertTrue(Fraction(1, 4).is_adjacent_to(Fraction(3, 4)))
+        self.assertFalse(Fraction(1, 2).is_adjacent_to(Fraction(1, 2)))
+
+
+class TestFractionArray(unittest.TestCase):
+    def setUp(self):
+        """Initialisation de tableaux de fractions pour les tests."""
+        self.left = FractionArray([5, 1, -6, 0], [4, 2, 8, 3])  # 5/4, 1/2, -3/4, 0
+        self.right = FractionArray([1, -3, 2, 7], [2, 4, 3, -5])  # 1/2, -3/4, 2/3, -7/5
+
+    def assertFractions(self, array, expected):
+        """Vérifie les éléments d'un FractionArray, donnés sous forme de chaînes "num/den"."""
+        self.assertEqual([str(fraction) for fraction in array.to_fractions()], expected)
+
+    def test_normalized(self):
+        """Test la réduction et le signe des fractions à la construction."""
+        self.assertFractions(self.left, ["5/4", "1/2", "-3/4", "0/1"])
+        self.assertEqual(list(self.right.denominators), [2, 4, 3, 5])
+        self.assertFractions(FractionArray([4, 6]), ["4/1", "6/1"])
+        with self.assertRaises(ZeroDivisionError):
+            FractionArray([1, 2], [3, 0])
+        with self.assertRaises(TypeError):
+            FractionArray([1.5, 2])
+
+    def test_operators(self):
+        """Test les opérations élément par élément, avec des tableaux, des fractions et des entiers."""
+        self.assertFractions(self.left + self.right, ["7/4", "-1/4", "-1/12", "-7/5"])
+        self.assertFractions(self.left - self.right, ["3/4", "5/4", "-17/12", "7/5"])
+        self.assertFractions(self.left * self.right, ["5/8", "-3/8", "-1/2", "0/1"])
+        self.assertFractions(self.left / self.right, ["5/2", "-2/3", "-9/8", "0/1"])
+        self.assertFractions(self.right ** 2, ["1/4", "9/16", "4/9", "49/25"])
+        self.assertFractions(self.right ** -1, ["2/1", "-4/3", "3/2", "-5/7"])
+        self.assertFractions(self.left + 1, ["9/4", "3/2", "1/4", "1/1"])
+        self.assertFractions(1 - self.left, ["-1/4", "1/2", "7/4", "1/1"])
+        self.assertFractions(self.left * Fraction(2, 3), ["5/6", "1/3", "-1/2", "0/1"])
+        self.assertFractions(2 / self.right, ["4/1", "-8/3", "3/1", "-10/7"])
+        self.assertFractions(Fraction(1, 2) + self.left, ["7/4", "1/1", "-1/4", "1/2"])
+        self.assertFractions(self.left * fractions.Fraction(2, 3), ["5/6", "1/3", "-1/2", "0/1"])
+        with self.assertRaises(ZeroDivisionError):
+            self.right / self.left
+        with self.assertRaises(ZeroDivisionError):
+            self.left ** -1
+
+    def test_overflow_fallback(self):
+        """Test le passage en entiers Python quand les termes dépassent int64, et le retour en int64."""
+        big = FractionArray([2 ** 62, 3], [1, 7])
+        square = big * big
+        self.assertEqual(square.numerators.dtype, object)
+        self.assertEqual(square[0], Fraction(2 ** 124))
+        self.assertEqual((square / big).numerators.dtype, np.int64)
+        self.assertEqual(FractionArray([10 ** 30], [4])[0], Fraction(10 ** 30, 4))
+        self.assertEqual((big ** 3)[1], Fraction(27, 343))
+        # L'opposé et le changement de signe de -2**63 ne tiennent pas dans int64
+        smallest = np.array([-2 ** 63, 3], dtype=np.int64)
+        self.assertEqual((-FractionArray(smallest))[0], Fraction(2 ** 63))
+        self.assertEqual(FractionArray(smallest, -1)[0], Fraction(2 ** 63))
+        self.assertEqual((-FractionArray([1, 2], [3, 5])).numerators.dtype, np.int64)
+        # Arrondi à un dénominateur fixe dont le numérateur dépasse int64
+        self.assertFractions(FractionArray.from_floats([1.5, -0.25], 2 ** 70), ["3/2", "-1/4"])
+        self.assertEqual(FractionArray.from_floats([1e19, 2.5], 1).to_fractions(), [Fraction(10 ** 19), Fraction(2)])
+
+    def test_reductions(self):
+        """Test la somme et le produit exacts, comparés à fractions.Fraction."""
+        rng = np.random.default_rng(0)
+        nums, dens = rng.integers(-10 ** 6, 10 ** 6, 500), rng.integers(1, 10 ** 6, 500)
+        array = FractionArray(nums, dens)
+        expected = [fractions.Fraction(int(num), int(den)) for num, den in zip(nums, dens)]
+        total = array.sum()
+        self.assertEqual((total.numerator, total.denominator), (sum(expected).numerator, sum(expected).denominator))
+        product = array[:20].prod()
+        reference = fractions.Fraction(1)
+        for value in expected[:20]:
+            reference *= value
+        self.assertEqual((product.numerator, product.denominator), (reference.numerator, reference.denominator))
+        self.assertEqual(FractionArray([2 ** 62, 2 ** 62, 1], [3, 3, 5]).sum(), Fraction(2 ** 63, 3) + Fraction(1, 5))
+        self.assertEqual(FractionArray([1] * 7, [2, 3, 5, 7, 11, 13, 2]).sum(), sum(Fraction(1, den) for den in (2, 3, 5, 7, 11, 13, 2)))
+        self.assertEqual(FractionArray([]).sum(), Fraction(0))
+        self.assertEqual(FractionArray([]).prod(), Fraction(1))
+
+    def test_conversions(self):
+        """Test les conversions depuis et vers des listes de Fraction et des tableaux de flottants."""
+        fractions_list = [Fraction(5, 4), Fraction(-1, 3)]
+        array = FractionArray.from_fractions(fractions_list)
+        self.assertEqual(array.to_fractions(), fractions_list)
+        self.assertEqual(list(array), fractions_list)
+        np.testing.assert_allclose(array.to_floats(), [1.25, -1 / 3])
+        self.assertFractions(FractionArray.from_floats([0.5, -0.75]), ["1/2", "-3/4"])
+        self.assertEqual(FractionArray.from_floats([0.1])[0], Fraction(*(0.1).as_integer_ratio()))
+        self.assertFractions(FractionArray.from_floats([0.1, 1.26], denominator=100), ["1/10", "63/50"])
+        with self.assertRaises(ValueError):
+            FractionArray.from_floats([float("nan")])
+        self.assertFractions(self.left[1:3], ["1/2", "-3/4"])
+        self.assertEqual(len(self.left), 4)
 
 
 if __name__ == "__main__":